@@ -0,0 +1,5 @@
+"""
+PortPilot benchmark suite.
+
+Run with `python -m benchmarks`; see `python -m benchmarks --help`.
+"""
@@ -0,0 +1,79 @@
+"""
+Command-line entry point: `python -m benchmarks`.
+
+Examples:
+    python -m benchmarks --output bench.json --save-baseline
+    python -m benchmarks --baseline benchmarks/baseline.json   # exit 1 on regression, 2 without a baseline
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# The table benchmarks need no display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks.suite import (  # noqa: E402
+    DEFAULT_SIZES,
+    DEFAULT_TOLERANCE,
+    DEFAULT_UI_SIZES,
+    compare,
+    load_report,
+    run_suite,
+    save_report,
+)
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _sizes(value: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in value.split(",") if part)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark PortPilot's hot paths.")
+    parser.add_argument("--sizes", type=_sizes, default=DEFAULT_SIZES,
+                        help="Socket table sizes for the scanner (default: 10000,50000,200000).")
+    parser.add_argument("--ui-sizes", type=_sizes, default=DEFAULT_UI_SIZES,
+                        help="Socket table sizes for the port table (default: 1000,10000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--tunnels", type=int, default=1000,
+                        help="Tunnels in the persistence benchmarks.")
+    parser.add_argument("--processes", type=int, default=2000,
+                        help="Processes in the fake /proc for the inode index benchmarks.")
+    parser.add_argument("--live", type=int, default=0, metavar="N",
+                        help="Also time a real scan with N local listeners open.")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline to compare against (default: benchmarks/baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a result counts as a regression (default: 0.25).")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.ui_sizes, args.repeat, args.tunnels, args.live,
+                       args.processes, log=print)
+
+    if args.output:
+        save_report(report, args.output)
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.",
+              file=sys.stderr)
+        return 2
+
+    regressions = compare(report, load_report(args.baseline), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
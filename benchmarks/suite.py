@@ -0,0 +1,265 @@
+"""
+Benchmark definitions, the timing harness and baseline comparison.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmarks.synthetic import (
+    fake_ssh,
+    local_listeners,
+    make_connections,
+    make_proc_tree,
+    synthetic_system,
+)
+from src.core.metrics import MetricsRegistry
+from src.core.port_allocator import PortAllocator
+from src.core.port_scanner import PortScanner
+from src.core.procfs import InodeIndex
+from src.core.tunnel_manager import TunnelConfig, TunnelManager
+from src.utils.config import Config
+from src.utils.import_profile import profile_imports
+
+DEFAULT_SIZES = (10_000, 50_000, 200_000)
+# Every LISTEN row gets a Kill button, so the table is measured at smaller sizes
+DEFAULT_UI_SIZES = (1_000, 10_000)
+
+# A result is a regression when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and at least this many seconds slower, to ignore noise on tiny timings
+NOISE_FLOOR = 0.0005
+
+
+@dataclass
+class BenchResult:
+    """Timings of one benchmark, in seconds per run."""
+    name: str
+    median: float
+    best: float
+    worst: float
+    runs: int
+
+
+def measure(name: str, fn: Callable[[], object], repeat: int = 5,
+            setup: Callable[[], object] | None = None) -> BenchResult:
+    """Run `fn` `repeat` times (after an untimed warm-up) and summarise."""
+    if setup:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return BenchResult(name, statistics.median(timings), min(timings), max(timings), repeat)
+
+
+def bench_scanner(rows: int, repeat: int) -> list[BenchResult]:
+    """PortScanner.scan() and the lookups that use its index."""
+    table = make_connections(rows)
+    scanner = PortScanner()
+    results = []
+
+    with synthetic_system(table):
+        results.append(measure(f"scan[{rows}]", scanner.scan, repeat))
+
+    probes = [conn.laddr.port for conn in table[:: max(1, rows // 10_000)]]
+
+    def lookups():
+        for port in probes:
+            scanner.find_by_port(port)
+            scanner.get_port_owner(port)
+
+    results.append(measure(f"lookup_by_port[{rows}]x{len(probes)}", lookups, repeat))
+    results.append(measure(f"find_by_process[{rows}]",
+                           lambda: scanner.find_by_process("postgres"), repeat))
+    results.append(measure(f"used_port_bitmap[{rows}]", scanner.used_port_bitmap, repeat))
+    return results
+
+
+def bench_allocator(count: int, repeat: int) -> list[BenchResult]:
+    """PortAllocator.allocate() one port at a time, without bind checks."""
+    allocator = PortAllocator(port_range=(1024, 65535))
+
+    def allocate():
+        for _ in range(count):
+            allocator.allocate(1, verify=False)
+
+    return [measure(f"port_allocate x{count}", allocate, repeat)]
+
+
+def bench_metrics(count: int, repeat: int) -> list[BenchResult]:
+    """Counter increments and histogram observations, as the instrumented hot paths make them."""
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Bench.")
+    histogram = registry.histogram("bench_seconds", "Bench.")
+
+    def update():
+        for _ in range(count):
+            counter.inc()
+            histogram.observe(0.003)
+
+    return [measure(f"metrics_update x{count}", update, repeat)]
+
+
+def bench_inode_index(processes: int, repeat: int) -> list[BenchResult]:
+    """Inode -> PID resolution over a fake /proc: single thread, sharded, and incremental."""
+    with tempfile.TemporaryDirectory() as tmp:
+        inodes = make_proc_tree(Path(tmp), processes)
+        serial = InodeIndex(tmp, max_workers=1)
+        parallel = InodeIndex(tmp)
+        results = [
+            measure(f"inode_index_cold_1_thread[{processes}]", lambda: serial.resolve(inodes),
+                    repeat, setup=serial.clear),
+            measure(f"inode_index_cold_parallel[{processes}]",
+                    lambda: parallel.resolve(inodes), repeat, setup=parallel.clear),
+        ]
+        parallel.resolve(inodes)
+        results.append(measure(f"inode_index_warm[{processes}]", lambda: parallel.resolve(inodes), repeat))
+    return results
+
+
+def bench_port_table(rows: int, repeat: int) -> list[BenchResult]:
+    """PortTableWidget population and search filtering, offscreen."""
+    from PyQt6.QtWidgets import QApplication
+
+    from src.ui.widgets.port_table import PortTableWidget
+
+    _app = QApplication.instance() or QApplication(["portpilot-bench"])
+    scanner = PortScanner()
+    with synthetic_system(make_connections(rows)):
+        widget = PortTableWidget(scanner)
+
+    def clear_search():
+        widget.search_box.blockSignals(True)
+        widget.search_box.clear()
+        widget.search_box.blockSignals(False)
+
+    def search():
+        widget.search_box.setText("postgres")  # textChanged repopulates the table
+
+    results = [
+        measure(f"port_table_populate[{rows}]", widget._populate_table, repeat),
+        measure(f"port_table_search[{rows}]", search, repeat, setup=clear_search),
+    ]
+    widget.deleteLater()
+    return results
+
+
+def bench_tunnels(count: int, repeat: int) -> list[BenchResult]:
+    """Tunnel start/stop against a fake ssh, and tunnel config persistence."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        manager = TunnelManager(tmp_path / "tunnels.json", port_scanner=PortScanner())
+        for i in range(count):
+            manager.add_tunnel(TunnelConfig(f"t{i}", "bench", "localhost", 40000 + i, 80))
+
+        with fake_ssh(tmp_path):
+            def start_stop():
+                for i in range(20):
+                    manager.start_tunnel(f"t{i}", refresh=False)
+                for i in range(20):
+                    manager.stop_tunnel(f"t{i}")
+
+            results.append(measure("tunnel_start_stop x20", start_stop, repeat))
+
+        results.append(measure(f"tunnel_config_save[{count}]", manager._save_config, repeat))
+        results.append(measure(f"tunnel_config_load[{count}]",
+                               lambda: TunnelManager(tmp_path / "tunnels.json"), repeat))
+
+        exported = tmp_path / "export.json"
+        manager.export_tunnels(exported)
+        importer = TunnelManager(tmp_path / "imported.json")
+        results.append(measure(f"tunnel_import[{count}]",
+                               lambda: importer.import_tunnels(exported, replace=True), repeat))
+
+        config = Config(tmp_path / "config.json")
+        results.append(measure("config_save", config.save, repeat))
+        results.append(measure("config_load", lambda: Config(tmp_path / "config.json"), repeat))
+    return results
+
+
+def bench_startup(repeat: int) -> list[BenchResult]:
+    """The GUI's cold-start imports, in a fresh interpreter each run."""
+    return [measure("startup_imports", profile_imports, repeat)]
+
+
+def bench_live_scan(listeners: int, repeat: int) -> list[BenchResult]:
+    """A real psutil scan with `listeners` extra sockets open on 127.0.0.1."""
+    scanner = PortScanner()
+    with local_listeners(listeners):
+        return [measure(f"scan_live[+{listeners} listeners]", scanner.scan, repeat)]
+
+
+def run_suite(sizes=DEFAULT_SIZES, ui_sizes=DEFAULT_UI_SIZES, repeat: int = 5,
+              tunnels: int = 1000, live: int = 0, processes: int = 2000,
+              log: Callable[[str], None] | None = None) -> dict:
+    """Run every benchmark and return a JSON-serialisable report."""
+    groups: list[Callable[[], list[BenchResult]]] = []
+    groups += [lambda n=n: bench_scanner(n, repeat) for n in sizes]
+    groups += [lambda n=n: bench_port_table(n, repeat) for n in ui_sizes]
+    groups.append(lambda: bench_allocator(2000, repeat))
+    groups.append(lambda: bench_metrics(100_000, repeat))
+    if sys.platform != "win32":
+        groups.append(lambda: bench_inode_index(processes, repeat))
+    groups.append(lambda: bench_tunnels(tunnels, repeat))
+    groups.append(lambda: bench_startup(repeat))
+    if live:
+        groups.append(lambda: bench_live_scan(live, repeat))
+
+    results = {}
+    for group in groups:
+        for result in group():
+            results[result.name] = asdict(result)
+            if log:
+                log(f"{result.name:45} {result.median * 1000:10.2f} ms  (best {result.best * 1000:.2f})")
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Compare a report with a baseline report.
+
+    Returns:
+        One message per benchmark whose median regressed beyond `tolerance`.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        slower = result["median"] - base["median"]
+        if result["median"] > base["median"] * (1 + tolerance) and slower > NOISE_FLOOR:
+            regressions.append(
+                f"{name}: {result['median'] * 1000:.2f} ms vs baseline "
+                f"{base['median'] * 1000:.2f} ms (+{slower / base['median']:.0%})"
+            )
+    return regressions
+
+
+def save_report(report: dict, path: Path) -> None:
+    path.write_text(json.dumps(report, indent=2))
+
+
+def load_report(path: Path) -> dict:
+    with open(path) as f:
+        return dict(json.load(f))
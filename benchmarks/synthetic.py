@@ -0,0 +1,115 @@
+"""
+Synthetic inputs for the benchmarks: socket tables, process names, local
+listeners and a fake ssh binary. Nothing here needs network access or root.
+"""
+
+import os
+import random
+import socket
+import stat
+from collections import namedtuple
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+# Same fields as psutil's sconn/addr named tuples
+Addr = namedtuple("Addr", "ip port")
+Conn = namedtuple("Conn", "fd family type laddr raddr status pid")
+
+PROCESS_NAMES = ("python3", "node", "nginx", "postgres", "redis-server", "java",
+                 "sshd", "chrome", "dockerd", "code")
+
+# Rough mix of a busy developer machine: mostly client connections
+STATUS_WEIGHTS = (("ESTABLISHED", 55), ("LISTEN", 20), ("TIME_WAIT", 15),
+                  ("CLOSE_WAIT", 5), ("NONE", 5))
+
+
+def make_connections(rows: int, processes: int = 500, seed: int = 0) -> list[Conn]:
+    """
+    Build a psutil.net_connections()-shaped table with `rows` sockets.
+
+    Sockets are spread over `processes` PIDs so the per-scan name cache sees
+    a realistic hit rate.
+    """
+    rng = random.Random(seed)
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    table = []
+    for i in range(rows):
+        status = statuses[i % len(statuses)]
+        udp = status == "NONE"
+        raddr = () if status in ("LISTEN", "NONE") else Addr(f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                                                              rng.randrange(1, 65536))
+        table.append(Conn(
+            fd=i,
+            family=socket.AF_INET,
+            type=socket.SOCK_DGRAM if udp else socket.SOCK_STREAM,
+            laddr=Addr("127.0.0.1" if i % 3 else "0.0.0.0", rng.randrange(1, 65536)),
+            raddr=raddr,
+            status=status,
+            pid=1000 + rng.randrange(processes),
+        ))
+    return table
+
+
+class FakeProcess:
+    """Stands in for psutil.Process for the synthetic PIDs."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def name(self) -> str:
+        return PROCESS_NAMES[self.pid % len(PROCESS_NAMES)]
+
+
+@contextmanager
+def synthetic_system(table: list[Conn]) -> Iterator[None]:
+    """Make psutil report `table` and resolve its PIDs to fake processes."""
+    with ExitStack() as stack:
+        stack.enter_context(patch("psutil.net_connections", return_value=table))
+        stack.enter_context(patch("psutil.Process", FakeProcess))
+        yield
+
+
+def make_proc_tree(root: Path, processes: int, sockets_per_process: int = 20) -> set[int]:
+    """
+    Build a fake /proc with `processes` fd directories full of socket links.
+
+    Returns:
+        The socket inodes created.
+    """
+    inodes = set()
+    for pid in range(1, processes + 1):
+        fd_dir = root / str(pid) / "fd"
+        fd_dir.mkdir(parents=True)
+        for fd in range(sockets_per_process):
+            inode = pid * 1000 + fd
+            os.symlink(f"socket:[{inode}]", fd_dir / str(fd))
+            inodes.add(inode)
+    return inodes
+
+
+@contextmanager
+def local_listeners(count: int) -> Iterator[list[int]]:
+    """Open `count` real TCP listeners on 127.0.0.1 and yield their ports."""
+    sockets = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(1)
+            sockets.append(sock)
+        yield [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+@contextmanager
+def fake_ssh(directory: Path) -> Iterator[Path]:
+    """Put an `ssh` that just sleeps first on PATH."""
+    script = directory / "ssh"
+    script.write_text("#!/bin/sh\nexec sleep 600\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    with patch.dict(os.environ, {"PATH": f"{directory}{os.pathsep}{os.environ.get('PATH', '')}"}):
+        yield script
@@ -0,0 +1,232 @@
+"""
+PortPilot - Command-line interface.
+
+Subcommands run headless (no Qt) and are dispatched from main() when the
+first argument names a command, e.g. `portpilot alloc --count 50`.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from src.core.port_allocator import RESERVATIONS_PATH, PortAllocator
+from src.core.port_scanner import PortScanner
+from src.core.scan_profile import format_profiles, profile_scans
+from src.core.snapshot import Snapshot, SnapshotError, diff_snapshots
+from src.core.tunnel_io import FORMATS
+from src.core.tunnel_manager import TunnelManager
+from src.utils.import_profile import STARTUP_IMPORTS, profile_imports
+
+
+def _parse_range(value: str) -> tuple[int, int]:
+    """Parse a 'LOW-HIGH' port range."""
+    try:
+        low, high = (int(part) for part in value.split("-", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid port range: {value!r}") from None
+    if not 1 <= low <= high <= 65535:
+        raise argparse.ArgumentTypeError(f"invalid port range: {value!r}")
+    return (low, high)
+
+
+def _cmd_alloc(args: argparse.Namespace) -> int:
+    """Print free ports from the requested range."""
+    # Shared with the tray and other alloc runs, so none of them hands out these ports for a while
+    allocator = PortAllocator(PortScanner(), port_range=args.range,
+                              reservation_file=RESERVATIONS_PATH)
+    ports = allocator.allocate(args.count, contiguous=args.contiguous,
+                               verify=not args.no_verify)
+
+    if args.json:
+        print(json.dumps(ports))
+    else:
+        for port in ports:
+            print(port)
+
+    if len(ports) < args.count:
+        print(f"Only {len(ports)} of {args.count} ports available in "
+              f"{args.range[0]}-{args.range[1]}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cmd_import_tunnels(args: argparse.Namespace) -> int:
+    """Import tunnels from a file, all or nothing."""
+    result = TunnelManager().import_tunnels(args.file, fmt=args.format, replace=args.replace)
+    if not result.ok:
+        for error in result.errors:
+            print(error, file=sys.stderr)
+        print(f"Import failed with {len(result.errors)} error(s); no tunnels were changed.",
+              file=sys.stderr)
+        return 1
+    print(f"Imported {result.imported} tunnel(s).")
+    return 0
+
+
+def _cmd_export_tunnels(args: argparse.Namespace) -> int:
+    """Export all tunnels to a file."""
+    count = TunnelManager().export_tunnels(args.file, fmt=args.format)
+    print(f"Exported {count} tunnel(s) to {args.file}.")
+    return 0
+
+
+def _cmd_import_profile(args: argparse.Namespace) -> int:
+    """Print the most expensive imports of a cold start."""
+    profile = profile_imports(args.statement)
+    print(profile.format(args.top))
+    return 0
+
+
+def _cmd_profile_scan(args: argparse.Namespace) -> int:
+    """Profile repeated port scans phase by phase."""
+    scanner = PortScanner(namespaces=args.namespaces, parallel_inodes=args.parallel_inodes)
+    profiles = profile_scans(scanner, args.repeat, allocations=not args.no_alloc)
+    if args.json:
+        print(json.dumps([profile.to_dict() for profile in profiles], indent=2))
+    else:
+        print(format_profiles(profiles))
+    return 0
+
+
+def _cmd_wait(args: argparse.Namespace) -> int:
+    """Wait until a port is listening (or free, with --free)."""
+    scanner = PortScanner()
+    if args.free:
+        result = scanner.wait_for_free(args.port, args.timeout, args.protocol)
+    else:
+        result = scanner.wait_for_listen(args.port, args.timeout, args.protocol)
+
+    if args.json:
+        print(json.dumps(asdict(result)))
+    elif result.ready and not args.free:
+        print(f"Port {args.port} is listening (PID {result.pid}, {result.process_name}) "
+              f"after {result.elapsed:.2f}s")
+    elif result.ready:
+        print(f"Port {args.port} is free after {result.elapsed:.2f}s")
+    else:
+        state = "still in use" if args.free else "not listening"
+        print(f"Port {args.port} is {state} after {result.elapsed:.2f}s", file=sys.stderr)
+    return 0 if result.ready else 1
+
+
+def _cmd_snapshot(args: argparse.Namespace) -> int:
+    """Scan once and save the result as a binary snapshot."""
+    scanner = PortScanner(namespaces=args.namespaces)
+    scanner.scan()
+    count = scanner.export_snapshot(args.file, compress=args.compress)
+    print(f"Saved {count} socket(s) to {args.file}.")
+    return 0
+
+
+def _format_socket(entry) -> str:
+    remote = f" -> {entry.remote_address}:{entry.remote_port}" if entry.remote_port else ""
+    return (f"{entry.protocol} {entry.local_address}:{entry.local_port}{remote} "
+            f"{entry.status} {entry.process_name} ({entry.pid})")
+
+
+def _cmd_diff(args: argparse.Namespace) -> int:
+    """Stream the differences between two snapshots; exits 1 if they differ."""
+    try:
+        with Snapshot(args.old) as old, Snapshot(args.new) as new:
+            changes = 0
+            for sign, entry in diff_snapshots(old, new):
+                changes += 1
+                if args.json:
+                    print(json.dumps({"change": sign, **asdict(entry)}))
+                else:
+                    print(f"{sign} {_format_socket(entry)}")
+    except (OSError, SnapshotError) as e:
+        print(f"Cannot read snapshot: {e}", file=sys.stderr)
+        return 2
+    return 1 if changes else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(prog="portpilot", description="PortPilot command-line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    alloc = commands.add_parser("alloc", help="Allocate free local ports.")
+    alloc.add_argument("-n", "--count", type=int, default=1, help="Number of ports (default: 1).")
+    alloc.add_argument("-r", "--range", type=_parse_range, default=PortAllocator.DEFAULT_RANGE,
+                       metavar="LOW-HIGH", help="Inclusive port range (default: 20000-30000).")
+    alloc.add_argument("-c", "--contiguous", action="store_true",
+                       help="Return consecutive ports.")
+    alloc.add_argument("--no-verify", action="store_true",
+                       help="Skip the bind check on each port.")
+    alloc.add_argument("--json", action="store_true", help="Print ports as a JSON list.")
+    alloc.set_defaults(func=_cmd_alloc)
+
+    import_tunnels = commands.add_parser("import-tunnels", help="Bulk import tunnels.")
+    import_tunnels.add_argument("file", type=Path, help="JSON, CSV or OpenSSH config file.")
+    import_tunnels.add_argument("-f", "--format", choices=FORMATS,
+                                help="File format (default: guessed from the file name).")
+    import_tunnels.add_argument("--replace", action="store_true",
+                                help="Overwrite tunnels that already exist.")
+    import_tunnels.set_defaults(func=_cmd_import_tunnels)
+
+    export_tunnels = commands.add_parser("export-tunnels", help="Export all tunnels.")
+    export_tunnels.add_argument("file", type=Path, help="Destination file.")
+    export_tunnels.add_argument("-f", "--format", choices=FORMATS,
+                                help="File format (default: guessed from the file name).")
+    export_tunnels.set_defaults(func=_cmd_export_tunnels)
+
+    import_profile = commands.add_parser(
+        "import-profile", help="Report cold-start import times (like python -X importtime)."
+    )
+    import_profile.add_argument("-n", "--top", type=int, default=25,
+                                help="Number of modules to show (default: 25).")
+    import_profile.add_argument("-s", "--statement", default=STARTUP_IMPORTS,
+                                help="Statement to profile (default: the GUI startup imports).")
+    import_profile.set_defaults(func=_cmd_import_profile)
+
+    profile_scan = commands.add_parser("profile-scan", help="Profile port scans phase by phase.")
+    profile_scan.add_argument("-r", "--repeat", type=int, default=50,
+                              help="Number of scans (default: 50).")
+    profile_scan.add_argument("--no-alloc", action="store_true",
+                              help="Skip tracemalloc allocation tracing (more accurate timings).")
+    profile_scan.add_argument("--namespaces", action="store_true",
+                              help="Include other network namespaces (containers).")
+    profile_scan.add_argument("--parallel-inodes", action="store_true",
+                              help="Use the /proc scanner with the parallel inode index (Linux).")
+    profile_scan.add_argument("--json", action="store_true", help="Print every profile as JSON.")
+    profile_scan.set_defaults(func=_cmd_profile_scan)
+
+    wait = commands.add_parser("wait", help="Wait until a port is listening or free.")
+    wait.add_argument("port", type=int, help="Local port.")
+    wait.add_argument("--free", action="store_true",
+                      help="Wait until nothing listens on the port instead.")
+    wait.add_argument("-t", "--timeout", type=float, default=30.0,
+                      help="Seconds to wait (default: 30); exits 1 on timeout.")
+    wait.add_argument("--udp", dest="protocol", action="store_const", const="udp", default="tcp",
+                      help="Wait on a UDP socket instead of a TCP listener.")
+    wait.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    wait.set_defaults(func=_cmd_wait)
+
+    snapshot = commands.add_parser("snapshot", help="Save the current sockets to a binary snapshot.")
+    snapshot.add_argument("file", type=Path, help="Snapshot file to write.")
+    snapshot.add_argument("-z", "--compress", action="store_true",
+                          help="Compress with zlib (smaller; not memory-mapped when read).")
+    snapshot.add_argument("--namespaces", action="store_true",
+                          help="Include other network namespaces (containers).")
+    snapshot.set_defaults(func=_cmd_snapshot)
+
+    diff = commands.add_parser("diff", help="Show sockets added and removed between two snapshots.")
+    diff.add_argument("old", type=Path, help="Earlier snapshot.")
+    diff.add_argument("new", type=Path, help="Later snapshot.")
+    diff.add_argument("--json", action="store_true", help="Print one JSON object per change.")
+    diff.set_defaults(func=_cmd_diff)
+
+    return parser
+
+
+COMMANDS = {"alloc", "import-tunnels", "export-tunnels", "import-profile", "profile-scan", "wait",
+            "snapshot", "diff"}
+
+
+def run(argv: list[str]) -> int:
+    """Run a CLI command and return its exit code."""
+    args = build_parser().parse_args(argv)
+    return int(args.func(args))
@@ -0,0 +1,161 @@
+"""
+Service and host names for the port tables.
+
+ServiceTable maps local ports to service names from the services file,
+loaded once. ReverseDns resolves remote addresses on a small worker pool
+and answers lookups from its cache only, so callers (the UI) never wait on
+DNS: the first lookup of an address returns None and queues it, and
+`on_resolved` fires once the name is known.
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+if sys.platform == "win32":
+    SERVICES_PATH = Path(os.environ.get("SystemRoot", r"C:\Windows")) / "System32" / "drivers" / "etc" / "services"
+else:
+    SERVICES_PATH = Path("/etc/services")
+
+
+class ServiceTable:
+    """(port, protocol) -> service name, read from a services(5) file."""
+
+    def __init__(self, path: Path = SERVICES_PATH):
+        self._names: dict[tuple[int, str], str] = {}
+        try:
+            text = Path(path).read_text(errors="replace")
+        except OSError:
+            return
+        for line in text.splitlines():
+            fields = line.split("#", 1)[0].split()
+            if len(fields) < 2 or "/" not in fields[1]:
+                continue
+            port, _, protocol = fields[1].partition("/")
+            if port.isdigit():
+                # The first entry for a port is its canonical name
+                self._names.setdefault((int(port), protocol.lower()), fields[0])
+
+    def name(self, port: int, protocol: str = "tcp") -> str | None:
+        return self._names.get((port, protocol))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+@lru_cache(maxsize=1)
+def service_table() -> ServiceTable:
+    """The system services table, loaded on first use."""
+    return ServiceTable()
+
+
+def _gethostbyaddr(address: str) -> str:
+    return socket.gethostbyaddr(address)[0]
+
+
+class ReverseDns:
+    """
+    Non-blocking reverse-DNS cache.
+
+    Args:
+        resolver: address -> host name; raises OSError if there is none.
+            Defaults to socket.gethostbyaddr(); tests pass a stub.
+        max_workers: Concurrent lookups.
+        max_pending: Queued lookups; further addresses are retried on a later lookup().
+        ttl: Seconds to keep a resolved name.
+        negative_ttl: Seconds to remember that an address has no name.
+        max_entries: Cached addresses; the oldest are dropped beyond this.
+        on_resolved: Called from a worker thread with (address, name or None).
+        clock: Monotonic time source, for tests.
+    """
+
+    def __init__(self, resolver: Callable[[str], str] = _gethostbyaddr, max_workers: int = 4,
+                 max_pending: int = 256, ttl: float = 3600.0, negative_ttl: float = 300.0,
+                 max_entries: int = 10_000,
+                 on_resolved: Callable[[str, str | None], None] | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.resolver = resolver
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.on_resolved = on_resolved
+        self._clock = clock
+        self._lock = threading.Lock()
+        # address -> (name or None, expiry)
+        self._cache: dict[str, tuple[str | None, float]] = {}
+        self._pending: set[str] = set()
+        self._executor: ThreadPoolExecutor | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, address: str | None) -> str | None:
+        """
+        Return the cached name of `address`, queueing a lookup if it is unknown or stale.
+
+        A stale name is still returned while it is being refreshed.
+        """
+        if not address:
+            return None
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(address)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            if address not in self._pending and len(self._pending) < self.max_pending:
+                self._pending.add(address)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="reverse-dns")
+                self._executor.submit(self._resolve, address)
+        return cached[0] if cached else None
+
+    def label(self, address: str | None) -> str:
+        """'name (address)' once resolved, else the bare address."""
+        name = self.lookup(address)
+        return f"{name} ({address})" if name else (address or "")
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _resolve(self, address: str) -> None:
+        try:
+            try:
+                name: str | None = self.resolver(address)
+            except (OSError, UnicodeError):
+                name = None
+            if name == address:
+                name = None  # Some resolvers echo the address back
+            with self._lock:
+                self._cache.pop(address, None)  # Re-insert at the end: dict order is age order
+                self._cache[address] = (name, self._clock() + (self.ttl if name else self.negative_ttl))
+                while len(self._cache) > self.max_entries:
+                    del self._cache[next(iter(self._cache))]
+        except Exception as e:
+            # Not cached, so the next lookup tries again
+            print(f"Error resolving {address}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(address)
+        if self.on_resolved:
+            try:
+                self.on_resolved(address, name)
+            except Exception as e:
+                print(f"Error in reverse-DNS callback: {e}")
@@ -0,0 +1,179 @@
+"""
+Network namespace scanning (Linux).
+
+psutil.net_connections() only sees sockets in the caller's network
+namespace, so ports published inside Docker/podman containers are missing.
+This module groups processes by their /proc/<pid>/ns/net inode, reads each
+namespace's socket tables once through one of its member PIDs
+(/proc/<pid>/net/tcp etc. show the namespace of that PID) and maps socket
+inodes back to the member processes.
+"""
+
+import os
+import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.core.port_scanner import PortInfo
+from src.core.procfs import PROC_ROOT, read_socket_table, socket_owners
+
+_NS_INODE = re.compile(r"net:\[(\d+)\]")
+# docker-<id>.scope, /docker/<id>, libpod-<id>.scope, cri-containerd-<id>.scope, ...
+_CONTAINER_ID = re.compile(r"(?:docker|libpod|containerd|crio|podman)[-/:]([0-9a-f]{64})")
+
+
+def namespace_of(pid: int | str, proc_root: Path = PROC_ROOT) -> int | None:
+    """Return the network namespace inode of a process, if readable."""
+    try:
+        match = _NS_INODE.match(os.readlink(proc_root / str(pid) / "ns" / "net"))
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+
+def list_namespaces(proc_root: Path = PROC_ROOT) -> dict[int, list[int]]:
+    """
+    Group readable processes by network namespace.
+
+    Returns:
+        Namespace inode -> sorted member PIDs.
+    """
+    namespaces: dict[int, list[int]] = {}
+    try:
+        entries = os.listdir(proc_root)
+    except OSError:
+        return namespaces
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        ns = namespace_of(entry, proc_root)
+        if ns is not None:
+            namespaces.setdefault(ns, []).append(int(entry))
+    for pids in namespaces.values():
+        pids.sort()
+    return namespaces
+
+
+def container_id(pid: int, proc_root: Path = PROC_ROOT) -> str | None:
+    """Return the container id from a process's cgroup path, if it has one."""
+    try:
+        text = (proc_root / str(pid) / "cgroup").read_text()
+    except OSError:
+        return None
+    match = _CONTAINER_ID.search(text)
+    return match.group(1) if match else None
+
+
+class _Namespace:
+    """What is remembered about one namespace while its member PIDs stay the same."""
+
+    def __init__(self, pids: list[int]):
+        self.pids = frozenset(pids)
+        self.owners: dict[int, int] = {}  # Socket inode -> member PID
+        self.unowned: set[int] = set()  # Inodes no readable member held at the last walk
+        self.names: dict[int, str] = {}
+        self.containers: dict[int, str | None] = {}
+        self.fallback: list[str | None] = []  # Namespace-wide container id, looked up once
+
+
+class NamespaceScanner:
+    """
+    Scans sockets in every network namespace other than our own.
+
+    Each namespace's socket tables are read on every scan, in parallel. The
+    socket owners, process names and container ids are cached until the set
+    of PIDs in the namespace changes; the members' fd directories are only
+    walked again when a socket with an unknown inode appears.
+    """
+
+    def __init__(self, proc_root: Path = PROC_ROOT, max_workers: int = 4,
+                 name_resolver: Callable[[int], str] | None = None):
+        self.proc_root = Path(proc_root)
+        self.max_workers = max_workers
+        self._name_resolver = name_resolver
+        self._cache: dict[int, _Namespace] = {}
+
+    @property
+    def own_namespace(self) -> int | None:
+        return namespace_of("self", self.proc_root)
+
+    def scan(self) -> list[PortInfo]:
+        """Return the sockets of all foreign namespaces, tagged with namespace and container."""
+        own = self.own_namespace
+        namespaces = {ns: pids for ns, pids in list_namespaces(self.proc_root).items() if ns != own}
+
+        # Forget namespaces that no longer exist, and those whose members changed
+        for ns in list(self._cache):
+            if ns not in namespaces or self._cache[ns].pids != frozenset(namespaces[ns]):
+                del self._cache[ns]
+        for ns, pids in namespaces.items():
+            if ns not in self._cache:
+                self._cache[ns] = _Namespace(pids)
+
+        ports: list[PortInfo] = []
+        if not namespaces:
+            return ports
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="netns-scan") as executor:
+            for rows in executor.map(lambda ns: self._scan_namespace(ns, namespaces[ns]), namespaces):
+                ports.extend(rows)
+        return ports
+
+    def _scan_namespace(self, ns: int, pids: list[int]) -> list[PortInfo]:
+        """Read one namespace's sockets through its first readable member."""
+        rows: list[tuple] = []
+        for pid in pids:
+            rows = read_socket_table(pid, self.proc_root)
+            if rows:
+                break
+        if not rows:
+            return []
+
+        state = self._cache[ns]
+        inodes = {row[0] for row in rows if row[0]}
+        if inodes - state.owners.keys() - state.unowned:
+            state.owners = socket_owners(pids, self.proc_root)
+            state.unowned = inodes - state.owners.keys()
+        ports = []
+        for inode, protocol, local_ip, local_port, remote_ip, remote_port, status in rows:
+            pid = state.owners.get(inode, 0)
+            if pid not in state.names:
+                state.names[pid] = self._process_name(pid)
+                container = container_id(pid, self.proc_root) if pid else None
+                if container is None:
+                    if not state.fallback:
+                        state.fallback.append(self._namespace_container(pids))
+                    container = state.fallback[0]
+                state.containers[pid] = container
+            ports.append(PortInfo(
+                local_port=local_port,
+                local_address=local_ip,
+                remote_port=remote_port,
+                remote_address=remote_ip,
+                pid=pid,
+                process_name=state.names[pid],
+                status=status,
+                protocol=protocol,
+                namespace=ns,
+                container_id=state.containers[pid],
+            ))
+        return ports
+
+    def _namespace_container(self, pids: list[int]) -> str | None:
+        """Container id for sockets whose owner could not be found."""
+        for pid in pids:
+            found = container_id(pid, self.proc_root)
+            if found:
+                return found
+        return None
+
+    def _process_name(self, pid: int) -> str:
+        if not pid:
+            return "Unknown"
+        if self._name_resolver:
+            return self._name_resolver(pid)
+        try:
+            return (self.proc_root / str(pid) / "comm").read_text().strip() or "Unknown"
+        except OSError:
+            return "Unknown"
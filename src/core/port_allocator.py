@@ -0,0 +1,284 @@
+"""
+PortAllocator module - Hands out free local ports with short-lived reservations.
+"""
+
+import heapq
+import json
+import socket
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.core.port_scanner import PortScanner
+
+# Reservations shared by every PortPilot process of the user (CLI and tray)
+RESERVATIONS_PATH = Path.home() / ".portpilot" / "reservations.json"
+
+
+@contextmanager
+def _locked(f) -> Iterator[None]:
+    """Hold an exclusive lock on an open file (blocks until it is free)."""
+    if sys.platform == "win32":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class PortAllocator:
+    """
+    Allocates free local ports from a bitmap snapshot of bound ports.
+
+    The snapshot comes from PortScanner.used_port_bitmap() and is refreshed
+    at most every `snapshot_ttl` seconds. Allocated ports are reserved for
+    `reservation_ttl` seconds so concurrent callers never receive the same
+    port while the first caller is still binding it.
+
+    Reservations are per allocator unless `reservation_file` is given; then
+    they are also recorded in that file under an exclusive lock, so other
+    processes using the same file (e.g. `portpilot alloc` and the tray)
+    skip them too.
+    """
+
+    DEFAULT_RANGE = (20000, 30000)
+
+    def __init__(self, port_scanner: PortScanner | None = None,
+                 port_range: tuple[int, int] = DEFAULT_RANGE,
+                 reservation_ttl: float = 30.0,
+                 snapshot_ttl: float = 2.0,
+                 reservation_file: Path | None = None):
+        self.port_scanner = port_scanner
+        self.reservation_file = reservation_file
+        self.port_range = port_range
+        self.reservation_ttl = reservation_ttl
+        self.snapshot_ttl = snapshot_ttl
+        self._lock = threading.Lock()
+        self._snapshot = bytearray(8192)  # Ports bound according to the scanner
+        self._used = bytearray(8192)  # Snapshot plus active reservations
+        self._snapshot_time: float | None = None
+        self._reservations: dict[int, float] = {}  # port -> expiry
+        self._expiry_heap: list[tuple[float, int]] = []
+        self._cursor: int | None = None
+
+    def allocate(self, count: int = 1, contiguous: bool = False,
+                 port_range: tuple[int, int] | None = None,
+                 verify: bool = True,
+                 exclude: Iterable[int] = ()) -> list[int]:
+        """
+        Allocate and reserve free ports.
+
+        Args:
+            count: Number of ports wanted.
+            contiguous: If True, return `count` consecutive ports.
+            port_range: Inclusive (low, high) range; defaults to `port_range`.
+            verify: Check that every port can actually be bound before returning it.
+            exclude: Additional ports that must not be returned.
+
+        Returns:
+            The allocated ports. Fewer than `count` (or none, when contiguous)
+            are returned if the range is exhausted.
+        """
+        low, high = port_range or self.port_range
+        excluded = set(exclude)
+
+        with self._lock, self._shared_reservations() as shared:
+            # Ports reserved by other allocators sharing the file
+            excluded.update(port for port in shared if port not in self._reservations)
+            now = time.monotonic()
+            self._expire(now)
+            if (self._snapshot_time is None
+                    or now - self._snapshot_time >= self.snapshot_ttl):
+                self._refresh_snapshot(now)
+
+            if contiguous:
+                ports = self._allocate_run(count, low, high, excluded, verify)
+            else:
+                ports = self._allocate_scattered(count, low, high, excluded, verify)
+
+            expiry = now + self.reservation_ttl
+            shared_expiry = time.time() + self.reservation_ttl
+            for port in ports:
+                self._reservations[port] = expiry
+                heapq.heappush(self._expiry_heap, (expiry, port))
+                self._set(self._used, port)
+                shared[port] = shared_expiry
+            return ports
+
+    def release(self, ports: Iterable[int]) -> None:
+        """Drop the reservation on ports that are no longer needed."""
+        with self._lock, self._shared_reservations() as shared:
+            for port in ports:
+                if self._reservations.pop(port, None) is not None:
+                    self._clear_reservation_bit(port)
+                    shared.pop(port, None)
+
+    def reserved(self) -> list[int]:
+        """Return the ports currently reserved."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return sorted(self._reservations)
+
+    def invalidate(self) -> None:
+        """Force the next allocation to take a fresh snapshot."""
+        with self._lock:
+            self._snapshot_time = None
+
+    @contextmanager
+    def _shared_reservations(self) -> Iterator[dict[int, float]]:
+        """
+        Yield the unexpired reservations of `reservation_file` (port -> wall-clock
+        expiry) with the file locked, and write back any changes made to them.
+        """
+        if self.reservation_file is None:
+            yield {}
+            return
+        self.reservation_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.reservation_file, "a+") as f, _locked(f):
+            f.seek(0)
+            try:
+                stored = {int(port): float(expiry) for port, expiry in json.loads(f.read() or "{}").items()}
+            except (ValueError, AttributeError):
+                stored = {}  # Damaged file: start over
+            now = time.time()
+            shared = {port: expiry for port, expiry in stored.items() if expiry > now}
+            before = dict(shared)
+            yield shared
+            if shared != before or len(shared) != len(stored):
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({str(port): expiry for port, expiry in shared.items()}))
+
+    @staticmethod
+    def verify_bindable(ports: Iterable[int], host: str = "127.0.0.1") -> set[int]:
+        """
+        Return the subset of ports that can be bound on `host`.
+
+        All sockets are held open until the whole batch has been tried.
+        """
+        bindable = set()
+        sockets = []
+        try:
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sockets.append(sock)
+                try:
+                    sock.bind((host, port))
+                    bindable.add(port)
+                except OSError:
+                    pass
+        finally:
+            for sock in sockets:
+                sock.close()
+        return bindable
+
+    def _refresh_snapshot(self, now: float) -> None:
+        """Rebuild the used-port bitmap from a new scan."""
+        if self.port_scanner is not None:
+            self.port_scanner.scan()
+            self._snapshot = self.port_scanner.used_port_bitmap()
+        self._used = bytearray(self._snapshot)
+        for port in self._reservations:
+            self._set(self._used, port)
+        self._snapshot_time = now
+
+    def _expire(self, now: float) -> None:
+        """Drop reservations whose TTL has elapsed."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expiry, port = heapq.heappop(heap)
+            if self._reservations.get(port) == expiry:
+                del self._reservations[port]
+                self._clear_reservation_bit(port)
+
+    def _clear_reservation_bit(self, port: int) -> None:
+        if not self._is_set(self._snapshot, port):
+            self._used[port >> 3] &= ~(1 << (port & 7)) & 0xFF
+
+    def _allocate_scattered(self, count: int, low: int, high: int,
+                            excluded: set[int], verify: bool) -> list[int]:
+        """Collect free ports until `count` verified ports are found."""
+        ports: list[int] = []
+        while len(ports) < count:
+            candidates = self._find_scattered(count - len(ports), low, high,
+                                              excluded | set(ports))
+            if not candidates:
+                break
+            if verify:
+                candidates = self._drop_unbindable(candidates)
+            ports.extend(candidates)
+        return ports
+
+    def _allocate_run(self, count: int, low: int, high: int,
+                      excluded: set[int], verify: bool) -> list[int]:
+        """Find a run of free ports, retrying past any port that fails to bind."""
+        while True:
+            run = self._find_run(count, low, high, excluded)
+            if not run or not verify or len(self._drop_unbindable(run)) == len(run):
+                return run
+
+    def _drop_unbindable(self, ports: list[int]) -> list[int]:
+        """Filter out ports bound since the snapshot, marking them as used."""
+        bindable = self.verify_bindable(ports)
+        for port in ports:
+            if port not in bindable:
+                self._set(self._snapshot, port)
+                self._set(self._used, port)
+        return [p for p in ports if p in bindable]
+
+    def _find_scattered(self, count: int, low: int, high: int,
+                        excluded: set[int]) -> list[int]:
+        """Next-fit search for free ports, continuing after the last allocation."""
+        ports: list[int] = []
+        if count <= 0 or high < low:
+            return ports
+        span = high - low + 1
+        start = self._cursor if self._cursor is not None and low <= self._cursor <= high else low
+        used = self._used
+        offset = 0
+        while offset < span and len(ports) < count:
+            port = low + (start - low + offset) % span
+            byte = used[port >> 3]
+            if byte == 0xFF and port & 7 == 0 and port + 7 <= high:
+                # Whole byte in use, skip ahead 8 ports
+                offset += 8
+                continue
+            if not byte & (1 << (port & 7)) and port not in excluded:
+                ports.append(port)
+            offset += 1
+        if ports:
+            self._cursor = ports[-1] + 1
+        return ports
+
+    def _find_run(self, count: int, low: int, high: int, excluded: set[int]) -> list[int]:
+        """First-fit search for `count` consecutive free ports."""
+        run_start = low
+        port = low
+        while port <= high:
+            if self._is_set(self._used, port) or port in excluded:
+                run_start = port + 1
+            elif port - run_start + 1 == count:
+                return list(range(run_start, port + 1))
+            port += 1
+        return []
+
+    @staticmethod
+    def _set(bitmap: bytearray, port: int) -> None:
+        bitmap[port >> 3] |= 1 << (port & 7)
+
+    @staticmethod
+    def _is_set(bitmap: bytearray, port: int) -> bool:
+        return bool(bitmap[port >> 3] & (1 << (port & 7)))
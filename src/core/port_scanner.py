@@ -2,10 +2,34 @@
 PortScanner module - Maps ports to processes using psutil.
 """
 
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
 from dataclasses import dataclass
 
 import psutil
 
+from src.core import metrics
+from src.core.scan_profile import ScanProfile
+from src.core.tracing import traced
+
+
+@dataclass
+class TcpStats:
+    """Kernel tcp_info for one TCP socket; see PortScanner(tcp_info=True)."""
+    rtt_us: int = 0  # Smoothed round-trip time
+    rtt_var_us: int = 0
+    retransmits: int = 0  # Unrecovered retransmission timeouts right now
+    total_retrans: int = 0  # Segments retransmitted over the connection's lifetime
+    # Bytes waiting to be read / sent; for a listener, the accept queue length and its limit
+    recv_queue: int = 0
+    send_queue: int = 0
+    bytes_acked: int = 0
+    bytes_received: int = 0
+
 
 @dataclass
 class PortInfo:
@@ -18,6 +42,25 @@ class PortInfo:
     process_name: str
     status: str
     protocol: str  # 'tcp' or 'udp'
+    namespace: int | None = None  # Network namespace inode; None for our own namespace
+    container_id: str | None = None
+    tcp: TcpStats | None = None  # Only filled in with PortScanner(tcp_info=True)
+
+
+# (protocol, local_address, local_port, remote_address, remote_port)
+Endpoint = tuple[str, str, int, str | None, int | None]
+
+
+@dataclass
+class PortDiff:
+    """Sockets that appeared or disappeared between two snapshots."""
+    added: list[PortInfo]
+    removed: list[PortInfo]
+    source: str = "scan"  # "scan" or "close_event"
+    generation: int = 0  # Snapshot generation this diff leads to, see PortScanner.get_snapshot()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
 
 
 class PortScanner:
@@ -25,43 +68,89 @@ class PortScanner:
     Scans and maps active network ports to their processes.
 
     Uses psutil.net_connections() to get port-to-PID mappings,
-    then resolves PIDs to process names.
+    then resolves PIDs to process names. On Linux, `parallel_inodes`
+    replaces psutil with a direct /proc reader (see procfs.InodeIndex).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, namespaces: bool = False, parallel_inodes: bool = False,
+                 tcp_info: bool = False, unix_sockets: bool = False,
+                 raw_sockets: bool = False) -> None:
+        """
+        Args:
+            namespaces: Also scan other network namespaces, e.g. containers (Linux only).
+            parallel_inodes: Read /proc directly and resolve socket inodes with a
+                persistent, thread-sharded index instead of psutil (Linux only).
+            tcp_info: Attach RTT, retransmit and queue statistics to TCP sockets in
+                our namespace from one sock_diag dump per scan (Linux only).
+            unix_sockets: Also list listening Unix domain sockets (Linux only).
+            raw_sockets: Also list raw IP sockets (Linux only).
+
+        Unix and raw sockets are kept apart from the inet snapshot (see
+        get_unix_sockets()), so port lookups, the port index and diffs are
+        unaffected by them.
+        """
         self._cache: list[PortInfo] = []
+        self._port_index: dict[int, list[PortInfo]] = {}
+        self._generation = 0  # Bumped whenever _cache is replaced
+        self._namespace_scanner = None
+        self._inode_index = None
+        self._subscribers: list[Callable[[PortDiff], None]] = []
+        # Guards _cache/_port_index between scans and close events from other threads
+        self._lock = threading.Lock()
+        self._watcher = None  # PortWatcher, created by the first wait_for_*() call
+        self.tcp_info = tcp_info and sys.platform.startswith("linux")
+        self.unix_sockets = unix_sockets and os.path.exists("/proc/self/net/unix")
+        self.raw_sockets = raw_sockets and os.path.exists("/proc/self/net/raw")
+        self._other_cache: list[PortInfo] = []
+        self._other_index = None  # InodeIndex for Unix/raw sockets when the psutil scanner is used
+        if parallel_inodes and sys.platform.startswith("linux") and os.path.exists("/proc/self/net/tcp"):
+            from src.core.procfs import InodeIndex
+            self._inode_index = InodeIndex()
+        if namespaces and sys.platform.startswith("linux"):
+            from src.core.netns import NamespaceScanner
+            self._namespace_scanner = NamespaceScanner(name_resolver=self._get_process_name)
 
-    def scan(self) -> list[PortInfo]:
+    @traced("PortScanner.scan")
+    def scan(self, profile: ScanProfile | None = None) -> list[PortInfo]:
         """
         Scan all active network connections and return port information.
 
+        Args:
+            profile: If given, filled in with per-phase timings; see scan_profile.
+
         Returns:
             List of PortInfo objects for all listening/established connections.
         """
-        ports = []
+        start = time.perf_counter()
+        ports: list[PortInfo] = []
+        # This scan's PID -> name table; names are looked up once per PID
+        names: dict[int | None, str] = {}
+        other: list[PortInfo] = []
 
         try:
-            connections = psutil.net_connections(kind='inet')
-
-            for conn in connections:
-                # Skip connections without local address
-                if not conn.laddr:
-                    continue
-
-                # Get process name
-                process_name = self._get_process_name(conn.pid)
-
-                port_info = PortInfo(
-                    local_port=conn.laddr.port,
-                    local_address=conn.laddr.ip,
-                    remote_port=conn.raddr.port if conn.raddr else None,
-                    remote_address=conn.raddr.ip if conn.raddr else None,
-                    pid=conn.pid or 0,
-                    process_name=process_name,
-                    status=conn.status,
-                    protocol='tcp' if conn.type == 1 else 'udp'
-                )
-                ports.append(port_info)
+            if self._inode_index is not None:
+                ports, skipped = self._scan_procfs(names, profile)
+            else:
+                ports, skipped = self._scan_psutil(names, profile)
+
+            if self._namespace_scanner is not None:
+                if profile:
+                    profile.begin("namespaces")
+                ports.extend(self._namespace_scanner.scan())
+
+            if self.tcp_info:
+                if profile:
+                    profile.begin("tcp_info")
+                self._attach_tcp_info(ports)
+
+            if self.unix_sockets or self.raw_sockets:
+                if profile:
+                    profile.begin("other_sockets")
+                other = self._other_cache = self._scan_other_sockets(names)
+
+            if profile:
+                profile.rows = len(ports)
+                profile.skipped = skipped
 
         except psutil.AccessDenied:
             # May need admin privileges on some systems
@@ -69,16 +158,322 @@ class PortScanner:
         except Exception as e:
             print(f"Error scanning ports: {e}")
 
-        self._cache = ports
+        if profile:
+            profile.begin("indexing")
+        port_index = self._build_port_index(ports)
+        with self._lock:
+            previous = self._cache
+            self._cache = ports
+            self._port_index = port_index
+            self._generation += 1
+            generation = self._generation
+        # Misses are the psutil lookups actually made; every other row with an owner
+        # read its name from the table. Namespace scans keep their own table and are not counted.
+        misses = sum(1 for pid in names if pid)
+        hits = sum(1 for entry in ports if entry.pid and entry.namespace is None)
+        hits += sum(1 for entry in other if entry.pid)
+        hits -= misses
+        if profile:
+            profile.finish()
+            profile.name_misses = misses
+            profile.name_hits = hits
+        self._record_metrics(ports, misses, hits, time.perf_counter() - start)
+        if self._subscribers:
+            diff = self.diff(previous, ports)
+            diff.generation = generation
+            self._publish(diff)
         return ports
 
+    def _attach_tcp_info(self, ports: list[PortInfo]) -> None:
+        """Fill in PortInfo.tcp from a single sock_diag dump."""
+        from src.core.sock_diag import dump_tcp_info
+        try:
+            stats = dump_tcp_info()
+        except OSError as e:
+            print(f"tcp_info unavailable: {e}")
+            self.tcp_info = False
+            return
+        for entry in ports:
+            if entry.protocol == "tcp" and entry.namespace is None:
+                entry.tcp = stats.get((entry.local_address, entry.local_port,
+                                       entry.remote_address, entry.remote_port))
+
+    def subscribe(self, callback: Callable[[PortDiff], None]) -> Callable[[], None]:
+        """
+        Receive a PortDiff whenever the socket table changes.
+
+        Callbacks run on the thread that scanned or applied the event.
+
+        Returns:
+            A function that removes the subscription.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def apply_closed(self, endpoints: list[Endpoint]) -> PortDiff:
+        """
+        Drop sockets reported closed (e.g. by sock_diag) without a rescan.
+
+        Args:
+            endpoints: (protocol, local_address, local_port, remote_address, remote_port)
+                of each closed socket; remote fields are None for unconnected sockets.
+        """
+        closed = set(endpoints)
+        generation = 0
+        with self._lock:
+            removed = [
+                entry
+                for port in {endpoint[2] for endpoint in closed}
+                for entry in self._port_index.get(port, ())
+                if (entry.protocol, entry.local_address, entry.local_port,
+                    entry.remote_address, entry.remote_port) in closed
+            ]
+            if removed:
+                gone = {id(entry) for entry in removed}
+                self._cache = [entry for entry in self._cache if id(entry) not in gone]
+                for entry in removed:
+                    remaining = [e for e in self._port_index[entry.local_port] if id(e) not in gone]
+                    if remaining:
+                        self._port_index[entry.local_port] = remaining
+                    else:
+                        self._port_index.pop(entry.local_port, None)
+                self._generation += 1
+                generation = self._generation
+        diff = PortDiff([], removed, source="close_event", generation=generation)
+        if diff:
+            self._publish(diff)
+        return diff
+
+    def wait_for_listen(self, port: int, timeout: float | None = 30.0, protocol: str = "tcp"):
+        """
+        Block until something listens on `port`.
+
+        Concurrent waiters share one watcher thread, see PortWatcher.
+
+        Returns:
+            A WaitResult with the listener's PID and the elapsed time;
+            `ready` is False if `timeout` expired first.
+        """
+        return self._get_watcher().wait(port, listen=True, timeout=timeout, protocol=protocol)
+
+    def wait_for_free(self, port: int, timeout: float | None = 30.0, protocol: str = "tcp"):
+        """
+        Block until nothing listens on `port`.
+
+        Returns:
+            A WaitResult with the last owner seen (if any) and the elapsed time;
+            `ready` is False if `timeout` expired first.
+        """
+        return self._get_watcher().wait(port, listen=False, timeout=timeout, protocol=protocol)
+
+    def _get_watcher(self):
+        with self._lock:
+            if self._watcher is None:
+                from src.core.port_watch import PortWatcher
+                self._watcher = PortWatcher(self)
+            return self._watcher
+
+    def export_snapshot(self, path, compress: bool = False) -> int:
+        """
+        Save the last scan to a binary snapshot file (see src.core.snapshot).
+
+        Returns:
+            The number of sockets written.
+        """
+        from src.core.snapshot import write_snapshot
+        return write_snapshot(path, self._cache, compress=compress)
+
+    def import_snapshot(self, path) -> PortDiff:
+        """
+        Replace the cached scan with the sockets of a snapshot file.
+
+        Subscribers receive the difference, as after a scan.
+        """
+        from src.core.snapshot import read_snapshot
+        ports = read_snapshot(path)
+        port_index = self._build_port_index(ports)
+        with self._lock:
+            previous = self._cache
+            self._cache = ports
+            self._port_index = port_index
+            self._generation += 1
+            generation = self._generation
+        diff = self.diff(previous, ports)
+        diff.generation = generation
+        self._publish(diff)
+        return diff
+
+    @staticmethod
+    def socket_key(entry: PortInfo) -> tuple:
+        """Identity of a socket row across scans."""
+        return (entry.protocol, entry.local_address, entry.local_port,
+                entry.remote_address, entry.remote_port, entry.status, entry.pid)
+
+    @classmethod
+    def diff(cls, old: list[PortInfo], new: list[PortInfo]) -> PortDiff:
+        """Compare two snapshots; a state change counts as a removal plus an addition."""
+        # Lists per key: identical rows (e.g. SO_REUSEPORT sockets) are counted separately
+        unmatched: dict[tuple, list[PortInfo]] = {}
+        for entry in old:
+            unmatched.setdefault(cls.socket_key(entry), []).append(entry)
+        added = []
+        for entry in new:
+            same = unmatched.get(cls.socket_key(entry))
+            if same:
+                same.pop()
+            else:
+                added.append(entry)
+        return PortDiff(added=added, removed=[entry for same in unmatched.values() for entry in same])
+
+    def _publish(self, diff: PortDiff) -> None:
+        if not diff:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(diff)
+            except Exception as e:
+                print(f"Error in port diff subscriber: {e}")
+
+    def _scan_psutil(self, names: dict, profile: ScanProfile | None) -> tuple[list[PortInfo], int]:
+        """Scan with psutil.net_connections(); returns (ports, sockets skipped)."""
+        if profile:
+            profile.begin("enumeration")
+        connections = psutil.net_connections(kind='inet')
+
+        # Skip connections without local address
+        if profile:
+            profile.begin("filtering")
+        total = len(connections)
+        connections = [conn for conn in connections if conn.laddr]
+
+        # One name lookup per PID; a process usually owns several sockets
+        if profile:
+            profile.begin("name_lookup")
+        for pid in {conn.pid for conn in connections}:
+            names[pid] = self._get_process_name(pid)
+
+        if profile:
+            profile.begin("construction")
+        ports = [
+            PortInfo(
+                local_port=conn.laddr.port,
+                local_address=conn.laddr.ip,
+                remote_port=conn.raddr.port if conn.raddr else None,
+                remote_address=conn.raddr.ip if conn.raddr else None,
+                pid=conn.pid or 0,
+                process_name=names[conn.pid],
+                status=conn.status,
+                protocol='tcp' if conn.type == 1 else 'udp'
+            )
+            for conn in connections
+        ]
+        return ports, total - len(connections)
+
+    def _scan_procfs(self, names: dict, profile: ScanProfile | None) -> tuple[list[PortInfo], int]:
+        """Scan /proc directly, resolving inodes through the parallel index (Linux)."""
+        from src.core.procfs import read_socket_table
+
+        if profile:
+            profile.begin("enumeration")
+        rows = read_socket_table("self")
+
+        if profile:
+            profile.begin("inode_resolution")
+        owners = self._inode_index.resolve({row[0] for row in rows})
+
+        if profile:
+            profile.begin("name_lookup")
+        for pid in set(owners.values()):
+            names[pid] = self._get_process_name(pid)
+
+        if profile:
+            profile.begin("construction")
+        ports = []
+        for inode, protocol, local_ip, local_port, remote_ip, remote_port, status in rows:
+            pid = owners.get(inode, 0)
+            ports.append(PortInfo(local_port, local_ip, remote_port, remote_ip,
+                                  pid, names[pid] if pid else "Unknown", status, protocol))
+        return ports, 0
+
+    def _scan_other_sockets(self, names: dict) -> list[PortInfo]:
+        """Read Unix and raw sockets, resolving owners through the same inode index as /proc scans."""
+        from src.core.procfs import RAW_TABLES, InodeIndex, read_socket_table, read_unix_table
+
+        unix_rows = read_unix_table("self") if self.unix_sockets else []
+        raw_rows = read_socket_table("self", tables=RAW_TABLES) if self.raw_sockets else []
+        index = self._inode_index
+        if index is None:
+            if self._other_index is None:
+                self._other_index = InodeIndex()
+            index = self._other_index
+        owners = index.resolve({row[0] for row in unix_rows} | {row[0] for row in raw_rows})
+        for pid in set(owners.values()) - names.keys():
+            names[pid] = self._get_process_name(pid)
+
+        sockets = []
+        for inode, path, _sock_type, status in unix_rows:
+            pid = owners.get(inode, 0)
+            sockets.append(PortInfo(0, path, None, None, pid, names[pid] if pid else "Unknown",
+                                    status, "unix"))
+        for inode, _protocol, local_ip, ip_protocol, remote_ip, _remote, status in raw_rows:
+            pid = owners.get(inode, 0)
+            # local_port holds the IP protocol number (1 = ICMP)
+            sockets.append(PortInfo(ip_protocol, local_ip, None, remote_ip, pid,
+                                    names[pid] if pid else "Unknown", status, "raw"))
+        return sockets
+
+    @staticmethod
+    def _record_metrics(ports: list[PortInfo], misses: int, hits: int, duration: float) -> None:
+        """Update the scan metrics once per scan rather than once per row."""
+        metrics.SCAN_DURATION.observe(duration)
+        metrics.PROCESS_CACHE_MISSES.inc(misses)
+        metrics.PROCESS_CACHE_HITS.inc(hits)
+        metrics.SOCKETS.clear()
+        for state, count in Counter(p.status for p in ports).items():
+            metrics.SOCKETS.labels(state).set(count)
+
     def get_cached(self) -> list[PortInfo]:
         """Return the last scanned port list."""
         return self._cache
 
+    def get_snapshot(self) -> tuple[int, list[PortInfo]]:
+        """
+        Return the last scanned port list together with its generation.
+
+        Diffs published with a generation up to this one are already reflected
+        in the list, so a subscriber that starts from it can skip them.
+        """
+        with self._lock:
+            return self._generation, self._cache
+
     def find_by_port(self, port: int) -> list[PortInfo]:
-        """Find all connections using a specific port."""
-        return [p for p in self._cache if p.local_port == port]
+        """Find all connections using a specific port in our own network namespace."""
+        return list(self._port_index.get(port, ()))
+
+    def get_port_owner(self, port: int) -> PortInfo | None:
+        """
+        Return the socket bound to a local port in our own network namespace, if any.
+
+        Listening sockets are preferred over other connections on the same port.
+        """
+        entries = self._port_index.get(port)
+        if not entries:
+            return None
+        for entry in entries:
+            if entry.status == 'LISTEN':
+                return entry
+        return entries[0]
+
+    def used_port_bitmap(self) -> bytearray:
+        """
+        Return a 65536-bit bitmap of local ports in use in our own network namespace.
+
+        Bit `port % 8` of byte `port // 8` is set when the port is in use.
+        """
+        bitmap = bytearray(8192)
+        for port in self._port_index:
+            bitmap[port >> 3] |= 1 << (port & 7)
+        return bitmap
 
     def find_by_process(self, name: str) -> list[PortInfo]:
         """Find all connections for a process name (case-insensitive)."""
@@ -89,6 +484,34 @@ class PortScanner:
         """Get only ports in LISTEN status."""
         return [p for p in self._cache if p.status == 'LISTEN']
 
+    def get_unix_sockets(self) -> list[PortInfo]:
+        """
+        Return the listening/bound Unix sockets of the last scan (unix_sockets=True).
+
+        local_address is the socket path ("@name" for abstract sockets, "" if unnamed).
+        """
+        return [p for p in self._other_cache if p.protocol == "unix"]
+
+    def get_raw_sockets(self) -> list[PortInfo]:
+        """Return the raw sockets of the last scan (raw_sockets=True); local_port is the IP protocol."""
+        return [p for p in self._other_cache if p.protocol == "raw"]
+
+    @staticmethod
+    def _build_port_index(ports: list[PortInfo]) -> dict[int, list[PortInfo]]:
+        """
+        Group scanned connections by local port.
+
+        Sockets in other namespaces are left out: a port bound inside a
+        container does not occupy the same port on the host.
+        """
+        index: dict[int, list[PortInfo]] = {}
+        for port_info in ports:
+            if port_info.namespace is not None:
+                continue
+            index.setdefault(port_info.local_port, []).append(port_info)
+        return index
+
+    @traced("PortScanner._get_process_name")
     def _get_process_name(self, pid: int | None) -> str:
         """Get process name from PID."""
         if not pid:
@@ -0,0 +1,152 @@
+"""
+Waiting for ports to start or stop listening.
+
+All waiters on a PortScanner share one PortWatcher thread. It rescans at a
+short interval only while someone is waiting, and re-checks immediately
+whenever the scanner publishes a diff (a scan by the tray or dashboard, or a
+sock_diag close event), so many waiters cost one scan per interval.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from src.core.port_scanner import PortDiff, PortScanner
+
+
+@dataclass
+class WaitResult:
+    """Outcome of PortScanner.wait_for_listen() / wait_for_free()."""
+    port: int
+    ready: bool  # False if the timeout expired first
+    elapsed: float  # Seconds
+    pid: int | None = None  # The listener's owner, or for wait_for_free() the last owner seen
+    process_name: str | None = None
+
+
+class _Waiter:
+    def __init__(self, port: int, protocol: str, listen: bool):
+        self.port = port
+        self.protocol = protocol
+        self.listen = listen
+        self.start = time.monotonic()
+        self.done = threading.Event()
+        self.result: WaitResult | None = None
+        self.last_owner: tuple[int, str] | None = None
+
+
+class PortWatcher:
+    """
+    Shared watcher behind PortScanner's wait methods.
+
+    Args:
+        scanner: Scanner to rescan and subscribe to.
+        interval: Seconds between rescans while waiters are pending.
+    """
+
+    def __init__(self, scanner: PortScanner, interval: float = 0.25):
+        self.scanner = scanner
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._waiters: list[_Waiter] = []
+        self._thread: threading.Thread | None = None
+        self._changed = threading.Event()
+        self._rescan = False
+        # When the scanner's snapshot was last known to be current
+        self._snapshot_time = 0.0
+        self._unsubscribe = None
+
+    def wait(self, port: int, listen: bool, timeout: float | None = 30.0,
+             protocol: str = "tcp") -> WaitResult:
+        """
+        Block until `port` is listening (listen=True) or free, or `timeout` expires.
+
+        Args:
+            port: Local port.
+            listen: Wait for a listener rather than for the port to be released.
+            timeout: Seconds; None waits indefinitely.
+            protocol: "tcp" waits on LISTEN sockets, "udp" on bound sockets.
+        """
+        waiter = _Waiter(port, protocol, listen)
+        with self._lock:
+            self._waiters.append(waiter)
+            # The snapshot may be older than this call: have the next check rescan first
+            self._rescan = True
+            if self._thread is None:
+                self._unsubscribe = self.scanner.subscribe(self._on_diff)
+                self._thread = threading.Thread(target=self._run, name="port-watcher", daemon=True)
+                self._thread.start()
+        self._changed.set()
+
+        if not waiter.done.wait(timeout):
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if waiter.result is None:
+                owner = waiter.last_owner
+                return WaitResult(port, False, time.monotonic() - waiter.start,
+                                  owner[0] if owner else None, owner[1] if owner else None)
+        return waiter.result
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    def _on_diff(self, diff: PortDiff) -> None:
+        if diff.source != "scan" or threading.current_thread() is not self._thread:
+            self._snapshot_time = max(self._snapshot_time, time.monotonic())
+        self._changed.set()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    if self._unsubscribe:
+                        self._unsubscribe()
+                        self._unsubscribe = None
+                    return
+                rescan, self._rescan = self._rescan, False
+
+            if rescan:
+                started = time.monotonic()
+                try:
+                    self.scanner.scan()
+                except Exception as e:
+                    print(f"Error scanning ports for waiters: {e}")
+                else:
+                    self._snapshot_time = max(self._snapshot_time, started)
+            self._changed.clear()
+            self._check()
+            if not self._changed.wait(self.interval):
+                # Nothing else refreshed the snapshot in the meantime
+                with self._lock:
+                    self._rescan = True
+
+    def _check(self) -> None:
+        """Resolve every waiter whose condition holds in the current snapshot."""
+        now = time.monotonic()
+        with self._lock:
+            waiters = list(self._waiters)
+        resolved = []
+        for waiter in waiters:
+            if waiter.start > self._snapshot_time:
+                continue  # Registered after the snapshot was taken
+            owners = [entry for entry in self.scanner.find_by_port(waiter.port)
+                      if entry.protocol == waiter.protocol
+                      and (entry.status == "LISTEN" or waiter.protocol == "udp")]
+            if owners:
+                waiter.last_owner = (owners[0].pid, owners[0].process_name)
+            if bool(owners) != waiter.listen:
+                continue
+            owner = waiter.last_owner
+            waiter.result = WaitResult(waiter.port, True, now - waiter.start,
+                                       owner[0] if owner else None, owner[1] if owner else None)
+            resolved.append(waiter)
+
+        if resolved:
+            with self._lock:
+                self._waiters = [waiter for waiter in self._waiters if waiter not in resolved]
+            for waiter in resolved:
+                waiter.done.set()
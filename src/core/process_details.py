@@ -0,0 +1,221 @@
+"""
+Process details for the dashboard, fetched in batches and cached.
+
+fetch_details() reads everything PortPilot shows about a process inside one
+psutil oneshot() block, so shared /proc files are read once per process.
+ProcessDetailService runs those fetches on a worker thread for batches of
+PIDs and caches the results per (pid, create_time) for a short TTL. Fresh
+PIDs that are requested again have their create time re-read on the worker,
+so a reused PID is re-fetched in the next batch instead of showing another
+process's details until the TTL runs out.
+"""
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+import psutil
+
+# Cached processes before expired entries are dropped
+MAX_ENTRIES = 4096
+
+
+@dataclass
+class ProcessDetails:
+    """What the dashboard shows about one process; None where access was denied."""
+    pid: int
+    name: str = ""
+    status: str = ""
+    create_time: float = 0.0
+    cmdline: list[str] = field(default_factory=list)
+    username: str | None = None
+    cwd: str | None = None
+    memory_rss: int | None = None  # Bytes
+    children: int | None = None
+    open_files: int | None = None
+    error: str | None = None  # Set when the process could not be read at all
+
+
+def _field(getter: Callable[[], object]):
+    """Read one attribute, tolerating per-attribute permission errors (e.g. cwd of root's processes)."""
+    try:
+        return getter()
+    except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+        return None
+
+
+def child_counts() -> dict[int, int]:
+    """Number of children of every process, from one pass over the process table."""
+    return Counter(p.info["ppid"] for p in psutil.process_iter(["ppid"]))
+
+
+def _create_time(pid: int) -> float | None:
+    """Create time of the process now using `pid`, or None if there is none."""
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+def fetch_details(pid: int, children: int | None = None) -> ProcessDetails:
+    """
+    Read a process's details in a single oneshot() pass.
+
+    Args:
+        children: The process's child count, when the caller already has it
+            (see child_counts()). process.children() is not covered by
+            oneshot() and walks every process, so batches pass this in.
+    """
+    try:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            details = ProcessDetails(
+                pid=pid,
+                name=process.name(),
+                status=process.status(),
+                create_time=process.create_time(),
+            )
+            details.cmdline = _field(process.cmdline) or []
+            details.username = _field(process.username)
+            details.cwd = _field(process.cwd)
+            memory = _field(process.memory_info)
+            details.memory_rss = memory.rss if memory is not None else None
+            if children is None:
+                found = _field(process.children)
+                children = len(found) if found is not None else None
+            details.children = children
+            files = _field(process.open_files)
+            details.open_files = len(files) if files is not None else None
+        return details
+    except psutil.NoSuchProcess:
+        return ProcessDetails(pid=pid, error="Process not found")
+    except psutil.AccessDenied:
+        return ProcessDetails(pid=pid, error="Access denied")
+
+
+class ProcessDetailService:
+    """
+    Batched, cached process details.
+
+    Args:
+        ttl: Seconds a fetched result stays fresh.
+        on_ready: Called from the worker thread with each batch of new results.
+        fetch: Reads one process, given its child count when known; replaceable for tests.
+        count_children: Child counts for a whole batch; replaceable for tests.
+        create_time: Current create time of a PID, None if unused; replaceable for tests.
+        clock: Monotonic time source, for tests.
+    """
+
+    def __init__(self, ttl: float = 10.0,
+                 on_ready: Callable[[list[ProcessDetails]], None] | None = None,
+                 fetch: Callable[..., ProcessDetails] = fetch_details,
+                 count_children: Callable[[], dict[int, int]] = child_counts,
+                 create_time: Callable[[int], float | None] = _create_time,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.on_ready = on_ready
+        self._fetch = fetch
+        self._count_children = count_children
+        self._create_time = create_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (pid, create_time) -> (details, expiry)
+        self._cache: dict[tuple[int, float], tuple[ProcessDetails, float]] = {}
+        # pid -> create_time of the process last seen with that PID
+        self._current: dict[int, float] = {}
+        # Ordered PIDs to look at: True to fetch, False to only re-check the create time
+        self._queue: dict[int, bool] = {}
+        self._thread: threading.Thread | None = None
+        self.batches = 0
+
+    def get(self, pid: int) -> ProcessDetails | None:
+        """Return cached details for `pid`, even if stale; never blocks."""
+        with self._lock:
+            created = self._current.get(pid)
+            if created is None:
+                return None
+            cached = self._cache.get((pid, created))
+            return cached[0] if cached else None
+
+    def request(self, pids: Iterable[int]) -> None:
+        """
+        Queue PIDs whose details are missing or stale; on_ready fires when they are fetched.
+
+        Fresh PIDs are queued for a create-time check, and fetched again if
+        the PID now belongs to another process.
+        """
+        now = self._clock()
+        with self._lock:
+            for pid in pids:
+                if not pid or self._queue.get(pid):
+                    continue
+                created = self._current.get(pid)
+                cached = self._cache.get((pid, created)) if created is not None else None
+                if cached is None or cached[1] <= now:
+                    self._queue[pid] = True
+                elif created:  # Failures (create_time 0) have nothing to compare; they expire with the TTL
+                    self._queue[pid] = False
+            if self._queue and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="process-details", daemon=True)
+                self._thread.start()
+
+    def fetch_now(self, pid: int) -> ProcessDetails:
+        """Fetch (or return fresh cached) details on the calling thread."""
+        with self._lock:
+            created = self._current.get(pid)
+            cached = self._cache.get((pid, created)) if created is not None else None
+        if cached is not None and cached[1] > self._clock():
+            return cached[0]
+        details = self._fetch(pid)
+        self._store(details)
+        return details
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._thread = None
+                    return
+                queued = list(self._queue.items())
+                self._queue.clear()
+
+            batch = [pid for pid, fetch in queued if fetch or self._reused(pid)]
+            if not batch:
+                continue
+            counts = self._count_children()
+            results = [self._fetch(pid, counts.get(pid, 0)) for pid in batch]
+            for details in results:
+                self._store(details)
+            self.batches += 1
+            if self.on_ready:
+                try:
+                    self.on_ready(results)
+                except Exception as e:
+                    print(f"Error in process details callback: {e}")
+
+    def _store(self, details: ProcessDetails) -> None:
+        now = self._clock()
+        with self._lock:
+            previous = self._current.get(details.pid)
+            if previous is not None and previous != details.create_time:
+                self._cache.pop((details.pid, previous), None)  # PID reused or process gone
+            # Failures are cached too (under create_time 0), so dead PIDs are not re-read every refresh
+            self._current[details.pid] = details.create_time
+            self._cache[(details.pid, details.create_time)] = (details, now + self.ttl)
+            if len(self._cache) > MAX_ENTRIES:
+                self._prune(now)
+
+    def _reused(self, pid: int) -> bool:
+        """Whether `pid` no longer belongs to the process its cached details describe."""
+        with self._lock:
+            created = self._current.get(pid)
+        return self._create_time(pid) != created
+
+    def _prune(self, now: float) -> None:
+        for key, (_details, expiry) in list(self._cache.items()):
+            if expiry <= now:
+                del self._cache[key]
+                if self._current.get(key[0]) == key[1]:
+                    del self._current[key[0]]
@@ -2,10 +2,15 @@
 ProcessKiller module - Safely terminates processes by PID.
 """
 
+import time
+from dataclasses import asdict
 from enum import Enum
 
 import psutil
 
+from src.core import metrics
+from src.core.process_details import fetch_details
+
 
 class KillResult(Enum):
     """Result of a process kill attempt."""
@@ -35,6 +40,14 @@ class ProcessKiller:
         Returns:
             Tuple of (KillResult, message string).
         """
+        start = time.perf_counter()
+        result = ProcessKiller._kill(pid, force)
+        metrics.KILL_DURATION.labels(result[0].value).observe(time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    def _kill(pid: int, force: bool) -> tuple[KillResult, str]:
+        """Terminate a process; see kill()."""
         try:
             process = psutil.Process(pid)
             process_name = process.name()
@@ -75,16 +88,12 @@ class ProcessKiller:
 
     @staticmethod
     def get_process_info(pid: int) -> dict:
-        """Get detailed information about a process."""
-        try:
-            process = psutil.Process(pid)
-            return {
-                "pid": pid,
-                "name": process.name(),
-                "status": process.status(),
-                "create_time": process.create_time(),
-                "cmdline": process.cmdline(),
-                "username": process.username(),
-            }
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
+        """
+        Get detailed information about a process (see process_details.fetch_details).
+
+        Fields that could not be read are left out; "error" is only present on failure.
+        """
+        details = fetch_details(pid)
+        if details.error:
             return {"pid": pid, "error": "Unable to get process info"}
+        return {key: value for key, value in asdict(details).items() if value is not None}
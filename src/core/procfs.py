@@ -0,0 +1,320 @@
+"""
+Direct /proc readers for Linux socket scanning.
+
+read_socket_table() parses /proc/<pid>/net/{tcp,tcp6,udp,udp6} (or the raw
+socket tables), read_unix_table() parses /proc/<pid>/net/unix. InodeIndex
+maps socket inodes to PIDs by walking /proc/<pid>/fd, sharded across a
+thread pool (readlink and listdir release the GIL), and remembers each
+process's sockets so unchanged processes are not walked again.
+"""
+
+import os
+import re
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROC_ROOT = Path("/proc")
+
+# /proc/net/tcp state codes, named as psutil names them
+TCP_STATES = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2", "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT",
+    "09": "LAST_ACK", "0A": "LISTEN", "0B": "CLOSING",
+}
+
+# (file, protocol, family)
+SOCKET_TABLES = (
+    ("tcp", "tcp", socket.AF_INET),
+    ("tcp6", "tcp", socket.AF_INET6),
+    ("udp", "udp", socket.AF_INET),
+    ("udp6", "udp", socket.AF_INET6),
+)
+
+RAW_TABLES = (
+    ("raw", "raw", socket.AF_INET),
+    ("raw6", "raw", socket.AF_INET6),
+)
+
+# /proc/net/unix socket types and states
+UNIX_TYPES = {"0001": "stream", "0002": "dgram", "0005": "seqpacket"}
+UNIX_STATES = {"01": "UNCONNECTED", "02": "CONNECTING", "03": "CONNECTED", "04": "DISCONNECTING"}
+_UNIX_ACCEPTCON = 0x10000  # __SO_ACCEPTCON: a listening socket
+
+_SOCKET_INODE = re.compile(r"socket:\[(\d+)\]")
+
+
+def _decode_address(value: str, family: int) -> tuple[str, int]:
+    """Decode a /proc/net 'HEXADDR:HEXPORT' pair."""
+    address, port = value.split(":")
+    # The kernel prints each 32-bit word of the address as a number in host byte order
+    words = struct.unpack(f">{len(address) // 8}I", bytes.fromhex(address))
+    return socket.inet_ntop(family, struct.pack(f"={len(words)}I", *words)), int(port, 16)
+
+
+def read_socket_table(pid: int | str = "self", proc_root: Path = PROC_ROOT,
+                      tables: tuple = SOCKET_TABLES) -> list[tuple]:
+    """
+    Read every inet socket in the network namespace of `pid`.
+
+    Args:
+        tables: (file, protocol, family) tables to read; RAW_TABLES for raw sockets,
+            whose "port" is the IP protocol number.
+
+    Returns:
+        (inode, protocol, local_ip, local_port, remote_ip, remote_port, status)
+        tuples; remote fields are None for unconnected sockets.
+    """
+    rows = []
+    for name, protocol, family in tables:
+        try:
+            with open(proc_root / str(pid) / "net" / name) as f:
+                next(f, None)  # Header
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            local_ip, local_port = _decode_address(fields[1], family)
+            remote_ip, remote_port = _decode_address(fields[2], family)
+            if protocol == "tcp":
+                status = TCP_STATES.get(fields[3], fields[3])
+            else:
+                status = "NONE"
+            if not remote_port:
+                remote_ip = remote_port = None
+            rows.append((int(fields[9]), protocol, local_ip, local_port, remote_ip, remote_port, status))
+    return rows
+
+
+def read_unix_table(pid: int | str = "self", proc_root: Path = PROC_ROOT,
+                    servers_only: bool = True) -> list[tuple]:
+    """
+    Read the Unix domain sockets in the network namespace of `pid`.
+
+    Args:
+        servers_only: Keep only listening sockets and bound datagram sockets;
+            the connections accepted from them repeat the server's path.
+
+    Returns:
+        (inode, path, socket type, status) tuples; status is "LISTEN" for
+        listening sockets. Abstract socket names start with "@".
+    """
+    try:
+        with open(proc_root / str(pid) / "net" / "unix") as f:
+            next(f, None)  # Header
+            lines = f.readlines()
+    except OSError:
+        return []
+    rows = []
+    for line in lines:
+        fields = line.split(None, 7)
+        if len(fields) < 7:
+            continue
+        path = fields[7].rstrip("\n") if len(fields) > 7 else ""
+        listening = int(fields[3], 16) & _UNIX_ACCEPTCON
+        sock_type = UNIX_TYPES.get(fields[4], fields[4])
+        if servers_only and not listening and not (path and sock_type == "dgram" and fields[5] == "01"):
+            continue
+        status = "LISTEN" if listening else UNIX_STATES.get(fields[5], fields[5])
+        rows.append((int(fields[6]), path, sock_type, status))
+    return rows
+
+
+def pid_socket_fds(pid: int, proc_root: Path = PROC_ROOT) -> dict[int, str] | None:
+    """Return the socket inodes a process holds open, with an fd for each, or None if unreadable."""
+    # Plain string paths: this runs for every fd on the system
+    fd_dir = f"{proc_root}/{pid}/fd/"
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return None
+    inodes: dict[int, str] = {}
+    for fd in fds:
+        try:
+            match = _SOCKET_INODE.match(os.readlink(fd_dir + fd))
+        except OSError:
+            continue
+        if match:
+            inodes.setdefault(int(match.group(1)), fd)
+    return inodes
+
+
+def pid_sockets(pid: int, proc_root: Path = PROC_ROOT) -> list[int] | None:
+    """Return the socket inodes a process holds open, or None if unreadable."""
+    inodes = pid_socket_fds(pid, proc_root)
+    return list(inodes) if inodes is not None else None
+
+
+def socket_owners(pids: list[int], proc_root: Path = PROC_ROOT) -> dict[int, int]:
+    """Map socket inodes to the first of `pids` holding them open."""
+    owners: dict[int, int] = {}
+    for pid in pids:
+        for inode in pid_sockets(pid, proc_root) or ():
+            owners.setdefault(inode, pid)
+    return owners
+
+
+def list_pids(proc_root: Path = PROC_ROOT) -> list[int]:
+    try:
+        return [int(entry) for entry in os.listdir(proc_root) if entry.isdigit()]
+    except OSError:
+        return []
+
+
+class InodeIndex:
+    """
+    Persistent socket inode -> PID index.
+
+    Each process is fingerprinted by the stat of its /proc/<pid> and
+    /proc/<pid>/fd directories (the fd directory's size is its open-fd count
+    on Linux 6.2+, and always 0 before). Processes whose fingerprint is
+    unchanged are not walked again, so the fingerprint is only a hint:
+
+    - A cached owner is confirmed by reading back the fd it was found on;
+      if that fd no longer holds the socket, the process is walked again.
+    - If a socket has no owner after that, the skipped processes are walked
+      once more, so a process that swapped or received a socket is still
+      picked up.
+    - Processes whose fd directory cannot be read (other users' processes,
+      without root) are remembered and not retried until their fingerprint
+      changes.
+    """
+
+    def __init__(self, proc_root: Path = PROC_ROOT, max_workers: int | None = None,
+                 shard_size: int = 64):
+        self.proc_root = Path(proc_root)
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.shard_size = shard_size
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._fingerprints: dict[int, tuple] = {}
+        self._sockets: dict[int, dict[int, str]] = {}  # pid -> {inode: fd}
+        self._owners: dict[int, int] = {}
+        self._unreadable: dict[int, tuple] = {}  # pid -> fingerprint when its fds could not be read
+        # Inodes no readable process owned after a full walk (e.g. other users' sockets)
+        self._unowned: set[int] = set()
+        # Processes walked and skipped by the last resolve(), for profiling
+        self.walked = 0
+        self.skipped = 0
+
+    def resolve(self, inodes: set[int]) -> dict[int, int]:
+        """
+        Return an inode -> PID mapping covering as many of `inodes` as possible.
+
+        Args:
+            inodes: Socket inodes from the kernel tables; 0 (no owner) is ignored.
+        """
+        with self._lock:
+            pids = list_pids(self.proc_root)
+            for pid in (set(self._fingerprints) | set(self._unreadable)) - set(pids):
+                self._forget(pid)
+
+            changed, skipped = self._walk(pids, force=False, wanted=inodes)
+            self.walked, self.skipped = changed, len(skipped)
+
+            missing = {inode for inode in inodes if inode and inode not in self._owners}
+            if missing - self._unowned and skipped:
+                changed, _ = self._walk(skipped, force=True)
+                self.walked += changed
+                self.skipped -= changed
+                missing = {inode for inode in missing if inode not in self._owners}
+            self._unowned = missing
+            owners = self._owners
+            return {inode: owners[inode] for inode in inodes if inode in owners}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fingerprints.clear()
+            self._sockets.clear()
+            self._owners.clear()
+            self._unowned.clear()
+            self._unreadable.clear()
+
+    def _walk(self, pids: list[int], force: bool,
+              wanted: set[int] | None = None) -> tuple[int, list[int]]:
+        """
+        Walk the fd directories of changed processes in parallel shards.
+
+        Args:
+            wanted: Inodes whose cached owners are confirmed; an owner that no
+                longer holds one is walked again.
+        """
+        shards = [pids[i:i + self.shard_size] for i in range(0, len(pids), self.shard_size)]
+        if len(shards) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="inode-index")
+            results = list(self._executor.map(lambda shard: self._walk_shard(shard, force, wanted),
+                                              shards))
+        else:
+            results = [self._walk_shard(shard, force, wanted) for shard in shards]
+
+        changed = 0
+        skipped: list[int] = []
+        for updates, shard_skipped in results:
+            skipped.extend(shard_skipped)
+            for pid, fingerprint, inodes in updates:
+                changed += 1
+                self._forget(pid)
+                if inodes is None:
+                    if fingerprint is not None:
+                        self._unreadable[pid] = fingerprint
+                    continue
+                self._fingerprints[pid] = fingerprint
+                self._sockets[pid] = inodes
+                for inode in inodes:
+                    self._owners.setdefault(inode, pid)
+        return changed, skipped
+
+    def _walk_shard(self, pids: list[int], force: bool,
+                    wanted: set[int] | None) -> tuple[list, list[int]]:
+        """Runs on a worker thread; only reads shared state."""
+        updates = []
+        skipped = []
+        for pid in pids:
+            fingerprint = self._fingerprint(pid)
+            if fingerprint is None:
+                updates.append((pid, None, None))
+            elif self._unreadable.get(pid) == fingerprint:
+                continue  # Could not be read last time either
+            elif not force and self._fingerprints.get(pid) == fingerprint and self._holds(pid, wanted):
+                skipped.append(pid)
+            else:
+                updates.append((pid, fingerprint, pid_socket_fds(pid, self.proc_root)))
+        return updates, skipped
+
+    def _fingerprint(self, pid: int) -> tuple | None:
+        base = f"{self.proc_root}/{pid}"
+        try:
+            proc_stat = os.stat(base)
+            fd_stat = os.stat(base + "/fd")
+        except OSError:
+            return None
+        return (proc_stat.st_ctime_ns, fd_stat.st_size, fd_stat.st_mtime_ns)
+
+    def _holds(self, pid: int, wanted: set[int] | None) -> bool:
+        """Whether `pid` still has each wanted socket it owns open on the fd it was found on."""
+        if not wanted:
+            return True
+        fd_dir = f"{self.proc_root}/{pid}/fd/"
+        owners = self._owners
+        for inode, fd in self._sockets[pid].items():
+            if inode in wanted and owners.get(inode) == pid:
+                try:
+                    if os.readlink(fd_dir + fd) != f"socket:[{inode}]":
+                        return False
+                except OSError:
+                    return False
+        return True
+
+    def _forget(self, pid: int) -> None:
+        self._fingerprints.pop(pid, None)
+        self._unreadable.pop(pid, None)
+        for inode in self._sockets.pop(pid, ()):
+            if self._owners.get(inode) == pid:
+                del self._owners[inode]
@@ -0,0 +1,131 @@
+"""
+Incremental connection rollups - counts per process, local port, remote host and state.
+
+PortRollup subscribes to a PortScanner's diff stream and adjusts its counters
+by one per added or removed socket, so the totals never require walking the
+whole snapshot. Each dimension also files its keys by count, with the
+distinct positive counts kept sorted; since counts only move by one, a key
+changes level in O(1) plus a bisect, and a top-N query reads levels from the
+highest down and stops after N keys instead of ranking every key.
+
+Diffs from different threads (scans, sock_diag events) may arrive out of
+order, so counts are signed and may dip below zero briefly; keys are only
+hidden from queries while their count is not positive.
+"""
+
+import bisect
+import threading
+from collections import Counter
+from collections.abc import Callable, Hashable, Iterable
+
+from src.core.port_scanner import PortDiff, PortInfo, PortScanner
+
+# Dimension -> key of a socket in it; None leaves the socket out
+DIMENSIONS: dict[str, Callable[[PortInfo], Hashable | None]] = {
+    "process": lambda entry: (entry.pid, entry.process_name),
+    "local_port": lambda entry: entry.local_port,
+    "remote_host": lambda entry: entry.remote_address,
+    "state": lambda entry: entry.status,
+}
+
+
+class PortRollup:
+    """
+    Live aggregate counts over a scanner's snapshot.
+
+    Args:
+        scanner: Scanner to follow. The rollup starts from its current snapshot.
+    """
+
+    def __init__(self, scanner: PortScanner | None = None):
+        self._lock = threading.Lock()
+        self._counts: dict[str, Counter] = {name: Counter() for name in DIMENSIONS}
+        # Dimension -> positive count -> keys with that count (dicts keep arrival order)
+        self._levels: dict[str, dict[int, dict[Hashable, None]]] = {name: {} for name in DIMENSIONS}
+        # Dimension -> the positive counts present in _levels, ascending
+        self._ranks: dict[str, list[int]] = {name: [] for name in DIMENSIONS}
+        self.total = 0
+        self._generation = 0  # Snapshot generation the counts started from
+        self._unsubscribe: Callable[[], None] | None = None
+        if scanner is not None:
+            self.attach(scanner)
+
+    def attach(self, scanner: PortScanner) -> None:
+        """Follow `scanner`, starting from its current snapshot."""
+        self.detach()
+        with self._lock:
+            # Subscribe before reading the snapshot so no diff falls in between;
+            # diffs already reflected in the snapshot are skipped by generation
+            self._unsubscribe = scanner.subscribe(self.apply)
+            self._generation, ports = scanner.get_snapshot()
+            self._reset(ports)
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def apply(self, diff: PortDiff) -> None:
+        """Update the counts by one per added or removed socket."""
+        with self._lock:
+            if diff.generation and diff.generation <= self._generation:
+                return  # Already part of the snapshot we started from
+            self._add(diff.removed, -1)
+            self._add(diff.added, 1)
+
+    def top(self, dimension: str, n: int = 10) -> list[tuple[Hashable, int]]:
+        """Return the `n` keys of `dimension` with the most sockets, largest first."""
+        result: list[tuple[Hashable, int]] = []
+        with self._lock:
+            levels = self._levels[dimension]
+            for value in reversed(self._ranks[dimension]):
+                for key in levels[value]:
+                    if len(result) == n:
+                        return result
+                    result.append((key, value))
+        return result
+
+    def count(self, dimension: str, key: Hashable) -> int:
+        with self._lock:
+            return max(self._counts[dimension].get(key, 0), 0)
+
+    def _reset(self, ports: Iterable[PortInfo]) -> None:
+        for name in DIMENSIONS:
+            self._counts[name].clear()
+            self._levels[name].clear()
+            self._ranks[name].clear()
+        self.total = 0
+        self._add(ports, 1)
+
+    def _add(self, ports: Iterable[PortInfo], delta: int) -> None:
+        for entry in ports:
+            self.total += delta
+            for name, key_of in DIMENSIONS.items():
+                key = key_of(entry)
+                if key is None:
+                    continue
+                counts = self._counts[name]
+                old = counts[key]
+                value = old + delta
+                if value:
+                    counts[key] = value
+                else:
+                    del counts[key]  # Keep only keys with a non-zero balance
+                self._relevel(name, key, old, value)
+
+    def _relevel(self, dimension: str, key: Hashable, old: int, new: int) -> None:
+        """Move `key` from level `old` to level `new`; only positive levels are kept."""
+        levels = self._levels[dimension]
+        ranks = self._ranks[dimension]
+        if old > 0:
+            keys = levels[old]
+            del keys[key]
+            if not keys:
+                del levels[old]
+                del ranks[bisect.bisect_left(ranks, old)]
+        if new > 0:
+            keys = levels.get(new)
+            if keys is None:
+                keys = levels[new] = {}
+                bisect.insort(ranks, new)
+            keys[key] = None
@@ -0,0 +1,158 @@
+"""
+Scan profiling - per-phase timings and allocation counts for PortScanner.scan().
+
+Pass a ScanProfile to `PortScanner.scan(profile=...)`, or use profile_scans()
+to repeat a scan and summarise the results.
+"""
+
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+
+# In scan order. psutil resolves socket inodes to PIDs inside
+# net_connections(), so "inode_resolution" is only separate with the /proc
+# scanner (PortScanner(parallel_inodes=True)); "filtering" is psutil-only and
+# "namespaces", "tcp_info" and "other_sockets" (Unix and raw sockets) only
+# appear when those options are enabled.
+#
+# "name_lookup" times only the misses: one psutil lookup per distinct PID.
+# Hits are plain reads of the scan's PID -> name table while rows are built,
+# so their cost is part of "construction" and is not timed on its own.
+PHASES = ("enumeration", "inode_resolution", "filtering", "name_lookup", "construction",
+          "namespaces", "tcp_info", "other_sockets", "indexing")
+
+
+@dataclass
+class PhaseStats:
+    """Cost of one scan phase."""
+    seconds: float = 0.0
+    alloc_bytes: int = 0  # Net traced memory change; only while tracemalloc is on
+    peak_bytes: int = 0  # Peak traced memory above the phase's starting point
+
+
+@dataclass
+class ScanProfile:
+    """Profile of a single scan, filled in by PortScanner.scan()."""
+    phases: dict[str, PhaseStats] = field(default_factory=dict)
+    rows: int = 0
+    skipped: int = 0  # Sockets without a local address
+    name_hits: int = 0  # Rows whose owner's name was already in the scan's name table
+    name_misses: int = 0  # psutil name lookups made (one per distinct owning PID)
+    total: float = 0.0
+    allocations: int = 0  # Net allocated blocks over the scan, from tracemalloc
+    top_allocations: list[str] = field(default_factory=list)
+
+    _phase: str | None = field(default=None, repr=False)
+    _phase_start: float = field(default=0.0, repr=False)
+    _phase_memory: int = field(default=0, repr=False)
+
+    def to_dict(self) -> dict:
+        """Return the profile as JSON-serialisable data."""
+        return {key: value for key, value in asdict(self).items() if not key.startswith("_")}
+
+    def begin(self, phase: str) -> None:
+        """End the current phase (if any) and start timing `phase`."""
+        now = time.perf_counter()
+        self._end(now)
+        self._phase = phase
+        if tracemalloc.is_tracing():
+            self._phase_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._phase_start = time.perf_counter()
+
+    def finish(self) -> None:
+        """End the last phase."""
+        self._end(time.perf_counter())
+        self._phase = None
+        self.total = sum(stats.seconds for stats in self.phases.values())
+
+    def _end(self, now: float) -> None:
+        if self._phase is None:
+            return
+        stats = self.phases.setdefault(self._phase, PhaseStats())
+        stats.seconds += now - self._phase_start
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stats.alloc_bytes += current - self._phase_memory
+            stats.peak_bytes = max(stats.peak_bytes, peak - self._phase_memory)
+
+
+def profile_scans(scanner, repeat: int = 50, allocations: bool = True,
+                  top: int = 5) -> list[ScanProfile]:
+    """
+    Run `repeat` profiled scans.
+
+    Args:
+        scanner: PortScanner to profile.
+        repeat: Number of scans.
+        allocations: Trace allocations with tracemalloc. This slows the scan
+            down, so phase timings are best read from a run without it.
+        top: Allocation sites to keep per scan.
+    """
+    profiles = []
+    started = allocations and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            profile = ScanProfile()
+            # Keep the previous results alive so the diff counts what this scan allocates
+            previous = scanner.get_cached()
+            before = _snapshot() if allocations else None
+            scanner.scan(profile=profile)
+            if before is not None:
+                diff = _snapshot().compare_to(before, "lineno")
+                profile.allocations = sum(stat.count_diff for stat in diff)
+                profile.top_allocations = [str(stat) for stat in diff[:top]]
+            del previous
+            profiles.append(profile)
+    finally:
+        if started:
+            tracemalloc.stop()
+    return profiles
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Take a snapshot without the profiler's own bookkeeping."""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+def format_profiles(profiles: list[ScanProfile]) -> str:
+    """Summarise repeated scan profiles as a per-phase table."""
+    if not profiles:
+        return "No scans profiled."
+
+    def ms(values: list[float]) -> str:
+        ordered = sorted(values)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return f"{statistics.median(values) * 1000:10.2f} {p95 * 1000:10.2f}"
+
+    traced = any(p.allocations or p.top_allocations for p in profiles)
+    header = f"{'phase':17} {'median ms':>10} {'p95 ms':>10}"
+    lines = [header + (f" {'alloc KiB':>10} {'peak KiB':>10}" if traced else "")]
+    for phase in PHASES:
+        if not any(phase in p.phases for p in profiles):
+            continue
+        stats = [p.phases.get(phase, PhaseStats()) for p in profiles]
+        line = f"{phase:17} {ms([s.seconds for s in stats])}"
+        if traced:
+            line += (f" {statistics.median(s.alloc_bytes for s in stats) / 1024:10.1f}"
+                     f" {statistics.median(s.peak_bytes for s in stats) / 1024:10.1f}")
+        lines.append(line)
+    lines.append(f"{'total':17} {ms([p.total for p in profiles])}")
+
+    last = profiles[-1]
+    lines.append("")
+    lines.append(f"{len(profiles)} scans, {last.rows} rows ({last.skipped} skipped without a local address)")
+    lookups = last.name_hits + last.name_misses
+    hit_rate = last.name_hits / lookups if lookups else 0.0
+    lines.append(f"process names: {last.name_hits} hits, {last.name_misses} misses ({hit_rate:.0%} hit rate)")
+    if traced:
+        lines.append(f"allocated blocks per scan (median): {statistics.median(p.allocations for p in profiles):.0f}")
+        lines.append("top allocation sites (last scan):")
+        lines.extend(f"  {site}" for site in last.top_allocations)
+    return "\n".join(lines)
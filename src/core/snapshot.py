@@ -0,0 +1,305 @@
+"""
+Binary port snapshots - save a scan, load it back, and diff two of them.
+
+Layout (little-endian, every section padded to 8 bytes):
+
+    header   magic "PPSNAP", version, flags, row count, string count,
+             capture time, body length
+    columns  one array per PortInfo field, in COLUMNS order; strings are
+             stored as indexes into the string table
+    strings  (count + 1) u32 offsets into a UTF-8 blob, then the blob
+
+Rows are written sorted by socket key, so diff_snapshots() can merge two
+files in one pass. Uncompressed files are memory-mapped and read column by
+column; compressed files (zlib) are inflated into memory first.
+"""
+
+import mmap
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import pairwise
+from pathlib import Path
+
+from src.core.port_scanner import PortInfo
+
+MAGIC = b"PPSNAP"
+VERSION = 1
+FLAG_COMPRESSED = 0x1
+
+_HEADER = struct.Struct("<6sBBIIdQ")
+NONE = 0xFFFFFFFF  # Missing pid or string
+NONE_NAMESPACE = 0  # Namespace inodes are never 0
+
+# (PortInfo field, array typecode); string fields are indexes into the string table
+COLUMNS = (
+    ("local_port", "H"),
+    ("remote_port", "H"),  # 0 when not connected
+    ("pid", "I"),
+    ("namespace", "Q"),
+    ("local_address", "I"),
+    ("remote_address", "I"),
+    ("process_name", "I"),
+    ("status", "I"),
+    ("protocol", "I"),
+    ("container_id", "I"),
+)
+STRING_COLUMNS = frozenset(("local_address", "remote_address", "process_name", "status",
+                            "protocol", "container_id"))
+
+
+class SnapshotError(Exception):
+    """The file is not a PortPilot snapshot or is damaged."""
+
+
+def sort_key(entry: PortInfo) -> tuple:
+    """Order rows are stored in; mirrors PortScanner.socket_key() without Nones."""
+    return (entry.protocol or "", entry.local_address or "", entry.local_port,
+            entry.remote_address or "", entry.remote_port or 0, entry.status or "",
+            NONE if entry.pid is None else entry.pid)
+
+
+def _pad(buffer: bytearray) -> None:
+    buffer.extend(b"\0" * (-len(buffer) % 8))
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_snapshot(path: Path | str, ports: Iterable[PortInfo], compress: bool = False,
+                   created: float | None = None) -> int:
+    """
+    Write `ports` to a snapshot file.
+
+    Args:
+        compress: zlib-compress the body; smaller, but the file can no longer be memory-mapped.
+        created: Capture time (default: now).
+
+    Returns:
+        The number of rows written.
+    """
+    rows = sorted(ports, key=sort_key)
+    strings: dict[str, int] = {}
+
+    def intern(value: str | None) -> int:
+        if value is None:
+            return NONE
+        return strings.setdefault(value, len(strings))
+
+    columns = {name: array(code) for name, code in COLUMNS}
+    for entry in rows:
+        for name, _code in COLUMNS:
+            value = getattr(entry, name)
+            if name in STRING_COLUMNS:
+                value = intern(value)
+            elif name == "pid":
+                value = NONE if value is None else value
+            elif name == "namespace":
+                value = value or NONE_NAMESPACE
+            else:
+                value = value or 0
+            columns[name].append(value)
+
+    body = bytearray()
+    for name, _code in COLUMNS:
+        body += _little_endian(columns[name])
+        _pad(body)
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in strings:  # Insertion order is id order
+        blob += value.encode("utf-8", "surrogateescape")
+        offsets.append(len(blob))
+    body += _little_endian(offsets)
+    body += blob
+    _pad(body)
+
+    flags = 0
+    payload = bytes(body)
+    if compress:
+        flags |= FLAG_COMPRESSED
+        payload = zlib.compress(payload, 6)
+    header = _HEADER.pack(MAGIC, VERSION, flags, len(rows), len(strings),
+                          time.time() if created is None else created, len(body))
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    return len(rows)
+
+
+class Snapshot:
+    """
+    A snapshot file opened for reading.
+
+    Columns are read in place (memory-mapped when uncompressed); PortInfo
+    objects are only built for the rows asked for. Use as a context manager
+    or call close().
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        head = self._file.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise SnapshotError(f"{self.path}: too short for a snapshot")
+        magic, version, flags, self.rows, self.string_count, self.created, body_length = \
+            _HEADER.unpack(head)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path}: not a PortPilot snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"{self.path}: unsupported snapshot version {version}")
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+
+        # Check the counts against the body length before trusting either
+        sizes = [array(code).itemsize * self.rows for _name, code in COLUMNS]
+        strings_at = sum(size + (-size % 8) for size in sizes)
+        blob_at = strings_at + 4 * (self.string_count + 1)
+        if blob_at > body_length:
+            raise SnapshotError(f"{self.path}: row or string count does not fit the body")
+
+        if self.compressed:
+            try:
+                body: bytes | memoryview = zlib.decompress(self._file.read())
+            except zlib.error as e:
+                raise SnapshotError(f"{self.path}: damaged compressed body ({e})") from e
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            body = self._view(self._view(memoryview(self._mmap))[_HEADER.size:])
+        if len(body) < body_length:
+            raise SnapshotError(f"{self.path}: truncated")
+
+        offset = 0
+        self._columns: dict[str, memoryview | array] = {}
+        for (name, code), size in zip(COLUMNS, sizes, strict=True):
+            self._columns[name] = self._column(body, offset, size, code)
+            offset += size + (-size % 8)
+        self._offsets = self._column(body, strings_at, blob_at - strings_at, "I")
+        self._blob = body[blob_at:body_length]
+        if isinstance(self._blob, memoryview):
+            self._view(self._blob)
+        ends = self._offsets.tolist()
+        if ends[0] != 0 or ends[-1] > len(self._blob) or any(a > b for a, b in pairwise(ends)):
+            raise SnapshotError(f"{self.path}: damaged string table")
+        self._strings: dict[int, str] = {}
+
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _column(self, body, offset: int, size: int, code: str):
+        if sys.byteorder == "little":
+            return self._view(memoryview(body)[offset:offset + size].cast(code))
+        values = array(code, bytes(body[offset:offset + size]))
+        values.byteswap()
+        return values
+
+    def string(self, index: int) -> str | None:
+        """Decode one interned string (cached)."""
+        if index == NONE:
+            return None
+        value = self._strings.get(index)
+        if value is None:
+            if index >= self.string_count:
+                raise SnapshotError(f"{self.path}: string index {index} out of range")
+            start, end = self._offsets[index], self._offsets[index + 1]
+            value = bytes(self._blob[start:end]).decode("utf-8", "surrogateescape")
+            self._strings[index] = value
+        return value
+
+    def row(self, i: int) -> PortInfo:
+        """Build the PortInfo of row `i`."""
+        c = self._columns
+        pid = c["pid"][i]
+        return PortInfo(
+            local_port=c["local_port"][i],
+            local_address=self.string(c["local_address"][i]),
+            remote_port=c["remote_port"][i] or None,
+            remote_address=self.string(c["remote_address"][i]),
+            pid=None if pid == NONE else pid,
+            process_name=self.string(c["process_name"][i]),
+            status=self.string(c["status"][i]),
+            protocol=self.string(c["protocol"][i]),
+            namespace=c["namespace"][i] or None,
+            container_id=self.string(c["container_id"][i]),
+        )
+
+    def key(self, i: int) -> tuple:
+        """sort_key() of row `i`, without building a PortInfo."""
+        c = self._columns
+        return (self.string(c["protocol"][i]) or "", self.string(c["local_address"][i]) or "",
+                c["local_port"][i], self.string(c["remote_address"][i]) or "", c["remote_port"][i],
+                self.string(c["status"][i]) or "", c["pid"][i])
+
+    def column(self, name: str):
+        """Raw values of one column (string columns hold string-table indexes)."""
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[PortInfo]:
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def close(self) -> None:
+        self._columns = {}
+        self._offsets = self._blob = None
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_snapshot(path: Path | str) -> list[PortInfo]:
+    """Load every row of a snapshot."""
+    with Snapshot(path) as snapshot:
+        return list(snapshot)
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Iterator[tuple[str, PortInfo]]:
+    """
+    Stream the differences between two snapshots in key order.
+
+    Yields:
+        ("-", row) for sockets only in `old` and ("+", row) for sockets only in `new`;
+        a state change shows as both.
+    """
+    i = j = 0
+    while i < len(old) and j < len(new):
+        old_key, new_key = old.key(i), new.key(j)
+        if old_key == new_key:
+            i += 1
+            j += 1
+        elif old_key < new_key:
+            yield "-", old.row(i)
+            i += 1
+        else:
+            yield "+", new.row(j)
+            j += 1
+    for rest in range(i, len(old)):
+        yield "-", old.row(rest)
+    for rest in range(j, len(new)):
+        yield "+", new.row(rest)
@@ -0,0 +1,306 @@
+"""
+Socket-close notifications and TCP statistics from the Linux sock_diag
+netlink interface.
+
+The kernel multicasts an inet_diag_msg to the SKNLGRP_*_DESTROY groups
+whenever a TCP or UDP socket is destroyed. SocketCloseListener subscribes
+to them and drops the closed sockets from PortScanner's snapshot as they
+happen; new sockets have no such event, so it also rescans periodically.
+
+Binding to the destroy groups needs CAP_NET_ADMIN. Without it (or on other
+platforms) start() returns False and the caller keeps polling.
+
+dump_tcp_info() fetches tcp_info for every TCP socket in one dump per
+address family, which needs no privileges.
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from src.core.port_scanner import Endpoint, PortDiff, PortScanner, TcpStats
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLMSG_DONE = 3
+NLMSG_ERROR = 2
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+INET_DIAG_INFO = 2  # Attribute carrying struct tcp_info
+TCP_ALL_STATES = 0xFFFFFFFF
+
+# Multicast groups from linux/sock_diag.h
+SKNLGRP_INET_TCP_DESTROY = 1
+SKNLGRP_INET_UDP_DESTROY = 2
+SKNLGRP_INET6_TCP_DESTROY = 3
+SKNLGRP_INET6_UDP_DESTROY = 4
+
+# One socket per protocol: the message itself does not say whether it is TCP or UDP
+DESTROY_GROUPS = {
+    "tcp": (SKNLGRP_INET_TCP_DESTROY, SKNLGRP_INET6_TCP_DESTROY),
+    "udp": (SKNLGRP_INET_UDP_DESTROY, SKNLGRP_INET6_UDP_DESTROY),
+}
+
+_NLMSGHDR = struct.Struct("=LHHLL")
+# family, state, timer, retrans, sport, dport, src, dst, if, cookie, expires,
+# rqueue, wqueue, uid, inode; ports and addresses are in network byte order
+_INET_DIAG_MSG = struct.Struct("=BBBB")
+_INET_DIAG_SOCKID = struct.Struct(">HH16s16s")
+_INET_DIAG_TAIL = struct.Struct("=L8sLLLLL")
+INET_DIAG_MSG_SIZE = _INET_DIAG_MSG.size + _INET_DIAG_SOCKID.size + _INET_DIAG_TAIL.size
+# family, protocol, ext, pad, states, then an all-zero sockid (match everything)
+_INET_DIAG_REQ_V2 = struct.Struct("=BBBBL48x")
+_RTATTR = struct.Struct("=HH")
+
+# Offsets into struct tcp_info (linux/tcp.h); older kernels send a shorter struct
+_TCPI_RETRANSMITS = struct.Struct("=2xB")
+_TCPI_RTT = struct.Struct("=68xLL")  # tcpi_rtt, tcpi_rttvar in microseconds
+_TCPI_TOTAL_RETRANS = struct.Struct("=100xL")
+_TCPI_BYTES = struct.Struct("=120xQQ")  # tcpi_bytes_acked, tcpi_bytes_received
+
+RECV_BUFFER = 256 * 1024
+
+
+class DiagSocket(NamedTuple):
+    """One decoded inet_diag_msg."""
+    family: int
+    state: int
+    local_ip: str
+    local_port: int
+    remote_ip: str | None  # None for unconnected sockets, as in read_socket_table()
+    remote_port: int | None
+    # Bytes waiting to be read / sent; for a listener, the accept queue length and its limit
+    recv_queue: int
+    send_queue: int
+    inode: int
+
+
+def parse_inet_diag_msg(data: bytes, offset: int = 0) -> DiagSocket:
+    """Decode the inet_diag_msg at `offset`."""
+    family, state, _timer, _retrans = _INET_DIAG_MSG.unpack_from(data, offset)
+    offset += _INET_DIAG_MSG.size
+    sport, dport, src, dst = _INET_DIAG_SOCKID.unpack_from(data, offset)
+    offset += _INET_DIAG_SOCKID.size
+    _if, _cookie, _expires, rqueue, wqueue, _uid, inode = _INET_DIAG_TAIL.unpack_from(data, offset)
+
+    length = 4 if family == socket.AF_INET else 16
+    local_ip = socket.inet_ntop(family, src[:length])
+    remote_ip: str | None = socket.inet_ntop(family, dst[:length])
+    remote_port: int | None = dport
+    if not dport:
+        remote_ip = remote_port = None
+    return DiagSocket(family, state, local_ip, sport, remote_ip, remote_port, rqueue, wqueue, inode)
+
+
+def parse_tcp_info(data: bytes, recv_queue: int = 0, send_queue: int = 0) -> TcpStats:
+    """Decode the struct tcp_info fields PortPilot shows."""
+    stats = TcpStats(recv_queue=recv_queue, send_queue=send_queue)
+    if len(data) >= _TCPI_RETRANSMITS.size:
+        stats.retransmits = _TCPI_RETRANSMITS.unpack_from(data)[0]
+    if len(data) >= _TCPI_RTT.size:
+        stats.rtt_us, stats.rtt_var_us = _TCPI_RTT.unpack_from(data)
+    if len(data) >= _TCPI_TOTAL_RETRANS.size:
+        stats.total_retrans = _TCPI_TOTAL_RETRANS.unpack_from(data)[0]
+    if len(data) >= _TCPI_BYTES.size:
+        stats.bytes_acked, stats.bytes_received = _TCPI_BYTES.unpack_from(data)
+    return stats
+
+
+def _messages(data: bytes):
+    """Yield (type, body offset, end offset) for each netlink message in a datagram."""
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _flags, _seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            return
+        yield msg_type, offset + _NLMSGHDR.size, min(offset + length, len(data))
+        offset += (length + 3) & ~3  # NLMSG_ALIGN
+
+
+def _attributes(data: bytes, offset: int, end: int):
+    """Yield (type, payload) for each rtattr between offset and end."""
+    while offset + _RTATTR.size <= end:
+        length, attr_type = _RTATTR.unpack_from(data, offset)
+        if length < _RTATTR.size:
+            return
+        yield attr_type, data[offset + _RTATTR.size:offset + length]
+        offset += (length + 3) & ~3  # RTA_ALIGN
+
+
+def parse_destroy_messages(data: bytes, protocol: str) -> list[Endpoint]:
+    """Return the endpoints of every socket-destroy message in a netlink datagram."""
+    endpoints: list[Endpoint] = []
+    for msg_type, body, end in _messages(data):
+        if msg_type == SOCK_DIAG_BY_FAMILY and end - body >= INET_DIAG_MSG_SIZE:
+            sock = parse_inet_diag_msg(data, body)
+            endpoints.append((protocol, sock.local_ip, sock.local_port, sock.remote_ip, sock.remote_port))
+    return endpoints
+
+
+def dump_tcp_info(families: tuple[int, ...] = (socket.AF_INET, socket.AF_INET6)) -> dict[tuple, TcpStats]:
+    """
+    Fetch tcp_info for every TCP socket in our network namespace.
+
+    Returns:
+        (local_ip, local_port, remote_ip, remote_port) -> TcpStats. Sockets
+        without tcp_info (e.g. TIME_WAIT) are left out.
+
+    Raises:
+        OSError: If sock_diag is unavailable.
+    """
+    stats: dict[tuple, TcpStats] = {}
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        for seq, family in enumerate(families, start=1):
+            request = _INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1),
+                                             0, TCP_ALL_STATES)
+            header = _NLMSGHDR.pack(_NLMSGHDR.size + len(request), SOCK_DIAG_BY_FAMILY,
+                                    NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+            sock.sendto(header + request, (0, 0))
+            done = False
+            while not done:
+                data = sock.recv(RECV_BUFFER)
+                for msg_type, body, end in _messages(data):
+                    if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                        done = True  # An error here means the family is not supported
+                        break
+                    if msg_type != SOCK_DIAG_BY_FAMILY or end - body < INET_DIAG_MSG_SIZE:
+                        continue
+                    diag = parse_inet_diag_msg(data, body)
+                    for attr_type, payload in _attributes(data, body + INET_DIAG_MSG_SIZE, end):
+                        if attr_type == INET_DIAG_INFO:
+                            key = (diag.local_ip, diag.local_port, diag.remote_ip, diag.remote_port)
+                            stats[key] = parse_tcp_info(payload, diag.recv_queue, diag.send_queue)
+                            break
+    return stats
+
+
+def open_destroy_socket(protocol: str) -> socket.socket:
+    """Subscribe to the destroy groups of `protocol`; raises OSError without permission."""
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        mask = 0
+        for group in DESTROY_GROUPS[protocol]:
+            mask |= 1 << (group - 1)
+        sock.bind((0, mask))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class SocketCloseListener:
+    """
+    Applies kernel socket-destroy events to a PortScanner on a background thread.
+
+    Args:
+        scanner: Scanner whose snapshot is kept up to date.
+        reconcile_interval: Seconds between rescans that pick up new sockets
+            (and sockets closed while the event queue overflowed); None
+            leaves rescanning to the caller.
+        on_change: Called from the listener thread with each non-empty PortDiff.
+    """
+
+    def __init__(self, scanner: PortScanner, reconcile_interval: float | None = 30.0,
+                 on_change: Callable[[PortDiff], None] | None = None):
+        self.scanner = scanner
+        self.reconcile_interval = reconcile_interval
+        self.on_change = on_change
+        self._sockets: dict[socket.socket, str] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Start listening.
+
+        Returns:
+            False if sock_diag events are unavailable; `error` says why.
+        """
+        if self.running:
+            return True
+        if not hasattr(socket, "AF_NETLINK"):
+            self.error = "sock_diag is only available on Linux"
+            return False
+        try:
+            for protocol in DESTROY_GROUPS:
+                self._sockets[open_destroy_socket(protocol)] = protocol
+        except OSError as e:
+            self.error = f"Cannot subscribe to socket-destroy events: {e}"
+            self._close()
+            return False
+
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sock-diag", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._close()
+
+    def _run(self) -> None:
+        next_reconcile = self._next_reconcile()
+        while not self._stop.is_set():
+            timeout = 0.5 if next_reconcile is None else max(0.0, min(0.5, next_reconcile - time.monotonic()))
+            try:
+                readable, _, _ = select.select(list(self._sockets), [], [], timeout)
+            except (OSError, ValueError):
+                break  # Sockets closed by stop()
+
+            closed: list[Endpoint] = []
+            overflowed = False
+            for sock in readable:
+                try:
+                    closed.extend(parse_destroy_messages(sock.recv(RECV_BUFFER), self._sockets[sock]))
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    overflowed = True  # ENOBUFS: events were dropped, rescan to catch up
+            if closed:
+                self._notify(self.scanner.apply_closed(closed))
+
+            if overflowed or (next_reconcile is not None and time.monotonic() >= next_reconcile):
+                self._reconcile()
+                next_reconcile = self._next_reconcile()
+
+    def _reconcile(self) -> None:
+        before = self.scanner.get_cached()
+        try:
+            after = self.scanner.scan()
+        except Exception as e:
+            print(f"Error reconciling socket snapshot: {e}")
+            return
+        self._notify(PortScanner.diff(before, after))
+
+    def _notify(self, diff: PortDiff) -> None:
+        if diff and self.on_change:
+            try:
+                self.on_change(diff)
+            except Exception as e:
+                print(f"Error in socket change callback: {e}")
+
+    def _next_reconcile(self) -> float | None:
+        if self.reconcile_interval is None:
+            return None
+        return time.monotonic() + self.reconcile_interval
+
+    def _close(self) -> None:
+        for sock in self._sockets:
+            sock.close()
+        self._sockets.clear()
@@ -0,0 +1,166 @@
+"""
+Tracing module - Lightweight spans around hot paths, exportable as Chrome
+trace-event JSON (load the file in chrome://tracing or https://ui.perfetto.dev).
+
+Tracing is off by default. While it is off, `span()` returns a shared no-op
+context manager and `@traced` functions cost one attribute check per call.
+Set PORTPILOT_TRACE=1 to enable it from startup.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MAX_SPANS = 20000
+
+
+@dataclass
+class Span:
+    """A completed span; times are perf_counter() seconds."""
+    name: str
+    start: float
+    duration: float
+    thread_id: int
+
+
+class _NoopSpan:
+    """Context manager returned while tracing is disabled."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager that records one span on exit."""
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        end = time.perf_counter()
+        self.tracer.spans.append(Span(self.name, self.start, end - self.start, threading.get_ident()))
+
+
+class Tracer:
+    """
+    Collects spans into a bounded ring buffer.
+
+    Appending to a deque is atomic, so spans from worker threads need no lock.
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.enabled = False
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def span(self, name: str):
+        """Return a context manager timing the enclosed block as `name`."""
+        if not self.enabled:
+            return _NOOP
+        return _ActiveSpan(self, name)
+
+    def traced(self, name: str | None = None) -> Callable[[F], F]:
+        """Decorator recording a span for every call while tracing is enabled."""
+        def decorate(fn: F) -> F:
+            label = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _ActiveSpan(self, label):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def last(self, name: str) -> Span | None:
+        """Return the most recent completed span called `name`."""
+        # Copy first: other threads append while we iterate
+        for span in reversed(list(self.spans)):
+            if span.name == name:
+                return span
+        return None
+
+    def breakdown(self, root: str) -> list[tuple[str, float, int]]:
+        """
+        Break down the most recent `root` span into the spans it enclosed.
+
+        Returns:
+            (name, total seconds, call count) per span name on the root's
+            thread, slowest first, excluding the root itself.
+        """
+        spans = list(self.spans)
+        root_span = next((span for span in reversed(spans) if span.name == root), None)
+        if root_span is None:
+            return []
+        end = root_span.start + root_span.duration
+        totals: dict[str, list] = {}
+        for span in spans:
+            if (span is root_span or span.thread_id != root_span.thread_id
+                    or span.start < root_span.start or span.start + span.duration > end):
+                continue
+            entry = totals.setdefault(span.name, [0.0, 0])
+            entry[0] += span.duration
+            entry[1] += 1
+        return sorted(((n, t, c) for n, (t, c) in totals.items()), key=lambda e: e[1], reverse=True)
+
+    def to_chrome_trace(self) -> dict:
+        """Return the buffered spans as a Chrome trace-event document."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self._origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+            }
+            for span in list(self.spans)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Path | str) -> int:
+        """Write the buffered spans to `path`; returns the number of events."""
+        trace = self.to_chrome_trace()
+        Path(path).write_text(json.dumps(trace))
+        return len(trace["traceEvents"])
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
+
+if os.environ.get("PORTPILOT_TRACE"):
+    TRACER.enable()
@@ -0,0 +1,335 @@
+"""
+TunnelIO module - Bulk import/export of tunnel configurations.
+
+Supported formats:
+- json: a list of tunnel objects, or the {name: tunnel} mapping used by tunnels.json
+- csv: a header row naming TunnelConfig fields, one tunnel per line
+- ssh_config: `LocalForward` entries inside `Host` blocks of an OpenSSH config
+
+Parsers are generators so large files are never fully loaded into memory.
+"""
+
+import csv
+import getpass
+import json
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, TextIO
+
+from src.core.tunnel_manager import TunnelConfig
+
+FORMATS = ("json", "csv", "ssh_config")
+
+CSV_FIELDS = [f.name for f in fields(TunnelConfig)]
+REQUIRED_FIELDS = ("name", "remote_user", "remote_host", "local_port", "remote_port")
+
+# (location for error messages, raw entry)
+RawEntry = tuple[str, dict[str, Any]]
+
+# ssh_config(5): a keyword and its arguments are separated by whitespace or by
+# one "=" with optional whitespace around it; later "=" belong to the value
+_SSH_OPTION = re.compile(r"([^\s=]+)(?:\s*=\s*|\s+)?(.*)")
+# Comment written above each exported LocalForward so tunnel names survive a round trip
+_NAME_COMMENT = re.compile(r"#\s*PortPilot tunnel:\s*(.+)")
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import. Nothing is imported when `errors` is non-empty."""
+    imported: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def detect_format(path: Path) -> str:
+    """Guess the import/export format from a file name."""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return "json"
+    if suffix == ".csv":
+        return "csv"
+    return "ssh_config"
+
+
+def iter_entries(f: TextIO, fmt: str) -> Iterator[RawEntry]:
+    """Stream raw entries from an open file in the given format."""
+    if fmt == "json":
+        return iter_json(f)
+    if fmt == "csv":
+        return iter_csv(f)
+    if fmt == "ssh_config":
+        return iter_ssh_config(f)
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def iter_json(f: TextIO, chunk_size: int = 65536) -> Iterator[RawEntry]:
+    """
+    Incrementally parse a top-level JSON list or object, one element at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    def decode() -> Any:
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be truncated
+            if end == len(buf) and fill():
+                continue
+            pos = end
+            return value
+
+    opening = peek()
+    if opening not in ("[", "{"):
+        raise json.JSONDecodeError("Expected a JSON list or object", buf, pos)
+    closing = "]" if opening == "[" else "}"
+    pos += 1
+
+    index = 0
+    while True:
+        char = peek()
+        if char == closing:
+            return
+        if index:
+            if char != ",":
+                raise json.JSONDecodeError(f"Expected ',' or '{closing}'", buf, pos)
+            pos += 1
+        index += 1
+
+        if opening == "{":
+            key = decode()
+            if peek() != ":":
+                raise json.JSONDecodeError("Expected ':'", buf, pos)
+            pos += 1
+            value = decode()
+            if isinstance(value, dict):
+                value.setdefault("name", key)
+            yield (f"entry {index} ({key})", value)
+        else:
+            yield (f"entry {index}", decode())
+
+
+def iter_csv(f: TextIO) -> Iterator[RawEntry]:
+    """Stream entries from a CSV file with a header row."""
+    reader = csv.DictReader(f)
+    for row in reader:
+        entry = {k: v for k, v in row.items() if k is not None and v not in (None, "")}
+        yield (f"line {reader.line_num}", entry)
+
+
+def iter_ssh_config(f: TextIO) -> Iterator[RawEntry]:
+    """
+    Stream one entry per `LocalForward` in an OpenSSH client config.
+
+    The tunnel connects to the Host alias so the rest of the block
+    (HostName, Port, ProxyJump, ...) still applies. Wildcard hosts and
+    Match blocks are skipped. A `# PortPilot tunnel: <name>` comment, as
+    written by write_entries(), names the LocalForward that follows it.
+    """
+    host: str | None = None
+    user: str | None = None
+    identity: str | None = None
+    forwards: list[tuple[int, str, str | None]] = []
+    name: str | None = None
+
+    def flush() -> Iterator[RawEntry]:
+        for line_num, spec, forward_name in forwards:
+            yield (f"line {line_num}",
+                   _parse_local_forward(spec, host or "", user, identity, forward_name))
+
+    for line_num, line in enumerate(f, start=1):
+        line = line.strip()
+        if line.startswith("#"):
+            comment = _NAME_COMMENT.match(line)
+            if comment:
+                name = comment.group(1).strip()
+            continue
+        match = _SSH_OPTION.match(line)
+        if not match:
+            continue
+        keyword = match.group(1).lower()
+        value = match.group(2).strip()
+
+        if keyword in ("host", "match"):
+            yield from flush()
+            forwards = []
+            user = identity = None
+            alias = value.split()[0] if value else ""
+            wildcard = keyword == "match" or any(c in alias for c in "*?!")
+            host = None if wildcard else alias
+        elif host is None:
+            continue
+        elif keyword == "user":
+            user = value
+        elif keyword == "identityfile":
+            identity = value
+        elif keyword == "localforward":
+            forwards.append((line_num, value, name))
+        name = None  # A name comment only applies to the line right after it
+
+    yield from flush()
+
+
+def _parse_local_forward(spec: str, host: str, user: str | None,
+                         identity: str | None, name: str | None = None) -> dict[str, Any]:
+    """Convert a `LocalForward [bind:]port target:port` value to a raw entry."""
+    try:
+        listen, target = spec.split()
+        local_port = listen.rsplit(":", 1)[-1]
+        target_host, remote_port = target.rsplit(":", 1)
+    except ValueError:
+        return {"_error": f"cannot parse LocalForward '{spec}'"}
+    if target_host.strip("[]") not in ("localhost", "127.0.0.1", "::1"):
+        return {"_error": f"forward target '{target_host}' is not supported "
+                          "(tunnels forward to localhost on the remote host)"}
+    return {
+        "name": name or f"{host}-{local_port}",
+        "remote_user": user or getpass.getuser(),
+        "remote_host": host,
+        "local_port": local_port,
+        "remote_port": remote_port,
+        "ssh_key": identity,
+    }
+
+
+def validate_entry(location: str, raw: Any) -> tuple[TunnelConfig | None, list[str]]:
+    """
+    Validate and coerce a raw entry into a TunnelConfig.
+
+    Returns:
+        Tuple of (config or None, list of error messages).
+    """
+    if not isinstance(raw, dict):
+        return (None, [f"{location}: expected an object"])
+    if "_error" in raw:
+        return (None, [f"{location}: {raw['_error']}"])
+
+    errors = []
+    unknown = set(raw) - set(CSV_FIELDS)
+    if unknown:
+        errors.append(f"{location}: unknown field(s) {', '.join(sorted(unknown))}")
+    for name in REQUIRED_FIELDS:
+        if raw.get(name) in (None, ""):
+            errors.append(f"{location}: missing '{name}'")
+    if errors:
+        return (None, errors)
+
+    ports = {}
+    for name in ("local_port", "remote_port"):
+        try:
+            ports[name] = int(raw[name])
+        except (TypeError, ValueError):
+            errors.append(f"{location}: '{name}' must be an integer, got {raw[name]!r}")
+            continue
+        if not 1 <= ports[name] <= 65535:
+            errors.append(f"{location}: '{name}' {ports[name]} is out of range 1-65535")
+
+    enabled = raw.get("enabled", False)
+    if isinstance(enabled, str):
+        enabled = enabled.strip().lower() in ("1", "true", "yes", "on")
+
+    if errors:
+        return (None, errors)
+    return (TunnelConfig(
+        name=str(raw["name"]),
+        remote_user=str(raw["remote_user"]),
+        remote_host=str(raw["remote_host"]),
+        local_port=ports["local_port"],
+        remote_port=ports["remote_port"],
+        enabled=bool(enabled),
+        ssh_key=str(raw["ssh_key"]) if raw.get("ssh_key") else None,
+    ), [])
+
+
+def write_entries(f: TextIO, tunnels: Iterable[TunnelConfig], fmt: str) -> int:
+    """Write tunnels to an open file. Returns the number written."""
+    count = 0
+    if fmt == "json":
+        data = {}
+        for tunnel in tunnels:
+            data[tunnel.name] = tunnel.to_dict()
+        json.dump(data, f, indent=2)
+        count = len(data)
+    elif fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for tunnel in tunnels:
+            writer.writerow(tunnel.to_dict())
+            count += 1
+    elif fmt == "ssh_config":
+        count = _write_ssh_config(f, tunnels)
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+    return count
+
+
+def _write_ssh_config(f: TextIO, tunnels: Iterable[TunnelConfig]) -> int:
+    """
+    Write one Host block per (host, user, key) with all its LocalForwards.
+
+    ssh uses the first User/IdentityFile it finds for a host, so a second
+    account on the same host gets its own alias with a HostName line.
+    """
+    groups: dict[tuple[str, str, str | None], list[TunnelConfig]] = {}
+    for tunnel in tunnels:
+        groups.setdefault((tunnel.remote_host, tunnel.remote_user, tunnel.ssh_key), []).append(tunnel)
+
+    aliases: set[str] = set()
+    count = 0
+    for (host, user, key), group in groups.items():
+        alias = host
+        suffix = 1
+        while alias in aliases:
+            alias = f"{host}-{user}" if suffix == 1 else f"{host}-{user}-{suffix}"
+            suffix += 1
+        aliases.add(alias)
+
+        f.write(f"Host {alias}\n")
+        if alias != host:
+            f.write(f"    HostName {host}\n")
+        f.write(f"    User {user}\n")
+        if key:
+            f.write(f"    IdentityFile {key}\n")
+        for tunnel in group:
+            f.write(f"    # PortPilot tunnel: {tunnel.name}\n")
+            f.write(f"    LocalForward {tunnel.local_port} localhost:{tunnel.remote_port}\n")
+        f.write("\n")
+        count += len(group)
+    return count
@@ -5,9 +5,23 @@ TunnelManager module - Manages SSH tunnel configurations and subprocess states.
 import json
 import subprocess
 import sys
-from dataclasses import asdict, dataclass
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.core import metrics
+from src.core.port_allocator import PortAllocator
+from src.core.port_scanner import PortScanner
+from src.core.tracing import traced
+from src.core.tunnel_metrics import TunnelMetrics, TunnelMetricsCollector
+
+if TYPE_CHECKING:
+    from src.core.tunnel_io import ImportResult
 
 
 class TunnelStatus(Enum):
@@ -30,7 +44,8 @@ class TunnelConfig:
     ssh_key: str | None = None  # Path to SSH key file
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # All fields are scalars, so a shallow copy matches asdict() without the deepcopy cost
+        return dict(vars(self))
 
     @classmethod
     def from_dict(cls, data: dict) -> 'TunnelConfig':
@@ -43,13 +58,45 @@ class TunnelManager:
 
     Tunnels are saved to a JSON file for persistence across app restarts.
     Each tunnel runs as a subprocess calling the system SSH client.
+
+    When a PortScanner is supplied, tunnels are checked for local port
+    conflicts before ssh is launched. Pass load=False to defer reading the
+    configuration (e.g. to a background thread) and call load() later.
     """
 
-    def __init__(self, config_path: Path | None = None):
+    DEFAULT_PORT_RANGE = PortAllocator.DEFAULT_RANGE
+
+    def __init__(self, config_path: Path | None = None,
+                 port_scanner: PortScanner | None = None,
+                 port_range: tuple[int, int] = DEFAULT_PORT_RANGE,
+                 load: bool = True):
         self.config_path = config_path or Path.home() / ".portpilot" / "tunnels.json"
+        self.port_scanner = port_scanner
+        self.port_range = port_range
+        self._allocator = PortAllocator(port_scanner, port_range,
+                                        reservation_file=self.config_path.parent / "reservations.json")
         self.tunnels: dict[str, TunnelConfig] = {}
         self._processes: dict[str, subprocess.Popen] = {}
+        self._port_owners: dict[int, str] = {}  # local_port -> running tunnel name
+        self._starting: set[str] = set()  # Tunnels whose port is reserved while ssh launches
+        self._port_lock = threading.Lock()
+        self._errors: dict[str, str] = {}
+        self._started_at: dict[str, float] = {}
+        # Tunnels started at least once this session, to count restarts
+        self._ever_started: set[str] = set()
+        self._metrics: dict[str, TunnelMetrics] = {}
+        self._metrics_collector = TunnelMetricsCollector()
+        self._metrics_thread: threading.Thread | None = None
+        self._metrics_stop = threading.Event()
+        self._save_lock = threading.Lock()
+        self.loaded = threading.Event()
+        if load:
+            self.load()
+
+    def load(self) -> None:
+        """Load tunnel configurations from disk."""
         self._load_config()
+        self.loaded.set()
 
     def _load_config(self) -> None:
         """Load tunnel configurations from file."""
@@ -57,17 +104,20 @@ class TunnelManager:
             try:
                 with open(self.config_path) as f:
                     data = json.load(f)
-                    for name, config in data.items():
-                        self.tunnels[name] = TunnelConfig.from_dict(config)
+                    loaded = {name: TunnelConfig.from_dict(config) for name, config in data.items()}
+                # Single update so readers on other threads never see a partial load
+                self.tunnels.update(loaded)
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Error loading tunnel config: {e}")
 
     def _save_config(self) -> None:
         """Save tunnel configurations to file."""
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.config_path, 'w') as f:
-            data = {name: tunnel.to_dict() for name, tunnel in self.tunnels.items()}
-            json.dump(data, f, indent=2)
+        with self._save_lock:
+            self.config_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.config_path, 'w') as f:
+                data = {name: tunnel.to_dict() for name, tunnel in self.tunnels.items()}
+                # One write of the encoded document is much faster than json.dump's many small writes
+                f.write(json.dumps(data, indent=2))
 
     def add_tunnel(self, config: TunnelConfig) -> bool:
         """Add a new tunnel configuration."""
@@ -77,12 +127,78 @@ class TunnelManager:
         self._save_config()
         return True
 
+    def import_tunnels(self, path: Path, fmt: str | None = None,
+                       replace: bool = False) -> 'ImportResult':
+        """
+        Import many tunnels from a file in a single transaction.
+
+        Every entry is validated before anything is changed; if any entry
+        is invalid, no tunnels are added and all problems are reported.
+
+        Args:
+            path: File to import (JSON, CSV or an OpenSSH client config).
+            fmt: One of tunnel_io.FORMATS; guessed from the file name if omitted.
+            replace: Overwrite existing tunnels with the same name instead of
+                reporting them as duplicates.
+
+        Returns:
+            ImportResult with the number imported and any errors.
+        """
+        import csv
+
+        from src.core.tunnel_io import ImportResult, detect_format, iter_entries, validate_entry
+
+        fmt = fmt or detect_format(path)
+        result = ImportResult()
+        staged: dict[str, TunnelConfig] = {}
+
+        try:
+            with open(path, newline="" if fmt == "csv" else None) as f:
+                for location, raw in iter_entries(f, fmt):
+                    config, errors = validate_entry(location, raw)
+                    if config is None:
+                        result.errors.extend(errors)
+                    elif config.name in staged:
+                        result.errors.append(f"{location}: duplicate name '{config.name}' in file")
+                    elif config.name in self.tunnels and not replace:
+                        result.errors.append(f"{location}: tunnel '{config.name}' already exists")
+                    else:
+                        staged[config.name] = config
+        except (OSError, ValueError, csv.Error) as e:
+            result.errors.append(f"{path}: {e}")
+
+        if result.errors:
+            return result
+
+        for name, config in staged.items():
+            if name in self.tunnels:
+                self._terminate(name)
+            self.tunnels[name] = config
+        self._save_config()
+        result.imported = len(staged)
+        return result
+
+    def export_tunnels(self, path: Path, fmt: str | None = None) -> int:
+        """
+        Export all tunnels to a file.
+
+        Returns:
+            Number of tunnels written.
+        """
+        from src.core.tunnel_io import detect_format, write_entries
+
+        fmt = fmt or detect_format(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', newline="" if fmt == "csv" else None) as f:
+            return write_entries(f, self.tunnels.values(), fmt)
+
     def remove_tunnel(self, name: str) -> bool:
         """Remove a tunnel configuration (stops it first if running)."""
         if name not in self.tunnels:
             return False
         self.stop_tunnel(name)
         del self.tunnels[name]
+        self._metrics.pop(name, None)
         self._save_config()
         return True
 
@@ -99,12 +215,42 @@ class TunnelManager:
             self.start_tunnel(name)
         return True
 
-    def start_tunnel(self, name: str) -> TunnelStatus:
-        """Start an SSH tunnel."""
+    def start_tunnel(self, name: str, auto_port: bool = False,
+                     refresh: bool = False) -> TunnelStatus:
+        """
+        Start an SSH tunnel.
+
+        Args:
+            name: Name of the tunnel to start.
+            auto_port: If the local port is taken, move the tunnel to a free
+                port from `port_range` instead of failing.
+            refresh: Rescan ports before the conflict check; by default the
+                scanner's last snapshot is used.
+
+        Returns:
+            The resulting TunnelStatus. On ERROR, get_last_error() explains why.
+        """
         if name not in self.tunnels:
             return TunnelStatus.ERROR
 
         config = self.tunnels[name]
+        if refresh and self.port_scanner is not None:
+            self.port_scanner.scan()
+
+        # Check and reserve in one step, so tunnels started concurrently
+        # (restore_enabled) cannot both claim the same port
+        with self._port_lock:
+            conflict = self._find_conflict(config.local_port, name)
+            if conflict:
+                free = self.allocate_ports(1, refresh=False) if auto_port else []
+                if not free:
+                    self._errors[name] = conflict
+                    print(f"Error starting tunnel {name}: {conflict}")
+                    return TunnelStatus.ERROR
+                config.local_port = free[0]
+                self._save_config()
+            self._port_owners[config.local_port] = name
+            self._starting.add(name)
 
         # Build SSH command
         cmd = self._build_ssh_command(config)
@@ -118,16 +264,160 @@ class TunnelManager:
                 creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0x08000000) if sys.platform == 'win32' else 0
             )
             self._processes[name] = process
-            config.enabled = True
-            self._save_config()
+            self._errors.pop(name, None)
+            self._started_at[name] = time.monotonic()
+            self._metrics.setdefault(name, TunnelMetrics()).reset()
+            metrics.TUNNEL_STARTS.inc()
+            if name in self._ever_started:
+                metrics.TUNNEL_RESTARTS.inc()
+            self._ever_started.add(name)
+            metrics.TUNNELS_UP.set(len(self._processes))
+            if not config.enabled:
+                config.enabled = True
+                self._save_config()
             return TunnelStatus.RUNNING
 
         except Exception as e:
+            self._errors[name] = str(e)
+            self._release_port(name)
             print(f"Error starting tunnel {name}: {e}")
             return TunnelStatus.ERROR
 
+        finally:
+            self._starting.discard(name)
+
+    def check_port_conflict(self, port: int, name: str | None = None,
+                            refresh: bool = False) -> str | None:
+        """
+        Check whether a local port is already taken.
+
+        Only TCP listeners count: outgoing connections and UDP sockets on the
+        same port number do not stop ssh from binding it.
+
+        Args:
+            port: Local port to check.
+            name: Tunnel being started (ignored as a conflicting owner, along
+                with its own ssh process).
+            refresh: Rescan ports first; by default the last scan is reused.
+
+        Returns:
+            A description of the conflicting owner, or None if the port is free.
+        """
+        if refresh and self.port_scanner is not None:
+            self.port_scanner.scan()
+        with self._port_lock:
+            return self._find_conflict(port, name)
+
+    def _find_conflict(self, port: int, name: str | None) -> str | None:
+        owner_tunnel = self._port_owners.get(port)
+        if owner_tunnel and owner_tunnel != name and (
+                owner_tunnel in self._starting or self.get_status(owner_tunnel) == TunnelStatus.RUNNING):
+            return f"Port {port} is already used by tunnel '{owner_tunnel}'"
+
+        if self.port_scanner is None:
+            return None
+        process = self._processes.get(name) if name else None
+        own_pid = process.pid if process is not None else None
+        for owner in self.port_scanner.find_by_port(port):
+            if owner.protocol == "tcp" and owner.status == "LISTEN" and owner.pid != own_pid:
+                return f"Port {port} is already in use by {owner.process_name} (PID: {owner.pid})"
+        return None
+
+    def _release_port(self, name: str) -> None:
+        with self._port_lock:
+            if name in self.tunnels and self._port_owners.get(self.tunnels[name].local_port) == name:
+                del self._port_owners[self.tunnels[name].local_port]
+
+    def allocate_ports(self, count: int = 1, refresh: bool = True) -> list[int]:
+        """
+        Find free local ports in `port_range`.
+
+        Ports seen by the scanner and ports configured for other tunnels are
+        skipped. Fewer than `count` ports are returned if the range is exhausted.
+        """
+        if refresh:
+            self._allocator.invalidate()
+        return self._allocator.allocate(
+            count,
+            port_range=self.port_range,
+            exclude=[tunnel.local_port for tunnel in self.tunnels.values()],
+        )
+
+    def get_last_error(self, name: str) -> str | None:
+        """Get the reason the last start of a tunnel failed."""
+        return self._errors.get(name)
+
+    def restore_enabled(self,
+                        on_result: Callable[[str, TunnelStatus], None] | None = None,
+                        max_workers: int = 8,
+                        grace: float = 2.0) -> dict[str, TunnelStatus]:
+        """
+        Start every tunnel marked enabled in the saved configuration.
+
+        Tunnels are started in parallel. Each one is given `grace` seconds to
+        fail (e.g. port in use, host unreachable) before it is reported as running.
+
+        Args:
+            on_result: Called with (name, status) as each tunnel finishes starting.
+            max_workers: Maximum number of tunnels started concurrently.
+            grace: Seconds to watch each ssh process for an early exit.
+
+        Returns:
+            Mapping of tunnel name to resulting status.
+        """
+        names = [name for name, config in self.tunnels.items()
+                 if config.enabled and name not in self._processes]
+        results: dict[str, TunnelStatus] = {}
+        if not names:
+            return results
+
+        # One scan serves the conflict checks of every tunnel
+        if self.port_scanner is not None:
+            self.port_scanner.scan()
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as pool:
+            futures = {pool.submit(self._restore_one, name, grace): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    print(f"Error restoring tunnel {name}: {e}")
+                    status = TunnelStatus.ERROR
+                results[name] = status
+                if on_result:
+                    on_result(name, status)
+
+        return results
+
+    def _restore_one(self, name: str, grace: float) -> TunnelStatus:
+        """Start a tunnel and wait briefly to see whether it stays up."""
+        status = self.start_tunnel(name)
+        if status != TunnelStatus.RUNNING or grace <= 0:
+            return status
+        process = self._processes.get(name)
+        if process is None:
+            return TunnelStatus.ERROR
+        try:
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            return TunnelStatus.RUNNING
+        return self.get_status(name)
+
     def stop_tunnel(self, name: str) -> TunnelStatus:
         """Stop an SSH tunnel."""
+        if name in self._processes:
+            metrics.TUNNEL_STOPS.inc()
+        self._terminate(name)
+
+        if name in self.tunnels:
+            self.tunnels[name].enabled = False
+            self._save_config()
+
+        return TunnelStatus.STOPPED
+
+    def _terminate(self, name: str) -> None:
+        """Terminate a tunnel's ssh process without changing its configuration."""
         if name in self._processes:
             process = self._processes[name]
             process.terminate()
@@ -136,13 +426,11 @@ class TunnelManager:
             except subprocess.TimeoutExpired:
                 process.kill()
             del self._processes[name]
+            metrics.TUNNELS_UP.set(len(self._processes))
+        self._started_at.pop(name, None)
+        self._release_port(name)
 
-        if name in self.tunnels:
-            self.tunnels[name].enabled = False
-            self._save_config()
-
-        return TunnelStatus.STOPPED
-
+    @traced("TunnelManager.get_status")
     def get_status(self, name: str) -> TunnelStatus:
         """Get the current status of a tunnel."""
         if name not in self._processes:
@@ -153,13 +441,82 @@ class TunnelManager:
             return TunnelStatus.RUNNING
         else:
             # Process has exited
-            del self._processes[name]
+            self._processes.pop(name, None)
+            metrics.TUNNEL_EXITS.inc()
+            metrics.TUNNELS_UP.set(len(self._processes))
             return TunnelStatus.ERROR
 
     def get_all_tunnels(self) -> list[TunnelConfig]:
         """Get all tunnel configurations."""
         return list(self.tunnels.values())
 
+    def collect_metrics(self, probe: bool = True) -> None:
+        """
+        Record a metrics sample for every running tunnel.
+
+        Args:
+            probe: If True, also measure the connect time of each local forward port.
+        """
+        targets = {
+            name: (self.tunnels[name].local_port, process.pid)
+            for name, process in list(self._processes.items())
+            if name in self.tunnels and process.poll() is None
+        }
+        if not targets:
+            return
+        samples = self._metrics_collector.collect(targets, probe=probe)
+
+        for name, sample in samples.items():
+            tunnel_metrics = self._metrics.setdefault(name, TunnelMetrics())
+            tunnel_metrics.record(sample)
+            # First successful probe marks the forward as established
+            if tunnel_metrics.connect_latency is None and sample.probe_rtt is not None:
+                started = self._started_at.get(name, sample.timestamp)
+                tunnel_metrics.connect_latency = sample.timestamp - started
+
+    def start_metrics(self, interval: float = 5.0, probe_interval: float = 0) -> None:
+        """
+        Collect metrics every `interval` seconds on a background thread.
+
+        UI refreshes then only read the samples with get_metrics().
+
+        Args:
+            probe_interval: Seconds between connect probes of the forward ports;
+                0 never probes. A probe opens a connection to the remote
+                service, so keep this well above `interval`.
+        """
+        if self._metrics_thread is not None:
+            return
+        self._metrics_stop.clear()
+        self._metrics_thread = threading.Thread(
+            target=self._collect_loop, args=(interval, probe_interval), name="tunnel-metrics",
+            daemon=True
+        )
+        self._metrics_thread.start()
+
+    def stop_metrics(self) -> None:
+        """Stop the background collection started by start_metrics()."""
+        thread, self._metrics_thread = self._metrics_thread, None
+        if thread is not None:
+            self._metrics_stop.set()
+            thread.join(timeout=5)
+
+    def _collect_loop(self, interval: float, probe_interval: float) -> None:
+        next_probe = 0.0
+        while not self._metrics_stop.wait(interval):
+            now = time.monotonic()
+            probe = probe_interval > 0 and now >= next_probe
+            if probe:
+                next_probe = now + probe_interval
+            try:
+                self.collect_metrics(probe=probe)
+            except Exception as e:
+                print(f"Error collecting tunnel metrics: {e}")
+
+    def get_metrics(self, name: str) -> TunnelMetrics | None:
+        """Get the rolling metrics for a tunnel, if any have been collected."""
+        return self._metrics.get(name)
+
     def _build_ssh_command(self, config: TunnelConfig) -> list[str]:
         """Build the SSH command for a tunnel."""
         cmd = ["ssh", "-N", "-L"]
@@ -172,6 +529,10 @@ class TunnelManager:
         return cmd
 
     def stop_all(self) -> None:
-        """Stop all running tunnels."""
+        """
+        Stop all running tunnels.
+
+        The enabled flags are kept so the tunnels can be restored on next launch.
+        """
         for name in list(self._processes.keys()):
-            self.stop_tunnel(name)
+            self._terminate(name)
@@ -0,0 +1,196 @@
+"""
+TunnelMetrics module - Rolling traffic and latency statistics for SSH tunnels.
+"""
+
+import socket
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import psutil
+
+# Number of samples kept per tunnel (one sample per collection pass)
+WINDOW_SIZE = 60
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+@dataclass
+class TunnelSample:
+    """A single metrics sample for a tunnel."""
+    timestamp: float
+    bytes_in: int  # Cumulative bytes read by the tunnel process
+    bytes_out: int  # Cumulative bytes written by the tunnel process
+    connections: int  # Established connections on the local forward port
+    probe_rtt: float | None  # Seconds to connect to the local forward port
+
+
+class TunnelMetrics:
+    """
+    Fixed-size rolling window of samples for one tunnel.
+
+    Samples are normally recorded by TunnelMetricsCollector, but record()
+    can be fed directly by any other traffic source.
+    """
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.samples: deque[TunnelSample] = deque(maxlen=window)
+        self.connect_latency: float | None = None
+
+    def record(self, sample: TunnelSample) -> None:
+        """Append a sample, evicting the oldest one when the window is full."""
+        self.samples.append(sample)
+
+    def reset(self) -> None:
+        """Clear all samples (e.g. when the tunnel is restarted)."""
+        self.samples.clear()
+        self.connect_latency = None
+
+    def latest(self) -> TunnelSample | None:
+        """Return the most recent sample."""
+        return self.samples[-1] if self.samples else None
+
+    def throughput(self) -> list[float]:
+        """Return bytes/s (in + out) between consecutive samples."""
+        rates = []
+        prev = None
+        # Copy first: the collector may append from its background thread
+        for sample in list(self.samples):
+            if prev is not None:
+                elapsed = sample.timestamp - prev.timestamp
+                delta = (sample.bytes_in - prev.bytes_in) + (sample.bytes_out - prev.bytes_out)
+                rates.append(max(delta, 0) / elapsed if elapsed > 0 else 0.0)
+            prev = sample
+        return rates
+
+    def to_dict(self) -> dict:
+        """Return a summary of the current metrics."""
+        latest = self.latest()
+        rates = self.throughput()
+        return {
+            "bytes_in": latest.bytes_in if latest else 0,
+            "bytes_out": latest.bytes_out if latest else 0,
+            "connections": latest.connections if latest else 0,
+            "probe_rtt": latest.probe_rtt if latest else None,
+            "connect_latency": self.connect_latency,
+            "throughput": rates[-1] if rates else 0.0,
+        }
+
+
+def sparkline(values: list[float], width: int = 20) -> str:
+    """Render the last `width` values as a unicode sparkline."""
+    values = values[-width:]
+    if not values:
+        return ""
+    peak = max(values)
+    if peak <= 0:
+        return SPARK_CHARS[0] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[int(v / peak * top)] for v in values)
+
+
+class TunnelMetricsCollector:
+    """
+    Collects samples for many tunnels in a single pass.
+
+    Connection counts come from one net_connections() call shared by all
+    tunnels, so a pass costs O(connections + tunnels) regardless of how
+    many tunnels are configured. Probes run concurrently, so a pass takes
+    at most about one probe_timeout however many tunnels are probed. Each
+    probe opens a real connection through the tunnel, so callers should
+    probe sparingly; the probes' own sockets are not counted as clients.
+    """
+
+    def __init__(self, probe_timeout: float = 0.2, max_probes: int = 16):
+        self.probe_timeout = probe_timeout
+        self.max_probes = max_probes
+        self._procs: dict[int, psutil.Process] = {}
+        # (address, port) of the client end of the last probes
+        self._probe_sources: set[tuple[str, int]] = set()
+
+    def collect(self, targets: dict[str, tuple[int, int]],
+                probe: bool = True) -> dict[str, TunnelSample]:
+        """
+        Sample all running tunnels.
+
+        Args:
+            targets: Mapping of tunnel name to (local_port, pid).
+            probe: If True, measure a TCP connect to each local forward port.
+
+        Returns:
+            Mapping of tunnel name to its new sample.
+        """
+        now = time.monotonic()
+        conn_counts = self._count_connections({port for port, _ in targets.values()})
+
+        # Drop cached handles for processes that are no longer tracked
+        pids = {pid for _, pid in targets.values()}
+        for pid in list(self._procs):
+            if pid not in pids:
+                del self._procs[pid]
+
+        rtts: dict[int, float | None] = {}
+        if probe and targets:
+            self._probe_sources = set()
+            ports = sorted({port for port, _ in targets.values()})
+            with ThreadPoolExecutor(max_workers=min(self.max_probes, len(ports)),
+                                    thread_name_prefix="tunnel-probe") as pool:
+                rtts = dict(zip(ports, pool.map(self._probe, ports), strict=True))
+
+        samples = {}
+        for name, (port, pid) in targets.items():
+            bytes_in, bytes_out = self._io_counters(pid)
+            samples[name] = TunnelSample(
+                timestamp=now,
+                bytes_in=bytes_in,
+                bytes_out=bytes_out,
+                connections=conn_counts.get(port, 0),
+                probe_rtt=rtts.get(port),
+            )
+        return samples
+
+    def _count_connections(self, ports: set[int]) -> dict[int, int]:
+        """Count established inbound connections per local forward port, probes excluded."""
+        counts: dict[int, int] = {}
+        if not ports:
+            return counts
+        probes = self._probe_sources
+        try:
+            for conn in psutil.net_connections(kind='tcp'):
+                if conn.status != 'ESTABLISHED' or not conn.laddr:
+                    continue
+                if conn.raddr and (conn.raddr.ip, conn.raddr.port) in probes:
+                    continue
+                if conn.laddr.port in ports:
+                    counts[conn.laddr.port] = counts.get(conn.laddr.port, 0) + 1
+        except psutil.AccessDenied:
+            pass
+        return counts
+
+    def _io_counters(self, pid: int) -> tuple[int, int]:
+        """Return cumulative (read, written) bytes for a tunnel process."""
+        try:
+            proc = self._procs.get(pid)
+            if proc is None:
+                proc = psutil.Process(pid)
+                self._procs[pid] = proc
+            io = proc.io_counters()
+            # read_chars/write_chars include socket traffic on Linux
+            return (getattr(io, 'read_chars', io.read_bytes),
+                    getattr(io, 'write_chars', io.write_bytes))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, AttributeError):
+            # io_counters() is not available on macOS
+            self._procs.pop(pid, None)
+            return (0, 0)
+
+    def _probe(self, port: int) -> float | None:
+        """Return the time taken to connect to a local forward port."""
+        start = time.perf_counter()
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=self.probe_timeout) as sock:
+                elapsed = time.perf_counter() - start
+                self._probe_sources.add(sock.getsockname()[:2])
+                return elapsed
+        except OSError:
+            return None
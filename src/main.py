@@ -7,18 +7,41 @@ and manage SSH tunnels.
 
 import sys
 
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtWidgets import QApplication
+from src.utils.startup import StartupTimeline
 
-from src.core.version import VERSION
-from src.ui.splash_screen import SplashScreen
-from src.ui.tray_icon import TrayIcon
-from src.utils.config import Config
-from src.utils.updater import Updater
+# Qt, the UI modules and the updater are imported inside main() so that
+# headless subcommands never load them and the tray can appear sooner.
 
 
 def main():
     """Application entry point."""
+    # Headless subcommands, e.g. `portpilot alloc --count 50`
+    from src.cli import COMMANDS, run
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(run(sys.argv[1:]))
+
+    timeline = StartupTimeline()
+
+    from PyQt6.QtCore import QObject, Qt, pyqtSignal
+    from PyQt6.QtWidgets import QApplication
+
+    from src.core.port_scanner import PortScanner
+    from src.core.tunnel_manager import TunnelManager
+    from src.core.version import VERSION
+    from src.ui.splash_screen import SplashScreen
+    from src.ui.tray_icon import TrayIcon
+    from src.utils.config import Config
+    from src.utils.startup import StartupTasks
+
+    class TaskSignals(QObject):
+        """Delivers background startup task results to the GUI thread."""
+        finished = pyqtSignal(str, object, object)
+
+    timeline.mark("imports done")
+
+    # Cleared once the timeline has been printed
+    show_timeline = "--startup-timeline" in sys.argv
+
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
@@ -28,11 +51,13 @@ def main():
     app.setQuitOnLastWindowClosed(False)
     app.setApplicationName("PortPilot")
     app.setApplicationVersion(VERSION)
+    timeline.mark("app created")
 
     # Show splash screen
     splash = SplashScreen()
     splash.show()
     app.processEvents()
+    timeline.mark("splash shown")
 
     # Load configuration
     config = Config()
@@ -40,59 +65,113 @@ def main():
     splash.set_progress(30)
     app.processEvents()
 
-    # Check for updates on startup
-    splash.set_status("Checking for updates...")
-    splash.set_progress(50)
-    app.processEvents()
-
-    update_available = False
-    update_message = ""
-    if config.get("check_updates", True):
-        updater = Updater()
-        update_available, update_message = updater.check_for_updates()
+    # The first scan, tunnel loading and the update check run concurrently
+    # in the background; the tray is shown without waiting for any of them.
+    port_scanner = PortScanner(namespaces=config.get("scan_namespaces", False),
+                               parallel_inodes=config.get("parallel_inode_resolution", True),
+                               tcp_info=config.get("tcp_info", False),
+                               unix_sockets=config.get("unix_sockets", False),
+                               raw_sockets=config.get("raw_sockets", False))
+    low, high = config.get("tunnel_port_range", TunnelManager.DEFAULT_PORT_RANGE)
+    tunnel_manager = TunnelManager(port_scanner=port_scanner, port_range=(low, high), load=False)
+    tunnel_manager.start_metrics(probe_interval=config.get("tunnel_probe_interval", 0))
+    app.aboutToQuit.connect(tunnel_manager.stop_metrics)
+
+    metrics_port = config.get("metrics_port")
+    if metrics_port:
+        from src.core.metrics import MetricsServer
+        try:
+            MetricsServer(int(metrics_port)).start()
+        except OSError as e:
+            print(f"Could not start metrics endpoint on port {metrics_port}: {e}")
+
+    socket_listener = None
+    if config.get("socket_events", False):
+        from src.core.sock_diag import SocketCloseListener
+        # The tray's periodic scan picks up new sockets, so no extra reconciliation
+        socket_listener = SocketCloseListener(port_scanner, reconcile_interval=None)
+        if socket_listener.start():
+            app.aboutToQuit.connect(socket_listener.stop)
+        else:
+            print(socket_listener.error)
+
+    def check_for_updates():
+        from src.utils.http_cache import HttpCache
+        from src.utils.updater import Updater
+        updater = Updater(cache=HttpCache(max_age=config.get("update_check_interval", 21600)))
+        return updater, updater.check_for_updates()
 
+    # Create system tray icon
     splash.set_status("Initializing tray...")
     splash.set_progress(70)
-    app.processEvents()
-
-    # Create system tray icon
-    tray = TrayIcon(app)
+    reverse_dns = None
+    if config.get("reverse_dns", False):
+        from src.core.name_resolution import ReverseDns
+        reverse_dns = ReverseDns()
+    tray = TrayIcon(app, port_scanner=port_scanner, tunnel_manager=tunnel_manager,
+                    reverse_dns=reverse_dns)
+    if socket_listener is not None and socket_listener.running:
+        socket_listener.on_change = lambda diff: tray.scan_finished.emit()
+    tasks = StartupTasks(timeline)
+    signals = TaskSignals()
+
+    def on_task_finished(name, result, error):
+        nonlocal show_timeline
+        if error is not None:
+            print(f"Startup task '{name}' failed: {error}")
+        elif name == "scan":
+            tray.on_scan_finished()
+        elif name == "tunnels":
+            tray.on_tunnels_loaded()
+            # Bring back tunnels that were enabled when the app last exited
+            if config.get("restore_tunnels", True):
+                tray.restore_tunnels()
+        elif name == "update check":
+            updater, (update_available, update_message) = result
+            if update_available:
+                from PyQt6.QtWidgets import QMessageBox
+                reply = QMessageBox.question(
+                    None,
+                    "Update Available",
+                    f"{update_message}\n\nWould you like to download the update?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.Yes:
+                    tray.download_update(updater)
+
+        if show_timeline and all(f.done() for f in tasks.futures.values()):
+            show_timeline = False
+            print(timeline.format(), file=sys.stderr)
+
+    signals.finished.connect(on_task_finished)
+    tasks.submit("scan", port_scanner.scan, on_done=signals.finished.emit)
+    tasks.submit("tunnels", tunnel_manager.load, on_done=signals.finished.emit)
+    if config.get("check_updates", True):
+        tasks.submit("update check", check_for_updates, on_done=signals.finished.emit)
+    tasks.shutdown()
 
+    tray.show()
+    timeline.mark("tray shown")
     splash.set_status("Ready!")
     splash.set_progress(100)
-    app.processEvents()
+    splash.close()
+
+    # One application-wide stylesheet for the dashboard, tray menu and dialogs.
+    # Applied after the splash closes, which draws its own translucent frame.
+    from src.ui.theme import apply_theme
+    apply_theme(app)
+
+    # Show notification
+    tray.showMessage(
+        "PortPilot",
+        "PortPilot is running in the system tray.",
+        TrayIcon.MessageIcon.Information,
+        2000
+    )
 
-    # Close splash and show main UI
-    def finish_startup():
-        splash.close()
-        tray.show()
-
-        # Show update notification if available
-        if update_available:
-            from PyQt6.QtWidgets import QMessageBox
-            reply = QMessageBox.question(
-                None,
-                "Update Available",
-                f"{update_message}\n\nWould you like to download the update?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.Yes:
-                updater.download_and_install()
-
-        # Show notification
-        tray.showMessage(
-            "PortPilot",
-            "PortPilot is running in the system tray.",
-            TrayIcon.MessageIcon.Information,
-            2000
-        )
-
-        # Start minimized or show dashboard
-        if not config.get("start_minimized", False):
-            tray._open_dashboard()
-
-    # Delay closing splash for smooth transition
-    QTimer.singleShot(1500, finish_startup)
+    # Start minimized or show dashboard (deferred until tunnels are loaded)
+    if not config.get("start_minimized", False):
+        tray._open_dashboard()
 
     sys.exit(app.exec())
 
@@ -2,14 +2,31 @@
 Dashboard module - Main window with tabs for ports and tunnels.
 """
 
+import time
+
 from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QAction
-from PyQt6.QtWidgets import QMainWindow, QStatusBar, QTabWidget, QVBoxLayout, QWidget
-
+from PyQt6.QtWidgets import (
+    QFileDialog,
+    QLabel,
+    QMainWindow,
+    QStatusBar,
+    QTabWidget,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.core import metrics
+from src.core.name_resolution import ReverseDns
 from src.core.port_scanner import PortScanner
+from src.core.process_details import ProcessDetailService
+from src.core.rollup import PortRollup
+from src.core.tracing import TRACER
 from src.core.tunnel_manager import TunnelManager
 from src.core.version import VERSION
+from src.ui.theme import apply_theme
 from src.ui.widgets.port_table import PortTableWidget
+from src.ui.widgets.summary import SummaryWidget
 from src.ui.widgets.tunnel_list import TunnelListWidget
 
 
@@ -20,12 +37,17 @@ class Dashboard(QMainWindow):
     Tabs:
     - Active Ports: Searchable table of listening ports with kill functionality
     - Tunnel Manager: List of saved tunnels with add/edit/toggle controls
+    - Summary: Connection counts per process, port, remote host and state
     """
 
-    def __init__(self, port_scanner: PortScanner, tunnel_manager: TunnelManager, parent=None):
+    def __init__(self, port_scanner: PortScanner, tunnel_manager: TunnelManager,
+                 reverse_dns: ReverseDns | None = None, parent=None):
         super().__init__(parent)
         self.port_scanner = port_scanner
         self.tunnel_manager = tunnel_manager
+        self.reverse_dns = reverse_dns
+        # Kept up to date from the scanner's diffs, whoever triggers the scan
+        self.rollup = PortRollup(port_scanner)
 
         self._setup_window()
         self._setup_menubar()
@@ -67,6 +89,10 @@ class Dashboard(QMainWindow):
         refresh_action.triggered.connect(self._refresh_all)
         file_menu.addAction(refresh_action)
 
+        export_trace_action = QAction("Export &Trace...", self)
+        export_trace_action.triggered.connect(self._export_trace)
+        file_menu.addAction(export_trace_action)
+
         file_menu.addSeparator()
 
         exit_action = QAction("E&xit", self)
@@ -82,6 +108,12 @@ class Dashboard(QMainWindow):
         dark_mode_action.setChecked(True)
         view_menu.addAction(dark_mode_action)
 
+        self.hud_action = QAction("Performance &HUD", self)
+        self.hud_action.setCheckable(True)
+        self.hud_action.setChecked(TRACER.enabled)
+        self.hud_action.toggled.connect(self._set_tracing)
+        view_menu.addAction(self.hud_action)
+
         # Help menu
         help_menu = menubar.addMenu("&Help")
 
@@ -101,19 +133,29 @@ class Dashboard(QMainWindow):
         self.tabs = QTabWidget()
 
         # Active Ports tab
-        self.port_table = PortTableWidget(self.port_scanner)
+        self.port_table = PortTableWidget(self.port_scanner, details=ProcessDetailService())
         self.tabs.addTab(self.port_table, "Active Ports")
 
         # Tunnel Manager tab
         self.tunnel_list = TunnelListWidget(self.tunnel_manager)
         self.tabs.addTab(self.tunnel_list, "Tunnel Manager")
 
+        # Summary tab
+        self.summary = SummaryWidget(self.rollup, reverse_dns=self.reverse_dns)
+        self.tabs.addTab(self.summary, "Summary")
+
         layout.addWidget(self.tabs)
 
     def _setup_statusbar(self):
         """Create the status bar."""
         self.statusbar = QStatusBar()
         self.setStatusBar(self.statusbar)
+
+        # Last refresh breakdown, shown while tracing is enabled
+        self.hud_label = QLabel()
+        self.hud_label.setObjectName("hudLabel")
+        self.hud_label.setVisible(TRACER.enabled)
+        self.statusbar.addPermanentWidget(self.hud_label)
         self._update_status()
 
     def _setup_refresh_timer(self):
@@ -123,21 +165,20 @@ class Dashboard(QMainWindow):
         self.refresh_timer.start(5000)  # Refresh every 5 seconds
 
     def _load_stylesheet(self):
-        """Load the dark theme stylesheet."""
-        try:
-            from pathlib import Path
-            style_path = Path(__file__).parent / "styles" / "dark_theme.qss"
-            if style_path.exists():
-                with open(style_path) as f:
-                    self.setStyleSheet(f.read())
-        except Exception as e:
-            print(f"Error loading stylesheet: {e}")
+        """Apply the shared dark theme stylesheet."""
+        apply_theme()
 
     def _refresh_all(self):
         """Refresh all data."""
-        self.port_table.refresh()
-        self.tunnel_list.refresh()
-        self._update_status()
+        start = time.perf_counter()
+        with TRACER.span("Dashboard.refresh"):
+            self.port_table.refresh()
+            self.tunnel_list.refresh()
+            self.summary.refresh()
+            self._update_status()
+        metrics.UI_REFRESH_DURATION.observe(time.perf_counter() - start)
+        if TRACER.enabled:
+            self._update_hud()
 
     def _update_status(self):
         """Update the status bar."""
@@ -145,6 +186,37 @@ class Dashboard(QMainWindow):
         tunnels = len([t for t in self.tunnel_manager.get_all_tunnels() if t.enabled])
         self.statusbar.showMessage(f"Listening Ports: {ports} | Active Tunnels: {tunnels}")
 
+    def _set_tracing(self, enabled: bool):
+        """Turn span tracing and the status bar HUD on or off."""
+        if enabled:
+            TRACER.enable()
+        else:
+            TRACER.disable()
+        self.hud_label.setVisible(enabled)
+        self.hud_label.setText("Tracing - refresh (F5) to measure" if enabled else "")
+
+    def _update_hud(self):
+        """Show where the last refresh spent its time."""
+        root = TRACER.last("Dashboard.refresh")
+        if root is None:
+            return
+        parts = [f"refresh {root.duration * 1000:.1f} ms"]
+        for name, total, count in TRACER.breakdown("Dashboard.refresh"):
+            label = name.rsplit(".", 1)[-1].lstrip("_")
+            calls = f" x{count}" if count > 1 else ""
+            parts.append(f"{label}{calls} {total * 1000:.1f}")
+        self.hud_label.setText(" | ".join(parts))
+
+    def _export_trace(self):
+        """Save the collected spans as Chrome trace-event JSON."""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "portpilot-trace.json", "Trace (*.json)"
+        )
+        if not path:
+            return
+        count = TRACER.export_chrome_trace(path)
+        self.statusbar.showMessage(f"Exported {count} spans to {path}", 5000)
+
     def _show_about(self):
         """Show about dialog."""
         from PyQt6.QtWidgets import QMessageBox
@@ -0,0 +1,77 @@
+"""
+Icons module - Lazy, process-wide cache of qtawesome icons.
+
+qtawesome pulls in qtpy and loads its icon fonts on import, so it is only
+imported the first time an icon is actually needed. Icons are cached by
+(name, color, size): QIcon/QPixmap are implicitly shared, so handing the
+same instance to every Kill button costs no extra rendering or memory.
+"""
+
+import time
+
+from PyQt6.QtGui import QIcon, QPixmap
+
+_cache: dict[tuple[str, str | None, int | None], QIcon | QPixmap] = {}
+_stats = {"hits": 0, "misses": 0, "build_seconds": 0.0}
+
+
+def icon(name: str, color: str | None = None) -> QIcon:
+    """Return a cached qtawesome icon, importing qtawesome on first use."""
+    key = (name, color, None)
+    cached = _cache.get(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached  # type: ignore[return-value]
+
+    import qtawesome as qta
+
+    start = time.perf_counter()
+    result = qta.icon(name) if color is None else qta.icon(name, color=color)
+    _record_miss(key, result, start)
+    return result
+
+
+def pixmap(name: str, color: str | None = None, size: int = 16) -> QPixmap:
+    """Return a cached pixmap of a qtawesome icon rendered at `size` x `size`."""
+    key = (name, color, size)
+    cached = _cache.get(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached  # type: ignore[return-value]
+
+    start = time.perf_counter()
+    result = icon(name, color).pixmap(size, size)
+    _record_miss(key, result, start)
+    return result
+
+
+def cache_stats() -> dict:
+    """
+    Return cache counters.
+
+    `saved_ms` estimates the rendering time avoided, assuming every hit
+    would have cost as much as an average miss.
+    """
+    hits, misses = _stats["hits"], _stats["misses"]
+    build_ms = _stats["build_seconds"] * 1000
+    return {
+        "entries": len(_cache),
+        "hits": hits,
+        "misses": misses,
+        "allocations_saved": hits,
+        "build_ms": build_ms,
+        "saved_ms": hits * build_ms / misses if misses else 0.0,
+    }
+
+
+def clear_cache() -> None:
+    """Drop all cached icons and reset the counters."""
+    _cache.clear()
+    _stats.update(hits=0, misses=0, build_seconds=0.0)
+
+
+def _record_miss(key: tuple[str, str | None, int | None],
+                 value: QIcon | QPixmap, start: float) -> None:
+    _cache[key] = value
+    _stats["misses"] += 1
+    _stats["build_seconds"] += time.perf_counter() - start
@@ -0,0 +1,36 @@
+"""
+Theme module - Loads the application stylesheet once per process.
+
+The stylesheet is applied to the QApplication so the dashboard, tray menu
+and dialogs share a single parsed copy instead of each window re-reading
+and re-parsing the QSS file.
+"""
+
+from pathlib import Path
+
+from PyQt6.QtWidgets import QApplication
+
+STYLES_DIR = Path(__file__).parent / "styles"
+
+_stylesheets: dict[str, str] = {}
+
+
+def load_stylesheet(name: str = "dark_theme") -> str:
+    """Return the contents of a stylesheet, reading the file only once."""
+    if name not in _stylesheets:
+        try:
+            _stylesheets[name] = (STYLES_DIR / f"{name}.qss").read_text()
+        except OSError as e:
+            print(f"Error loading stylesheet: {e}")
+            _stylesheets[name] = ""
+    return _stylesheets[name]
+
+
+def apply_theme(app: QApplication | None = None, name: str = "dark_theme") -> None:
+    """Apply a stylesheet application-wide (no-op if it is already applied)."""
+    app = app or QApplication.instance()
+    if app is None:
+        return
+    stylesheet = load_stylesheet(name)
+    if app.styleSheet() != stylesheet:
+        app.setStyleSheet(stylesheet)
@@ -2,13 +2,16 @@
 TrayIcon module - Main system tray entry point for PortPilot.
 """
 
-import qtawesome as qta
-from PyQt6.QtCore import QTimer
+import threading
+
+from PyQt6.QtCore import QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon
 from PyQt6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
 
 from src.core.port_scanner import PortScanner
 from src.core.tunnel_manager import TunnelManager, TunnelStatus
+from src.ui.icons import icon
+from src.utils.config import Config
 
 
 class TrayIcon(QSystemTrayIcon):
@@ -21,18 +24,42 @@ class TrayIcon(QSystemTrayIcon):
     - Dashboard window
     """
 
-    def __init__(self, app: QApplication, parent=None):
+    # Emitted from the restore thread with (tunnel name, TunnelStatus value)
+    tunnel_restored = pyqtSignal(str, str)
+    # Emitted from the background scan thread when a new snapshot is ready
+    scan_finished = pyqtSignal()
+    # Emitted from the update download thread with (bytes done, total or None)
+    update_progress = pyqtSignal(object, object)
+    # Emitted when the update download finishes with (success, message)
+    update_finished = pyqtSignal(bool, str)
+
+    def __init__(self, app: QApplication, port_scanner: PortScanner | None = None,
+                 tunnel_manager: TunnelManager | None = None, reverse_dns=None, parent=None):
         super().__init__(parent)
         self.app = app
-        self.port_scanner = PortScanner()
-        self.tunnel_manager = TunnelManager()
+        self.reverse_dns = reverse_dns  # Optional ReverseDns for the dashboard
+        self.port_scanner = port_scanner or PortScanner()
+        if tunnel_manager is None:
+            low, high = Config().get("tunnel_port_range", TunnelManager.DEFAULT_PORT_RANGE)
+            tunnel_manager = TunnelManager(port_scanner=self.port_scanner, port_range=(low, high))
+        self.tunnel_manager = tunnel_manager
         self.dashboard = None
+        self._dashboard_pending = False
+        self._scan_thread: threading.Thread | None = None
+        # Menu key -> QAction, in menu order; see _sync_menu()
+        self._tunnel_actions: dict = {}
+        self._port_actions: dict = {}
 
         self._setup_icon()
         self._setup_menu()
         self._setup_refresh_timer()
 
         self.activated.connect(self._on_activated)
+        self.tunnel_restored.connect(self._on_tunnel_restored)
+        self.scan_finished.connect(self._update_ports_menu)
+        self.scan_finished.connect(self._update_dashboard_ports)
+        self.update_progress.connect(self._on_update_progress)
+        self.update_finished.connect(self._on_update_finished)
 
     def _setup_icon(self):
         """Set up the tray icon."""
@@ -50,36 +77,55 @@ class TrayIcon(QSystemTrayIcon):
         self.menu = QMenu()
 
         # Tunnels section
-        self.tunnels_menu = self.menu.addMenu(qta.icon('fa5s.link', color='#00d4ff'), "Tunnels")
+        self.tunnels_menu = self.menu.addMenu("Tunnels")
         self._update_tunnels_menu()
 
         self.menu.addSeparator()
 
         # Active ports section
-        self.ports_menu = self.menu.addMenu(qta.icon('fa5s.plug', color='#4CAF50'), "Active Ports")
+        self.ports_menu = self.menu.addMenu("Active Ports")
         self._update_ports_menu()
 
         self.menu.addSeparator()
 
         # Dashboard action
-        dashboard_action = QAction(qta.icon('fa5s.tachometer-alt', color='#2196F3'), "Open Dashboard", self.menu)
+        dashboard_action = QAction("Open Dashboard", self.menu)
         dashboard_action.triggered.connect(self._open_dashboard)
         self.menu.addAction(dashboard_action)
 
         # Refresh action
-        refresh_action = QAction(qta.icon('fa5s.sync-alt', color='#e0e0e0'), "Refresh", self.menu)
+        refresh_action = QAction("Refresh", self.menu)
         refresh_action.triggered.connect(self._refresh_all)
         self.menu.addAction(refresh_action)
 
         self.menu.addSeparator()
 
         # Exit action
-        exit_action = QAction(qta.icon('fa5s.power-off', color='#f44336'), "Exit", self.menu)
+        exit_action = QAction("Exit", self.menu)
         exit_action.triggered.connect(self._exit_app)
         self.menu.addAction(exit_action)
 
+        # Icons are created the first time the menu is opened
+        self._menu_icons = [
+            (self.tunnels_menu, 'fa5s.link', '#00d4ff'),
+            (self.ports_menu, 'fa5s.plug', '#4CAF50'),
+            (dashboard_action, 'fa5s.tachometer-alt', '#2196F3'),
+            (refresh_action, 'fa5s.sync-alt', '#e0e0e0'),
+            (exit_action, 'fa5s.power-off', '#f44336'),
+        ]
+        self.menu.aboutToShow.connect(self._load_menu_icons)
+        # Show the latest snapshot (e.g. from a dashboard refresh) without scanning
+        self.menu.aboutToShow.connect(self._update_ports_menu)
+
         self.setContextMenu(self.menu)
 
+    def _load_menu_icons(self):
+        """Set the menu icons on first show."""
+        for target, name, color in self._menu_icons:
+            target.setIcon(icon(name, color))
+        self._menu_icons = []
+        self.menu.aboutToShow.disconnect(self._load_menu_icons)
+
     def _setup_refresh_timer(self):
         """Set up auto-refresh timer."""
         self.refresh_timer = QTimer()
@@ -87,66 +133,189 @@ class TrayIcon(QSystemTrayIcon):
         self.refresh_timer.start(30000)  # Refresh every 30 seconds
 
     def _update_tunnels_menu(self):
-        """Update the tunnels submenu."""
-        self.tunnels_menu.clear()
-
-        tunnels = self.tunnel_manager.get_all_tunnels()
-        if not tunnels:
-            action = QAction("No tunnels configured", self.tunnels_menu)
-            action.setEnabled(False)
-            self.tunnels_menu.addAction(action)
-            return
+        """Update the tunnels submenu in place."""
+        if not self.tunnel_manager.loaded.is_set():
+            items = [(None, "Loading tunnels...", None)]
+        else:
+            items = []
+            for tunnel in self.tunnel_manager.get_all_tunnels():
+                running = self.tunnel_manager.get_status(tunnel.name) == TunnelStatus.RUNNING
+                status_text = "[ON]" if running else "[OFF]"
+                items.append((tunnel.name, f"{status_text} {tunnel.name} ({tunnel.local_port})", running))
+            if not items:
+                items = [(None, "No tunnels configured", None)]
 
-        for tunnel in tunnels:
-            status = self.tunnel_manager.get_status(tunnel.name)
-            status_text = "[ON]" if status == TunnelStatus.RUNNING else "[OFF]"
-            action = QAction(f"{status_text} {tunnel.name} ({tunnel.local_port})", self.tunnels_menu)
-            action.setCheckable(True)
-            action.setChecked(status == TunnelStatus.RUNNING)
-            action.triggered.connect(lambda checked, t=tunnel: self._toggle_tunnel(t.name, checked))
-            self.tunnels_menu.addAction(action)
+        self._tunnel_actions = self._sync_menu(self.tunnels_menu, self._tunnel_actions, items)
 
     def _update_ports_menu(self):
-        """Update the active ports submenu."""
-        self.ports_menu.clear()
-
-        ports = self.port_scanner.scan()
-        listening = [p for p in ports if p.status == 'LISTEN'][:10]  # Top 10
-
-        if not listening:
-            action = QAction("No listening ports", self.ports_menu)
-            action.setEnabled(False)
-            self.ports_menu.addAction(action)
-            return
-
-        for port in listening:
-            action = QAction(f"{port.local_port}: {port.process_name}", self.ports_menu)
-            self.ports_menu.addAction(action)
+        """Update the active ports submenu in place from the shared scan snapshot."""
+        items = [
+            ((port.local_port, port.local_address, port.protocol, port.pid),
+             f"{port.local_port}: {port.process_name}", None)
+            for port in self.port_scanner.get_listening_ports()[:10]  # Top 10
+        ]
+        if not items:
+            items = [(None, "No listening ports", None)]
+
+        self._port_actions = self._sync_menu(self.ports_menu, self._port_actions, items)
+
+    def _update_dashboard_ports(self):
+        """Show a new snapshot in the open dashboard without waiting for its own refresh."""
+        if self.dashboard is not None and self.dashboard.isVisible():
+            self.dashboard.port_table.show_snapshot()
+
+    def _sync_menu(self, menu: QMenu, actions: dict, items: list) -> dict:
+        """
+        Make `menu` show `items`, reusing existing actions where possible.
+
+        Args:
+            menu: Submenu to update.
+            actions: Actions currently in the menu, keyed as in `items`.
+            items: Desired (key, label, checked) entries in order. A key of None
+                marks a disabled placeholder; checked=None means not checkable.
+
+        Returns:
+            The new key -> QAction mapping.
+        """
+        desired_keys = [(key if key is not None else ("placeholder", label)) for key, label, _ in items]
+        new_actions = {}
+
+        for key in actions.keys() - set(desired_keys):
+            menu.removeAction(actions[key])
+            actions[key].deleteLater()
+
+        for key, (raw_key, label, checked) in zip(desired_keys, items, strict=True):
+            action = actions.get(key)
+            if action is None:
+                action = QAction(label, menu)
+                if raw_key is None:
+                    action.setEnabled(False)
+                elif checked is not None:
+                    action.setCheckable(True)
+                    action.triggered.connect(
+                        lambda state, name=raw_key: self._toggle_tunnel(name, state)
+                    )
+            elif action.text() != label:
+                action.setText(label)
+            if checked is not None and action.isChecked() != checked:
+                action.setChecked(checked)
+            new_actions[key] = action
+
+        # Only re-insert when membership or order changed
+        if list(new_actions.values()) != menu.actions():
+            for action in menu.actions():
+                menu.removeAction(action)
+            menu.addActions(list(new_actions.values()))
+
+        return new_actions
 
     def _toggle_tunnel(self, name: str, start: bool):
         """Toggle a tunnel on/off."""
         if start:
-            self.tunnel_manager.start_tunnel(name)
+            if self.tunnel_manager.start_tunnel(name) == TunnelStatus.ERROR:
+                self.showMessage(
+                    "PortPilot",
+                    self.tunnel_manager.get_last_error(name) or f"Could not start tunnel '{name}'.",
+                    QSystemTrayIcon.MessageIcon.Warning,
+                    5000
+                )
         else:
             self.tunnel_manager.stop_tunnel(name)
         self._update_tunnels_menu()
 
+    def restore_tunnels(self) -> threading.Thread:
+        """Restart previously enabled tunnels in the background."""
+        def run():
+            self.tunnel_manager.restore_enabled(
+                on_result=lambda name, status: self.tunnel_restored.emit(name, status.value)
+            )
+
+        thread = threading.Thread(target=run, name="tunnel-restore", daemon=True)
+        thread.start()
+        return thread
+
+    def _on_tunnel_restored(self, name: str, status: str):
+        """Report the outcome of restoring a single tunnel."""
+        self._update_tunnels_menu()
+        if status != TunnelStatus.RUNNING.value:
+            self.showMessage(
+                "PortPilot",
+                f"Could not restore tunnel '{name}'.",
+                QSystemTrayIcon.MessageIcon.Warning,
+                5000
+            )
+
+    def on_tunnels_loaded(self):
+        """Refresh once the tunnel configuration has been loaded in the background."""
+        self._update_tunnels_menu()
+        if self._dashboard_pending:
+            self._dashboard_pending = False
+            self._open_dashboard()
+
+    def on_scan_finished(self):
+        """Refresh once a background scan has completed."""
+        self._update_ports_menu()
+
+    def download_update(self, updater) -> threading.Thread:
+        """Download and install an update in the background, showing progress in the tooltip."""
+        self.showMessage("PortPilot", "Downloading update...",
+                         QSystemTrayIcon.MessageIcon.Information, 3000)
+        return updater.download_in_background(
+            progress=self.update_progress.emit,
+            on_done=self.update_finished.emit
+        )
+
+    def _on_update_progress(self, done: int, total: int | None):
+        """Show update download progress in the tray tooltip."""
+        if total:
+            self.setToolTip(f"PortPilot - Downloading update {done * 100 // total}%")
+        else:
+            self.setToolTip(f"PortPilot - Downloading update {done // 1024} KiB")
+
+    def _on_update_finished(self, success: bool, message: str):
+        """Report the outcome of an update download."""
+        self.setToolTip("PortPilot - Port Manager")
+        self.showMessage(
+            "PortPilot",
+            message,
+            QSystemTrayIcon.MessageIcon.Information if success else QSystemTrayIcon.MessageIcon.Warning,
+            5000
+        )
+
     def _open_dashboard(self):
         """Open the main dashboard window."""
         from src.ui.dashboard import Dashboard
 
+        if not self.tunnel_manager.loaded.is_set():
+            # Opened again from on_tunnels_loaded()
+            self._dashboard_pending = True
+            return
+
         if self.dashboard is None:
-            self.dashboard = Dashboard(self.port_scanner, self.tunnel_manager)
+            self.dashboard = Dashboard(self.port_scanner, self.tunnel_manager,
+                                       reverse_dns=self.reverse_dns)
 
         self.dashboard.show()
         self.dashboard.raise_()
         self.dashboard.activateWindow()
 
     def _refresh_all(self):
-        """Refresh all data."""
-        self._update_ports_menu()
+        """Refresh all data. The port scan runs in the background."""
+        self._scan_in_background()
         self._update_tunnels_menu()
 
+    def _scan_in_background(self):
+        """Refresh the shared scan snapshot without blocking the GUI thread."""
+        if self._scan_thread is not None and self._scan_thread.is_alive():
+            return
+
+        def run():
+            self.port_scanner.scan()
+            self.scan_finished.emit()
+
+        self._scan_thread = threading.Thread(target=run, name="tray-scan", daemon=True)
+        self._scan_thread.start()
+
     def _exit_app(self):
         """Clean up and exit the application."""
         self.tunnel_manager.stop_all()
@@ -2,10 +2,10 @@
 PortTableWidget - Searchable table of active ports with kill functionality.
 """
 
-import qtawesome as qta
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
+    QCheckBox,
     QHBoxLayout,
     QHeaderView,
     QLabel,
@@ -18,8 +18,14 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from src.core.name_resolution import service_table
 from src.core.port_scanner import PortScanner
+from src.core.process_details import ProcessDetails, ProcessDetailService
 from src.core.process_killer import KillResult, ProcessKiller
+from src.core.tracing import traced
+from src.ui.icons import icon
+
+DETAIL_COLUMNS = ["User", "Memory (MiB)", "Command"]
 
 
 class PortTableWidget(QWidget):
@@ -30,12 +36,24 @@ class PortTableWidget(QWidget):
     - Search/filter by port number or process name
     - Quick filter buttons for common port ranges
     - Kill button for each process
+    - Backlog and retransmit columns when the scanner collects tcp_info
+    - User, memory and command columns, filled in lazily for visible rows
+      when given a ProcessDetailService
     """
 
-    def __init__(self, port_scanner: PortScanner, parent=None):
+    # Emitted from the process details worker with a list of ProcessDetails
+    details_ready = pyqtSignal(object)
+
+    def __init__(self, port_scanner: PortScanner, details: ProcessDetailService | None = None,
+                 parent=None):
         super().__init__(parent)
         self.port_scanner = port_scanner
+        self.details = details
         self._setup_ui()
+        if details is not None:
+            details.on_ready = self.details_ready.emit
+            self.details_ready.connect(self._on_details_ready)
+            self.table.verticalScrollBar().valueChanged.connect(self._request_visible_details)
         self.refresh()
 
     def _setup_ui(self):
@@ -70,23 +88,32 @@ class PortTableWidget(QWidget):
         self.filter_db.clicked.connect(lambda: self._quick_filter([5432, 3306, 27017, 6379]))
         filter_layout.addWidget(self.filter_db)
 
+        # Unix and raw sockets, when the scanner collects them
+        self.show_other = QCheckBox("Unix/raw sockets")
+        self.show_other.setVisible(bool(self.port_scanner.unix_sockets or self.port_scanner.raw_sockets))
+        self.show_other.toggled.connect(self._apply_filter)
+        filter_layout.addWidget(self.show_other)
+
         layout.addLayout(filter_layout)
 
         # Port table
         self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "Local Port", "Address", "PID", "Process Name", "Status", "Action"
-        ])
+        columns = ["Local Port", "Service", "Address", "PID", "Process Name", "Status"]
+        if self.port_scanner.tcp_info:
+            columns += ["Backlog", "Retrans"]
+        if self.details is not None:
+            columns += DETAIL_COLUMNS
+        columns.append("Action")
+        # Header label -> column index
+        self._columns = {name: index for index, name in enumerate(columns)}
+        self.table.setColumnCount(len(columns))
+        self.table.setHorizontalHeaderLabels(columns)
 
         # Configure table
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
+        for column in range(len(columns)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(self._columns["Process Name"], QHeaderView.ResizeMode.Stretch)
 
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.table.setAlternatingRowColors(True)
@@ -99,7 +126,7 @@ class PortTableWidget(QWidget):
         refresh_layout.addStretch()
 
         self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.setIcon(qta.icon('fa5s.sync-alt', color='#e0e0e0'))
+        self.refresh_btn.setIcon(icon('fa5s.sync-alt', color='#e0e0e0'))
         self.refresh_btn.clicked.connect(self.refresh)
         refresh_layout.addWidget(self.refresh_btn)
 
@@ -112,9 +139,16 @@ class PortTableWidget(QWidget):
         self.port_scanner.scan()
         self._populate_table()
 
+    def show_snapshot(self):
+        """Show the scanner's last snapshot without rescanning."""
+        self._populate_table()
+
+    @traced("PortTableWidget._populate_table")
     def _populate_table(self):
         """Populate the table with port data."""
         ports = self.port_scanner.get_listening_ports()
+        if self.show_other.isChecked():
+            ports = ports + self.port_scanner.get_unix_sockets() + self.port_scanner.get_raw_sockets()
 
         # Apply quick filter if set
         if self._current_filter:
@@ -125,37 +159,140 @@ class PortTableWidget(QWidget):
         if search_text:
             ports = [p for p in ports if
                      search_text in str(p.local_port) or
-                     search_text in p.process_name.lower()]
+                     search_text in p.process_name.lower() or
+                     (p.protocol == "unix" and search_text in p.local_address.lower())]
 
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)  # Keep rows in place while filling them
         self.table.setRowCount(len(ports))
+        columns = self._columns
+        services = service_table()
 
         for row, port in enumerate(ports):
-            # Port
-            port_item = QTableWidgetItem(str(port.local_port))
+            # Port; Unix sockets have none and raw sockets show their IP protocol
+            if port.protocol == "unix":
+                port_text = "unix"
+            elif port.protocol == "raw":
+                port_text = f"raw/{port.local_port}"
+            else:
+                port_text = str(port.local_port)
+            port_item = QTableWidgetItem(port_text)
             port_item.setData(Qt.ItemDataRole.UserRole, port.pid)
-            self.table.setItem(row, 0, port_item)
+            self.table.setItem(row, columns["Local Port"], port_item)
+
+            # Service name from the services file
+            service = services.name(port.local_port, port.protocol) or ""
+            self.table.setItem(row, columns["Service"], QTableWidgetItem(service))
 
             # Address
-            self.table.setItem(row, 1, QTableWidgetItem(port.local_address))
+            self.table.setItem(row, columns["Address"], QTableWidgetItem(port.local_address))
 
             # PID
-            self.table.setItem(row, 2, QTableWidgetItem(str(port.pid)))
+            self.table.setItem(row, columns["PID"], QTableWidgetItem(str(port.pid)))
 
-            # Process Name
-            self.table.setItem(row, 3, QTableWidgetItem(port.process_name))
+            # Process Name, with the container for sockets in another namespace
+            if port.container_id:
+                name = f"{port.process_name} [{port.container_id[:12]}]"
+            elif port.namespace:
+                name = f"{port.process_name} [netns {port.namespace}]"
+            else:
+                name = port.process_name
+            self.table.setItem(row, columns["Process Name"], QTableWidgetItem(name))
 
             # Status
             status_item = QTableWidgetItem(port.status)
             if port.status == 'LISTEN':
                 status_item.setForeground(QColor("#4CAF50"))
-            self.table.setItem(row, 4, status_item)
+            self.table.setItem(row, columns["Status"], status_item)
+
+            if "Backlog" in columns:
+                self._set_tcp_columns(row, port)
 
             # Kill button
             kill_btn = QPushButton("Kill")
-            kill_btn.setIcon(qta.icon('fa5s.trash-alt', color='white'))
-            kill_btn.setStyleSheet("background-color: #c62828; color: white;")
+            kill_btn.setIcon(icon('fa5s.trash-alt', color='white'))
+            # Styled by QPushButton#killButton in the theme, not a per-button stylesheet
+            kill_btn.setObjectName("killButton")
             kill_btn.clicked.connect(lambda _, p=port.pid, n=port.process_name: self._kill_process(p, n))
-            self.table.setCellWidget(row, 5, kill_btn)
+            self.table.setCellWidget(row, columns["Action"], kill_btn)
+        self.table.setSortingEnabled(sorting)
+
+        if self.details is not None:
+            self._fill_details(range(self.table.rowCount()), cached_only=True)
+            self._request_visible_details()
+
+    def _visible_rows(self) -> range:
+        """Rows currently scrolled into view."""
+        count = self.table.rowCount()
+        if not count:
+            return range(0)
+        first = self.table.rowAt(0)
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        first = 0 if first < 0 else first
+        # rowAt() is -1 below the last row, or for every row before the table is shown
+        last = count - 1 if last < 0 else last
+        if not self.table.isVisible():
+            last = min(count - 1, first + 50)
+        return range(first, last + 1)
+
+    def _row_pid(self, row: int) -> int | None:
+        item = self.table.item(row, self._columns["Local Port"])
+        return item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def _request_visible_details(self):
+        """Ask for the details of the processes in view; the rest wait until scrolled to."""
+        self.details.request(pid for row in self._visible_rows() if (pid := self._row_pid(row)))
+
+    def _on_details_ready(self, results):
+        ready = {details.pid for details in results}
+        self._fill_details([row for row in self._visible_rows() if self._row_pid(row) in ready])
+
+    def _fill_details(self, rows, cached_only: bool = False):
+        """Write cached process details into the detail columns of `rows`."""
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)  # Keep rows in place while writing
+        for row in rows:
+            pid = self._row_pid(row)
+            details = self.details.get(pid) if pid else None
+            if details is None:
+                if cached_only:
+                    # Clear whatever a previous population left in this row
+                    for name in DETAIL_COLUMNS:
+                        if self.table.item(row, self._columns[name]) is not None:
+                            self.table.takeItem(row, self._columns[name])
+                    continue
+                details = ProcessDetails(pid or 0)
+            memory = QTableWidgetItem()
+            if details.memory_rss is not None:
+                memory.setData(Qt.ItemDataRole.DisplayRole, details.memory_rss // (1024 * 1024))
+            command = " ".join(details.cmdline)
+            command_item = QTableWidgetItem(command)
+            command_item.setToolTip(command)
+            self.table.setItem(row, self._columns["User"], QTableWidgetItem(details.username or ""))
+            self.table.setItem(row, self._columns["Memory (MiB)"], memory)
+            self.table.setItem(row, self._columns["Command"], command_item)
+        self.table.setSortingEnabled(sorting)
+
+    def _set_tcp_columns(self, row: int, port):
+        """Fill the Backlog and Retrans columns from the port's connections."""
+        queued = retrans = 0
+        rtt = 0
+        for conn in self.port_scanner.find_by_port(port.local_port):
+            if conn.tcp is not None and conn.status != "LISTEN":
+                queued += conn.tcp.recv_queue + conn.tcp.send_queue
+                retrans += conn.tcp.total_retrans
+                rtt = max(rtt, conn.tcp.rtt_us)
+
+        backlog = self._columns["Backlog"]
+        for column, value in ((backlog, queued), (self._columns["Retrans"], retrans)):
+            item = QTableWidgetItem()
+            item.setData(Qt.ItemDataRole.DisplayRole, value)  # Sorts numerically
+            self.table.setItem(row, column, item)
+        pending = port.tcp.recv_queue if port.tcp else 0
+        self.table.item(row, backlog).setToolTip(
+            f"{queued} bytes queued across connections, {pending} pending accepts, "
+            f"max RTT {rtt / 1000:.1f} ms"
+        )
 
     def _apply_filter(self):
         """Apply search filter."""
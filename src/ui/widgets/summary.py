@@ -0,0 +1,105 @@
+"""
+SummaryWidget - Heaviest processes, ports, remote hosts and socket states.
+"""
+
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QGridLayout,
+    QGroupBox,
+    QHeaderView,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.core.name_resolution import ReverseDns, service_table
+from src.core.rollup import PortRollup
+from src.core.tracing import traced
+
+# (dimension, group title, key column header)
+SECTIONS = (
+    ("process", "Top Processes", "Process"),
+    ("local_port", "Top Local Ports", "Port"),
+    ("remote_host", "Top Remote Hosts", "Remote Host"),
+    ("state", "By State", "State"),
+)
+
+
+class SummaryWidget(QWidget):
+    """
+    Connection counts from a PortRollup.
+
+    Refreshing reads the rollup's top-N lists; it never walks the snapshot.
+    With a ReverseDns, remote hosts are shown by name as lookups complete.
+    """
+
+    # Emitted from reverse-DNS worker threads when a remote host gets a name
+    name_resolved = pyqtSignal()
+
+    def __init__(self, rollup: PortRollup, top: int = 10, reverse_dns: ReverseDns | None = None,
+                 parent=None):
+        super().__init__(parent)
+        self.rollup = rollup
+        self.top = top
+        self.reverse_dns = reverse_dns
+        self.tables: dict[str, QTableWidget] = {}
+        self._setup_ui()
+
+        # A burst of lookups finishing causes one refresh
+        self._resolved_timer = QTimer(self)
+        self._resolved_timer.setSingleShot(True)
+        self._resolved_timer.setInterval(250)
+        self._resolved_timer.timeout.connect(self.refresh)
+        self.name_resolved.connect(self._resolved_timer.start)
+        if reverse_dns is not None:
+            reverse_dns.on_resolved = lambda address, name: name and self.name_resolved.emit()
+
+        self.refresh()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.total_label = QLabel()
+        layout.addWidget(self.total_label)
+
+        grid = QGridLayout()
+        for index, (dimension, title, key_header) in enumerate(SECTIONS):
+            group = QGroupBox(title)
+            group_layout = QVBoxLayout(group)
+
+            table = QTableWidget(0, 2)
+            table.setHorizontalHeaderLabels([key_header, "Sockets"])
+            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+            table.verticalHeader().setVisible(False)
+            table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+            group_layout.addWidget(table)
+
+            self.tables[dimension] = table
+            grid.addWidget(group, index // 2, index % 2)
+        layout.addLayout(grid)
+
+    @traced("SummaryWidget.refresh")
+    def refresh(self):
+        """Show the current top-N of every dimension."""
+        self.total_label.setText(f"Total sockets: {self.rollup.total}")
+        for dimension, table in self.tables.items():
+            rows = self.rollup.top(dimension, self.top)
+            table.setRowCount(len(rows))
+            for row, (key, count) in enumerate(rows):
+                table.setItem(row, 0, QTableWidgetItem(self._label(dimension, key)))
+                table.setItem(row, 1, QTableWidgetItem(str(count)))
+
+    def _label(self, dimension: str, key) -> str:
+        if dimension == "process":
+            pid, name = key
+            return f"{name} ({pid})"
+        if dimension == "remote_host" and self.reverse_dns is not None:
+            return self.reverse_dns.label(key)
+        if dimension == "local_port":
+            service = service_table().name(key)
+            return f"{key} ({service})" if service else str(key)
+        return str(key)
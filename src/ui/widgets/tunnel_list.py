@@ -2,11 +2,11 @@
 TunnelListWidget - Manage SSH tunnel configurations.
 """
 
-import qtawesome as qta
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QDialog,
     QDialogButtonBox,
+    QFileDialog,
     QFormLayout,
     QHBoxLayout,
     QLineEdit,
@@ -19,7 +19,10 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from src.core.tracing import traced
 from src.core.tunnel_manager import TunnelConfig, TunnelManager, TunnelStatus
+from src.core.tunnel_metrics import sparkline
+from src.ui.icons import icon
 
 
 class TunnelDialog(QDialog):
@@ -109,41 +112,67 @@ class TunnelListWidget(QWidget):
         btn_layout = QHBoxLayout()
 
         self.add_btn = QPushButton("Add Tunnel")
-        self.add_btn.setIcon(qta.icon('fa5s.plus-circle', color='#4CAF50'))
+        self.add_btn.setIcon(icon('fa5s.plus-circle', color='#4CAF50'))
         self.add_btn.clicked.connect(self._add_tunnel)
         btn_layout.addWidget(self.add_btn)
 
         self.edit_btn = QPushButton("Edit")
-        self.edit_btn.setIcon(qta.icon('fa5s.edit', color='#2196F3'))
+        self.edit_btn.setIcon(icon('fa5s.edit', color='#2196F3'))
         self.edit_btn.clicked.connect(self._edit_tunnel)
         btn_layout.addWidget(self.edit_btn)
 
         self.delete_btn = QPushButton("Delete")
-        self.delete_btn.setIcon(qta.icon('fa5s.trash-alt', color='#f44336'))
+        self.delete_btn.setIcon(icon('fa5s.trash-alt', color='#f44336'))
         self.delete_btn.clicked.connect(self._delete_tunnel)
         btn_layout.addWidget(self.delete_btn)
 
+        self.import_btn = QPushButton("Import")
+        self.import_btn.setIcon(icon('fa5s.file-import', color='#e0e0e0'))
+        self.import_btn.clicked.connect(self._import_tunnels)
+        btn_layout.addWidget(self.import_btn)
+
+        self.export_btn = QPushButton("Export")
+        self.export_btn.setIcon(icon('fa5s.file-export', color='#e0e0e0'))
+        self.export_btn.clicked.connect(self._export_tunnels)
+        btn_layout.addWidget(self.export_btn)
+
         btn_layout.addStretch()
 
         self.toggle_btn = QPushButton("Start")
-        self.toggle_btn.setIcon(qta.icon('fa5s.play-circle', color='#4CAF50'))
+        self.toggle_btn.setIcon(icon('fa5s.play-circle', color='#4CAF50'))
         self.toggle_btn.clicked.connect(self._toggle_selected)
         btn_layout.addWidget(self.toggle_btn)
 
         layout.addLayout(btn_layout)
 
+    @traced("TunnelListWidget.refresh")
     def refresh(self):
+        # Samples are collected by TunnelManager.start_metrics() off the GUI thread
         self.list_widget.clear()
         for tunnel in self.tunnel_manager.get_all_tunnels():
             status = self.tunnel_manager.get_status(tunnel.name)
             status_text = "[ON]" if status == TunnelStatus.RUNNING else "[OFF]"
-            item = QListWidgetItem(
+            text = (
                 f"{status_text} {tunnel.name} | {tunnel.local_port} -> "
                 f"{tunnel.remote_user}@{tunnel.remote_host}:{tunnel.remote_port}"
             )
+            metrics = self.tunnel_manager.get_metrics(tunnel.name)
+            if status == TunnelStatus.RUNNING and metrics:
+                text += f"  {self._format_metrics(metrics)}"
+            item = QListWidgetItem(text)
             item.setData(Qt.ItemDataRole.UserRole, tunnel.name)
             self.list_widget.addItem(item)
 
+    @staticmethod
+    def _format_metrics(metrics) -> str:
+        """Format a tunnel's metrics as a sparkline plus summary."""
+        summary = metrics.to_dict()
+        text = f"{sparkline(metrics.throughput())} {summary['throughput'] / 1024:.1f} KiB/s"
+        text += f" | conns: {summary['connections']}"
+        if summary['probe_rtt'] is not None:
+            text += f" | rtt: {summary['probe_rtt'] * 1000:.1f} ms"
+        return text
+
     def _add_tunnel(self):
         dialog = TunnelDialog(parent=self)
         if dialog.exec():
@@ -179,6 +208,38 @@ class TunnelListWidget(QWidget):
             self.tunnel_manager.remove_tunnel(name)
             self.refresh()
 
+    def _import_tunnels(self):
+        from pathlib import Path
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Tunnels", str(Path.home()),
+            "Tunnel files (*.json *.csv);;SSH config (config *);;All files (*)"
+        )
+        if not path:
+            return
+        result = self.tunnel_manager.import_tunnels(Path(path))
+        if result.ok:
+            QMessageBox.information(self, "Import", f"Imported {result.imported} tunnel(s).")
+            self.refresh()
+        else:
+            shown = "\n".join(result.errors[:20])
+            more = len(result.errors) - 20
+            if more > 0:
+                shown += f"\n... and {more} more"
+            QMessageBox.warning(
+                self, "Import Failed",
+                f"No tunnels were imported ({len(result.errors)} error(s)):\n\n{shown}"
+            )
+
+    def _export_tunnels(self):
+        from pathlib import Path
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Tunnels", str(Path.home() / "tunnels.json"),
+            "JSON (*.json);;CSV (*.csv);;SSH config (*)"
+        )
+        if path:
+            count = self.tunnel_manager.export_tunnels(Path(path))
+            QMessageBox.information(self, "Export", f"Exported {count} tunnel(s).")
+
     def _toggle_selected(self):
         item = self.list_widget.currentItem()
         if item:
@@ -189,6 +250,22 @@ class TunnelListWidget(QWidget):
         status = self.tunnel_manager.get_status(name)
         if status == TunnelStatus.RUNNING:
             self.tunnel_manager.stop_tunnel(name)
-        else:
-            self.tunnel_manager.start_tunnel(name)
+        elif self.tunnel_manager.start_tunnel(name) == TunnelStatus.ERROR:
+            error = self.tunnel_manager.get_last_error(name) or "Unknown error."
+            port = self.tunnel_manager.tunnels[name].local_port
+            if self.tunnel_manager.check_port_conflict(port, name) is None:
+                QMessageBox.warning(self, "Error", error)
+            else:
+                reply = QMessageBox.question(
+                    self, "Port Conflict",
+                    f"Could not start tunnel '{name}':\n{error}\n\n"
+                    "Start it on a free local port instead?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.Yes:
+                    if self.tunnel_manager.start_tunnel(name, auto_port=True) == TunnelStatus.ERROR:
+                        QMessageBox.warning(
+                            self, "Error",
+                            self.tunnel_manager.get_last_error(name) or "Unknown error."
+                        )
         self.refresh()
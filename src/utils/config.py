@@ -20,6 +20,18 @@ class Config:
         "start_minimized": False,
         "auto_start": False,
         "show_notifications": True,
+        "restore_tunnels": True,  # Restart tunnels that were enabled on last exit
+        "tunnel_port_range": [20000, 30000],  # Used for automatic local port allocation
+        "tunnel_probe_interval": 0,  # s between connect probes of tunnel forwards; 0 = never
+        "update_check_interval": 21600,  # s; release checks within this window use the cache
+        "metrics_port": None,  # Serve Prometheus metrics on 127.0.0.1:<port> when set
+        "scan_namespaces": False,  # Also list ports inside containers/network namespaces (Linux)
+        "parallel_inode_resolution": True,  # Linux: scan /proc with a sharded, persistent inode index
+        "tcp_info": False,  # Linux: per-connection RTT/retransmit/queue stats in the dashboard
+        "unix_sockets": False,  # Linux: also list listening Unix domain sockets
+        "raw_sockets": False,  # Linux: also list raw IP sockets
+        "reverse_dns": False,  # Show remote hosts by name in the dashboard summary
+        "socket_events": False,  # Linux: drop closed sockets as sock_diag reports them
         "port_filters": {
             "http": [80, 443, 8080, 8443],
             "dev": [3000, 5000, 8000, 5173, 5174],
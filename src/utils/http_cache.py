@@ -0,0 +1,118 @@
+"""
+Small persistent HTTP cache for PortPilot's own web requests.
+
+Responses are revalidated with ETag/If-None-Match and Last-Modified, so a
+repeated request costs a 304 with no body. Within the freshness window no
+request is made at all.
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+class HttpCache:
+    """
+    Conditional-request cache persisted as JSON.
+
+    An entry is fresh for `max_age` seconds after it was last fetched or
+    revalidated, or for the server's Cache-Control max-age if that is longer.
+    """
+
+    def __init__(self, path: Path | None = None, max_age: float = 0):
+        self.path = path or Path.home() / ".portpilot" / "http_cache.json"
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+
+    def get(self, url: str, headers: dict[str, str] | None = None,
+            timeout: float = 10, max_age: float | None = None) -> bytes:
+        """
+        Return the body of `url`, from the cache when possible.
+
+        Args:
+            url: URL to fetch.
+            headers: Extra request headers.
+            timeout: Socket timeout for the request, if one is needed.
+            max_age: Override the cache's freshness window for this call.
+
+        Raises:
+            URLError: The request failed and nothing usable is cached.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            entry = self._load().get(url)
+        if entry and time.time() - entry["fetched_at"] < max(max_age, entry.get("max_age", 0)):
+            return entry["body"].encode()
+
+        request = Request(url, headers=headers or {})
+        if entry:
+            if entry.get("etag"):
+                request.add_header("If-None-Match", entry["etag"])
+            if entry.get("last_modified"):
+                request.add_header("If-Modified-Since", entry["last_modified"])
+
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                body = response.read()
+                response_headers = response.headers
+        except HTTPError as e:
+            if e.code != 304 or not entry:
+                raise
+            # Not modified: keep the cached body and restart its freshness window
+            entry = dict(entry, fetched_at=time.time(),
+                         max_age=self._server_max_age(e.headers))
+            self._store(url, entry)
+            return entry["body"].encode()
+
+        self._store(url, {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "max_age": self._server_max_age(response_headers),
+            "fetched_at": time.time(),
+            "body": body.decode(errors="replace"),
+        })
+        return body
+
+    def clear(self) -> None:
+        """Drop all entries and remove the cache file."""
+        with self._lock:
+            self._entries = {}
+            self.path.unlink(missing_ok=True)
+
+    def _load(self) -> dict[str, dict]:
+        """Read the cache file once per instance."""
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _store(self, url: str, entry: dict) -> None:
+        """Update an entry and write the cache file atomically."""
+        with self._lock:
+            entries = self._load()
+            entries[url] = entry
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                tmp_path.write_text(json.dumps(entries))
+                tmp_path.replace(self.path)
+            except OSError:
+                # The cache is an optimisation; failing to persist it is not an error
+                pass
+
+    @staticmethod
+    def _server_max_age(headers) -> float:
+        """Return the Cache-Control max-age of a response, or 0."""
+        cache_control = headers.get("Cache-Control", "") if headers else ""
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return float(match.group(1)) if match else 0
@@ -0,0 +1,88 @@
+"""
+Import-time profiling for PortPilot.
+
+Runs a fresh interpreter with `-X importtime` and summarises its report,
+so the numbers reflect a cold start rather than the current process.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+@dataclass
+class ImportTiming:
+    """Import cost of a single module, in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    """Parsed `-X importtime` report for one import statement."""
+    timings: list[ImportTiming]
+    wall_time: float  # Seconds for the whole interpreter run
+
+    @property
+    def module_count(self) -> int:
+        return len(self.timings)
+
+    def top(self, n: int = 20, cumulative: bool = True) -> list[ImportTiming]:
+        """Return the `n` most expensive imports."""
+        key = (lambda t: t.cumulative_us) if cumulative else (lambda t: t.self_us)
+        return sorted(self.timings, key=key, reverse=True)[:n]
+
+    def format(self, n: int = 20) -> str:
+        """Format the most expensive imports as a table."""
+        lines = [f"{'self ms':>9} {'cumul ms':>9}  module"]
+        for timing in self.top(n):
+            lines.append(f"{timing.self_us / 1000:9.1f} {timing.cumulative_us / 1000:9.1f}  "
+                         f"{'  ' * timing.depth}{timing.module}")
+        lines.append(f"{self.module_count} modules, {self.wall_time * 1000:.0f} ms wall time")
+        return "\n".join(lines)
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr of `python -X importtime`."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return timings
+
+
+# What a GUI launch imports before the tray is shown
+STARTUP_IMPORTS = "import src.main, src.ui.tray_icon"
+
+
+def profile_imports(statement: str = STARTUP_IMPORTS, python: str = sys.executable) -> ImportProfile:
+    """
+    Profile a statement's imports in a fresh interpreter.
+
+    Args:
+        statement: Python code to run, normally one or more import statements.
+        python: Interpreter to use.
+    """
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, env=env, check=False
+    )
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Profiling '{statement}' failed:\n{result.stderr[-2000:]}")
+    return ImportProfile(parse_importtime(result.stderr), wall_time)
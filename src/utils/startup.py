@@ -0,0 +1,93 @@
+"""
+Startup helpers - background startup tasks and a measured startup timeline.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+
+class StartupTimeline:
+    """
+    Records named milestones relative to process start.
+
+    Marks are thread-safe so background tasks can record their own progress.
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.events: list[tuple[str, float]] = []
+
+    def mark(self, label: str) -> float:
+        """Record a milestone and return its offset in seconds."""
+        offset = time.perf_counter() - self._start
+        with self._lock:
+            self.events.append((label, offset))
+        return offset
+
+    def get(self, label: str) -> float | None:
+        """Return the offset of the first milestone with this label."""
+        with self._lock:
+            for name, offset in self.events:
+                if name == label:
+                    return offset
+        return None
+
+    def format(self) -> str:
+        """Format the timeline as one 'offset  label' line per milestone."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e[1])
+        return "\n".join(f"{offset * 1000:8.1f} ms  {label}" for label, offset in events)
+
+
+class StartupTasks:
+    """
+    Runs independent startup work concurrently on background threads.
+
+    Each task records '<name> started' and '<name> done' on the timeline.
+    Completion callbacks run on the worker thread; GUI code must marshal
+    them back to the main thread (e.g. through a Qt signal).
+    """
+
+    def __init__(self, timeline: StartupTimeline | None = None, max_workers: int = 4):
+        self.timeline = timeline or StartupTimeline()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="startup")
+        self.futures: dict[str, Future] = {}
+
+    def submit(self, name: str, fn: Callable[..., Any], *args: Any,
+               on_done: Callable[[str, Any, BaseException | None], None] | None = None) -> Future:
+        """
+        Start a task in the background.
+
+        Args:
+            name: Task name used on the timeline and passed to on_done.
+            fn: Callable to run.
+            on_done: Called with (name, result, exception) when the task finishes.
+        """
+        def run() -> Any:
+            self.timeline.mark(f"{name} started")
+            try:
+                return fn(*args)
+            finally:
+                self.timeline.mark(f"{name} done")
+
+        future = self._executor.submit(run)
+        self.futures[name] = future
+        if on_done:
+            future.add_done_callback(
+                lambda f: on_done(name, None if f.exception() else f.result(), f.exception())
+            )
+        return future
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until all submitted tasks have finished."""
+        for future in list(self.futures.values()):
+            future.exception(timeout=timeout)
+
+    def shutdown(self) -> None:
+        """Stop accepting tasks; running tasks are left to finish."""
+        self._executor.shutdown(wait=False)
@@ -2,29 +2,54 @@
 Auto-update functionality for PortPilot.
 """
 
+import hashlib
 import json
+import re
 import subprocess
 import sys
 import tempfile
+import threading
+from collections.abc import Callable
 from pathlib import Path
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
 from src.core.version import VERSION
+from src.utils.http_cache import HttpCache
 
 GITHUB_API = "https://api.github.com/repos/logando-al/port_pilot/releases/latest"
 GITHUB_RELEASES = "https://github.com/logando-al/port_pilot/releases"
 
+CHUNK_SIZE = 64 * 1024
+
+# Called with (bytes_downloaded, total_bytes or None)
+ProgressCallback = Callable[[int, int | None], None]
+
+
+class ChecksumMismatchError(Exception):
+    """Raised when a downloaded file does not match its published SHA-256."""
+
+
+class IncompleteDownloadError(Exception):
+    """Raised when a download ends at a different size than the server announced."""
+
 
 class Updater:
     """
     Handles checking for and applying updates from GitHub releases.
     """
 
-    def __init__(self):
+    def __init__(self, api_url: str = GITHUB_API, timeout: float = 10,
+                 cache: HttpCache | None = None):
+        self.api_url = api_url
+        self.timeout = timeout
+        # Optional conditional-request cache for the release check
+        self.cache = cache
         self.current_version = VERSION
         self.latest_version: str | None = None
         self.download_url: str | None = None
+        self.checksum_url: str | None = None
+        self.download_dir = Path(tempfile.gettempdir()) / "portpilot_update"
 
     def check_for_updates(self) -> tuple[bool, str]:
         """
@@ -34,19 +59,22 @@ class Updater:
             Tuple of (update_available, message).
         """
         try:
-            request = Request(
-                GITHUB_API,
-                headers={"Accept": "application/vnd.github.v3+json"}
-            )
-
-            with urlopen(request, timeout=10) as response:
-                data = json.loads(response.read().decode())
+            headers = {"Accept": "application/vnd.github.v3+json"}
+            if self.cache is not None:
+                body = self.cache.get(self.api_url, headers, timeout=self.timeout)
+            else:
+                request = Request(self.api_url, headers=headers)
+                with urlopen(request, timeout=self.timeout) as response:
+                    body = response.read()
+            data = json.loads(body.decode())
 
             self.latest_version = data.get("tag_name", "").lstrip("v")
 
             if self._compare_versions(self.latest_version, self.current_version) > 0:
                 # Find appropriate download URL for current platform
-                self.download_url = self._find_download_url(data.get("assets", []))
+                assets = data.get("assets", [])
+                self.download_url = self._find_download_url(assets)
+                self.checksum_url = self._find_checksum_url(assets)
                 return (True, f"New version {self.latest_version} available!")
 
             return (False, "You're running the latest version.")
@@ -56,10 +84,13 @@ class Updater:
         except Exception as e:
             return (False, f"Error checking for updates: {e}")
 
-    def download_and_install(self) -> tuple[bool, str]:
+    def download_and_install(self, progress: ProgressCallback | None = None) -> tuple[bool, str]:
         """
         Download and install the latest update.
 
+        Args:
+            progress: Optional callback receiving (bytes_downloaded, total_bytes).
+
         Returns:
             Tuple of (success, message).
         """
@@ -67,16 +98,7 @@ class Updater:
             return (False, "No download URL available. Please update manually.")
 
         try:
-            # Download to temp directory
-            temp_dir = Path(tempfile.gettempdir()) / "portpilot_update"
-            temp_dir.mkdir(exist_ok=True)
-
-            filename = self.download_url.split("/")[-1]
-            download_path = temp_dir / filename
-
-            with urlopen(self.download_url, timeout=60) as response:
-                with open(download_path, 'wb') as f:
-                    f.write(response.read())
+            download_path = self.download(progress)
 
             # Platform-specific installation
             if sys.platform == 'win32':
@@ -92,9 +114,210 @@ class Updater:
 
             return (True, "Update downloaded. Please restart the application.")
 
+        except ChecksumMismatchError as e:
+            return (False, f"Update failed verification: {e}")
         except Exception as e:
             return (False, f"Failed to download update: {e}")
 
+    def download_in_background(self, progress: ProgressCallback | None = None,
+                               on_done: Callable[[bool, str], None] | None = None) -> threading.Thread:
+        """
+        Run download_and_install() on a background thread.
+
+        Both callbacks are invoked on that thread; GUI code must marshal them
+        back to the main thread.
+        """
+        def run():
+            result = self.download_and_install(progress)
+            if on_done:
+                on_done(*result)
+
+        thread = threading.Thread(target=run, name="update-download", daemon=True)
+        thread.start()
+        return thread
+
+    def download(self, progress: ProgressCallback | None = None) -> Path:
+        """
+        Stream the update to disk, resuming a previous partial download.
+
+        Data is written to a `.part` file in CHUNK_SIZE pieces while a SHA-256
+        is computed incrementally. The part file is named after the download
+        URL, and remembers the response's ETag (or Last-Modified) and size.
+        An interrupted download continues from where it stopped with a Range
+        request guarded by If-Range, so a part left by a different build is
+        replaced instead of extended. The file is renamed into place only
+        after it reaches the announced size and matches the release's checksum
+        asset (when published).
+
+        Returns:
+            Path of the verified download.
+
+        Raises:
+            ChecksumMismatchError: The download does not match the published SHA-256,
+                or a checksum asset is published but has no digest for this file.
+            IncompleteDownloadError: The server sent fewer or more bytes than it announced.
+        """
+        if not self.download_url:
+            raise ValueError("No download URL available")
+
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        filename = self.download_url.split("/")[-1]
+        download_path = self.download_dir / filename
+        part_path = self._part_path(filename)
+        meta_path = part_path.with_name(part_path.name + ".json")
+        expected = None
+        if self.checksum_url:
+            expected = self._fetch_checksum(filename)
+            if expected is None:
+                # A published checksum that does not cover this file must not be skipped
+                raise ChecksumMismatchError(f"no SHA-256 for {filename} in {self.checksum_url}")
+
+        hasher = hashlib.sha256()
+        meta = self._read_meta(meta_path) if part_path.exists() else {}
+        # Without a validator there is no way to tell the part belongs to this build
+        offset = part_path.stat().st_size if meta.get("validator") else 0
+        response = self._open_download(offset, meta.get("validator"))
+        total = meta.get("total")
+        if response is None and offset != total:
+            # Range not satisfiable, yet the part is not the announced size: start over
+            offset = 0
+            response = self._open_download(0, None)
+
+        if response is None:
+            # Range not satisfiable and the part has the announced size: it is complete
+            self._hash_file(part_path, hasher)
+            done = offset
+        else:
+            with response:
+                resumed = offset and response.status == 206 and self._content_range(response)[0] == offset
+                if resumed:
+                    self._hash_file(part_path, hasher)
+                    total = self._content_range(response)[1]
+                elif response.status == 206:
+                    part_path.unlink(missing_ok=True)
+                    meta_path.unlink(missing_ok=True)
+                    raise IncompleteDownloadError("server sent a range that was not asked for")
+                else:
+                    offset = 0
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length else None
+                    self._write_meta(meta_path, response, total)
+
+                done = offset
+                with open(part_path, 'ab' if resumed else 'wb') as f:
+                    if progress:
+                        progress(done, total)
+                    while chunk := response.read(CHUNK_SIZE):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        done += len(chunk)
+                        if progress:
+                            progress(done, total)
+
+        if total is not None and done != total:
+            if done > total:
+                part_path.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+            # A short part is kept, so the next attempt resumes it
+            raise IncompleteDownloadError(f"received {done} of {total} bytes")
+
+        digest = hasher.hexdigest()
+        if expected and digest != expected:
+            part_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            raise ChecksumMismatchError(f"expected SHA-256 {expected}, got {digest}")
+
+        part_path.replace(download_path)
+        meta_path.unlink(missing_ok=True)
+        return download_path
+
+    def _part_path(self, filename: str) -> Path:
+        """Partial download for the current URL; releases reusing a filename get their own."""
+        key = hashlib.sha256(str(self.download_url).encode()).hexdigest()[:12]
+        return self.download_dir / f"{filename}.{key}.part"
+
+    def _open_download(self, offset: int, validator: str | None):
+        """Request the download from `offset`; None when the range is not satisfiable."""
+        request = Request(str(self.download_url))
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+            # The server sends the whole file instead if it no longer matches the part
+            request.add_header("If-Range", str(validator))
+        try:
+            return urlopen(request, timeout=60)
+        except HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            return None
+
+    @staticmethod
+    def _read_meta(path: Path) -> dict:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_meta(path: Path, response, total: int | None) -> None:
+        """Remember what the part file is a prefix of, for a later If-Range."""
+        etag = response.headers.get("ETag")
+        # Weak ETags cannot be used in If-Range
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+        if validator:
+            path.write_text(json.dumps({"validator": validator, "total": total}))
+        else:
+            path.unlink(missing_ok=True)
+
+    def _fetch_checksum(self, filename: str) -> str | None:
+        """Fetch the expected SHA-256 of `filename` from the checksum asset."""
+        with urlopen(str(self.checksum_url), timeout=self.timeout) as response:
+            text = response.read().decode(errors="replace")
+
+        # Either a bare digest or `sha256sum` style "<digest>  <name>" lines
+        bare = []
+        for line in text.splitlines():
+            match = re.match(r"\s*([0-9a-fA-F]{64})\b\s*\*?(\S+)?", line)
+            if match:
+                digest, name = match.group(1).lower(), match.group(2)
+                if name is None:
+                    bare.append(digest)
+                elif Path(name).name == filename:
+                    return digest
+        # A lone unnamed digest (e.g. PortPilot.exe.sha256) belongs to the download
+        if len(bare) == 1:
+            return bare[0]
+        return None
+
+    def _find_checksum_url(self, assets: list) -> str | None:
+        """Find the SHA-256 checksum asset for the selected download, if published."""
+        if not self.download_url:
+            return None
+        filename = self.download_url.split("/")[-1].lower()
+        preferred = (f"{filename}.sha256", f"{filename}.sha256sum")
+        generic = ("sha256sums", "sha256sums.txt", "checksums.txt", "checksums.sha256")
+
+        for names in (preferred, generic):
+            for asset in assets:
+                if asset.get("name", "").lower() in names:
+                    return str(asset.get("browser_download_url"))
+        return None
+
+    @staticmethod
+    def _hash_file(path: Path, hasher) -> None:
+        """Feed an existing partial download into the running hash."""
+        with open(path, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                hasher.update(chunk)
+
+    @staticmethod
+    def _content_range(response) -> tuple[int | None, int | None]:
+        """Return the first byte position and complete length of a 206 response's Content-Range."""
+        match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range", ""))
+        if not match:
+            return None, None
+        total = match.group(2)
+        return int(match.group(1)), int(total) if total != "*" else None
+
     def _compare_versions(self, v1: str, v2: str) -> int:
         """
         Compare two version strings.
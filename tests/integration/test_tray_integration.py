@@ -39,3 +39,45 @@ class TestTrayIntegration:
             with patch('src.ui.tray_icon.TunnelManager'):
                 tray = TrayIcon(qapp)
                 assert tray.contextMenu() is not None
+
+    def test_menus_update_incrementally(self, qapp):
+        """Test that menu refreshes reuse, relabel and remove actions in place."""
+        from unittest.mock import MagicMock
+
+        from src.core.port_scanner import PortInfo
+        from src.core.tunnel_manager import TunnelStatus
+        from src.ui.tray_icon import TrayIcon
+
+        def port(number, name):
+            return PortInfo(number, "127.0.0.1", None, None, number, name, "LISTEN", "tcp")
+
+        scanner = MagicMock()
+        scanner.get_listening_ports.return_value = [port(80, "nginx"), port(5432, "postgres")]
+        tunnel = MagicMock(local_port=8080)
+        tunnel.name = "db"
+        manager = MagicMock()
+        manager.get_all_tunnels.return_value = [tunnel]
+        manager.get_status.return_value = TunnelStatus.STOPPED
+
+        tray = TrayIcon(qapp, port_scanner=scanner, tunnel_manager=manager)
+        nginx_action = tray.ports_menu.actions()[0]
+        tunnel_action = tray.tunnels_menu.actions()[0]
+        assert tunnel_action.text() == "[OFF] db (8080)"
+
+        scanner.get_listening_ports.return_value = [port(80, "nginx"), port(3000, "node")]
+        manager.get_status.return_value = TunnelStatus.RUNNING
+        tray._update_ports_menu()
+        tray._update_tunnels_menu()
+
+        actions = tray.ports_menu.actions()
+        assert [a.text() for a in actions] == ["80: nginx", "3000: node"]
+        assert actions[0] is nginx_action
+        assert tray.tunnels_menu.actions()[0] is tunnel_action
+        assert tunnel_action.text() == "[ON] db (8080)"
+        assert tunnel_action.isChecked()
+        # Updating the menus never triggers a scan
+        scanner.scan.assert_not_called()
+
+        scanner.get_listening_ports.return_value = []
+        tray._update_ports_menu()
+        assert [a.text() for a in tray.ports_menu.actions()] == ["No listening ports"]
@@ -0,0 +1,63 @@
+"""
+Unit tests for the benchmark harness (tiny sizes, to keep the suite fast).
+"""
+
+import sys
+
+import pytest
+
+from benchmarks.suite import compare, measure, run_suite
+from benchmarks.synthetic import make_connections
+
+
+class TestBenchmarks:
+    """Tests for the benchmark suite."""
+
+    def test_synthetic_table(self):
+        table = make_connections(1000, processes=10)
+
+        assert len(table) == 1000
+        assert len({conn.pid for conn in table}) <= 10
+        assert any(conn.status == "LISTEN" and not conn.raddr for conn in table)
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a shell script")
+    def test_run_suite(self, qapp):
+        report = run_suite(sizes=(500,), ui_sizes=(100,), repeat=1, tunnels=25, processes=20)
+
+        names = set(report["results"])
+        assert {"scan[500]", "port_table_populate[100]", "port_table_search[100]",
+                "tunnel_start_stop x20", "tunnel_config_save[25]", "tunnel_import[25]", "config_load",
+                "inode_index_warm[20]", "port_allocate x2000",
+                "metrics_update x100000", "startup_imports"} <= names
+        assert all(result["median"] >= 0 for result in report["results"].values())
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a shell script")
+    def test_missing_baseline_fails(self, qapp, tmp_path):
+        """Test a comparison without a baseline is an error, not a silent pass."""
+        from benchmarks.__main__ import main
+
+        argv = ["--sizes", "100", "--ui-sizes", "10", "--repeat", "1", "--tunnels", "20",
+                "--processes", "5", "--baseline", str(tmp_path / "missing.json")]
+        assert main(argv) == 2
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"scan": {"median": 0.010}, "tiny": {"median": 0.0001}}}
+        report = {"results": {
+            "scan": {"median": 0.020},
+            "tiny": {"median": 0.0003},  # 3x slower but under the noise floor
+            "new": {"median": 1.0},  # Not in the baseline
+        }}
+
+        regressions = compare(report, baseline)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("scan:")
+        assert compare(report, baseline, tolerance=2.0) == []
+
+    def test_measure(self):
+        calls = []
+        result = measure("noop", lambda: calls.append(1), repeat=3)
+
+        assert len(calls) == 4  # Warm-up plus three timed runs
+        assert result.runs == 3
+        assert result.best <= result.median <= result.worst
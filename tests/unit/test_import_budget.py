@@ -0,0 +1,59 @@
+"""
+Import-time budget tests.
+
+These fail when a change makes the GUI cold start import noticeably more
+modules. Raise the budget deliberately if a new dependency is worth it; the
+startup_imports benchmark tracks how long the imports take.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.utils.import_profile import PROJECT_ROOT, parse_importtime, profile_imports
+
+# Modules imported by `import src.main, src.ui.tray_icon` (about 150 today)
+MODULE_BUDGET = 200
+
+
+class TestImportBudget:
+    """Cold-start import budget."""
+
+    def test_startup_imports_within_budget(self):
+        """Test the number of modules the startup imports load."""
+        profile = profile_imports()
+
+        assert profile.module_count <= MODULE_BUDGET, profile.format(30)
+
+    def test_tray_does_not_load_qtawesome(self):
+        """Test that building the tray leaves qtawesome unimported until the menu opens."""
+        pytest.importorskip("PyQt6")
+        code = (
+            "import sys\n"
+            "from PyQt6.QtWidgets import QApplication\n"
+            "app = QApplication([])\n"
+            "from unittest.mock import MagicMock\n"
+            "from src.ui.tray_icon import TrayIcon\n"
+            "TrayIcon(app, port_scanner=MagicMock(), tunnel_manager=MagicMock())\n"
+            "print('qtawesome' in sys.modules)\n"
+        )
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), QT_QPA_PLATFORM="offscreen")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=PROJECT_ROOT, env=env, check=True)
+
+        assert result.stdout.strip().splitlines()[-1] == "False"
+
+    def test_parse_importtime(self):
+        """Test parsing of -X importtime output."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   child\n"
+            "import time:        50 |        150 | parent\n"
+        )
+        timings = parse_importtime(output)
+
+        assert [t.module for t in timings] == ["child", "parent"]
+        assert timings[0].depth == 1
+        assert timings[1].cumulative_us == 150
@@ -0,0 +1,100 @@
+"""
+Unit tests for the metrics registry and Prometheus endpoint.
+"""
+
+from unittest.mock import MagicMock, patch
+from urllib.request import urlopen
+
+from src.core import metrics
+from src.core.metrics import MetricsRegistry, MetricsServer
+from src.core.port_scanner import PortScanner
+
+
+class TestRegistry:
+    """Tests for MetricsRegistry rendering."""
+
+    def test_render_prometheus_text(self):
+        """Test counters, labelled gauges and histograms render in exposition format."""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs.").inc(3)
+        registry.gauge("sockets", "Sockets.", ("state",)).labels("LISTEN").set(2)
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(7)
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE jobs_total counter" in lines
+        assert "jobs_total 3" in lines
+        assert 'sockets{state="LISTEN"} 2' in lines
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert "latency_seconds_count 3" in lines
+        assert "latency_seconds_sum 7.55" in lines
+
+    def test_factories_return_existing_metric(self):
+        registry = MetricsRegistry()
+        assert registry.counter("a_total", "A.") is registry.counter("a_total", "A.")
+
+    def test_updates_accumulate(self):
+        """Test many increments and observations are all counted (their cost is benchmarked)."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "C.")
+        histogram = registry.histogram("h_seconds", "H.")
+
+        for _ in range(100000):
+            counter.inc()
+            histogram.observe(0.003)
+
+        assert counter.value == 100000
+        assert histogram.count == 100000
+        assert histogram.counts[histogram.buckets.index(0.005)] == 100000
+
+
+class TestInstrumentation:
+    """Tests for the metrics recorded by the core modules."""
+
+    def test_scan_records_metrics(self):
+        """Test a scan records its duration, states and name-cache hits."""
+        conns = []
+        for port, status in ((80, "LISTEN"), (81, "LISTEN"), (82, "ESTABLISHED")):
+            conn = MagicMock()
+            conn.laddr.port, conn.laddr.ip = port, "0.0.0.0"
+            conn.raddr = None
+            conn.pid, conn.status, conn.type = 42, status, 1
+            conns.append(conn)
+        scans = metrics.SCAN_DURATION.count
+        hits = metrics.PROCESS_CACHE_HITS.value
+        misses = metrics.PROCESS_CACHE_MISSES.value
+
+        with patch("psutil.net_connections", return_value=conns), \
+                patch("psutil.Process") as process:
+            process.return_value.name.return_value = "nginx"
+            PortScanner().scan()
+
+        assert process.call_count == 1
+        assert metrics.SCAN_DURATION.count == scans + 1
+        assert metrics.PROCESS_CACHE_HITS.value == hits + 2
+        assert metrics.PROCESS_CACHE_MISSES.value == misses + 1
+        assert metrics.SOCKETS.labels("LISTEN").value == 2
+        assert metrics.SOCKETS.labels("ESTABLISHED").value == 1
+
+
+class TestMetricsServer:
+    """Tests for the localhost HTTP endpoint."""
+
+    def test_serves_metrics(self):
+        registry = MetricsRegistry()
+        registry.counter("served_total", "Served.").inc()
+        server = MetricsServer(0, registry).start()
+        try:
+            with urlopen(server.url, timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.stop()
+
+        assert "served_total 1" in body
+        assert content_type.startswith("text/plain; version=0.0.4")
@@ -0,0 +1,163 @@
+"""
+Unit tests for service names and the non-blocking reverse-DNS cache.
+"""
+
+import threading
+import time
+
+from src.core.name_resolution import ReverseDns, ServiceTable
+
+
+class StubResolver:
+    """Resolves from a dict; blocks until released so tests control timing."""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, address):
+        self.calls.append(address)
+        self.release.wait(5)
+        if address not in self.names:
+            raise OSError("unknown host")
+        return self.names[address]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_resolved(dns, count):
+    """Event set once `count` more lookups have completed."""
+    done = threading.Event()
+    remaining = [count]
+
+    def resolved(address, name):
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            done.set()
+
+    dns.on_resolved = resolved
+    return done
+
+
+class TestServiceTable:
+    def test_parse(self, tmp_path):
+        path = tmp_path / "services"
+        path.write_text(
+            "# comment\n"
+            "http\t\t80/tcp\t\twww  # WorldWideWeb HTTP\n"
+            "postgresql\t5432/tcp\tpostgres\n"
+            "domain\t\t53/udp\n"
+            "alias-for-http\t80/tcp\n"
+            "broken line\n"
+        )
+        table = ServiceTable(path)
+
+        assert table.name(80) == "http"
+        assert table.name(5432, "tcp") == "postgresql"
+        assert table.name(53, "udp") == "domain"
+        assert table.name(53, "tcp") is None
+        assert len(table) == 3
+
+    def test_missing_file(self, tmp_path):
+        assert len(ServiceTable(tmp_path / "nope")) == 0
+
+
+class TestReverseDns:
+    def test_lookup_never_blocks(self):
+        """Test the first lookup returns at once and the name is cached when it resolves."""
+        stub = StubResolver({"10.0.0.1": "db.internal"})
+        dns = ReverseDns(resolver=stub)
+        done = wait_resolved(dns, 1)
+
+        assert dns.lookup("10.0.0.1") is None  # Resolver is still blocked
+        assert dns.lookup("10.0.0.1") is None
+        stub.release.set()
+        assert done.wait(5)
+
+        assert dns.lookup("10.0.0.1") == "db.internal"
+        assert dns.label("10.0.0.1") == "db.internal (10.0.0.1)"
+        assert stub.calls == ["10.0.0.1"]  # Concurrent lookups were coalesced
+
+    def test_negative_cache_and_ttl(self):
+        stub = StubResolver({"10.0.0.1": "db.internal"})
+        stub.release.set()
+        clock = Clock()
+        dns = ReverseDns(resolver=stub, ttl=100, negative_ttl=10, clock=clock)
+
+        done = wait_resolved(dns, 2)
+        dns.lookup("10.0.0.1")
+        dns.lookup("10.0.0.2")
+        assert done.wait(5)
+        assert dns.lookup("10.0.0.2") is None
+        assert dns.label("10.0.0.2") == "10.0.0.2"
+        assert len(stub.calls) == 2
+
+        clock.now = 50  # Negative entry expired, positive one still fresh
+        done = wait_resolved(dns, 1)
+        assert dns.lookup("10.0.0.1") == "db.internal"
+        dns.lookup("10.0.0.2")
+        assert done.wait(5)
+        assert stub.calls.count("10.0.0.2") == 2
+
+        clock.now = 200  # Stale names are served while they refresh
+        assert dns.lookup("10.0.0.1") == "db.internal"
+
+    def test_resolver_error_is_retried(self, capsys):
+        """Test an unexpected resolver error leaves nothing pending or cached, so the address is retried."""
+        calls = []
+
+        def flaky(address):
+            calls.append(address)
+            if len(calls) == 1:
+                raise ValueError("resolver bug")
+            return "db.internal"
+
+        dns = ReverseDns(resolver=flaky)
+        dns.lookup("10.0.0.1")
+        deadline = time.monotonic() + 5
+        while dns.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert dns.pending == 0
+        assert "resolver bug" in capsys.readouterr().out
+
+        done = wait_resolved(dns, 1)
+        assert dns.lookup("10.0.0.1") is None
+        assert done.wait(5)
+        assert dns.lookup("10.0.0.1") == "db.internal"
+        assert calls == ["10.0.0.1", "10.0.0.1"]
+
+    def test_bounded(self):
+        stub = StubResolver({})
+        dns = ReverseDns(resolver=stub, max_workers=2, max_pending=3)
+        for i in range(10):
+            dns.lookup(f"10.0.0.{i}")
+
+        assert dns.pending == 3
+        stub.release.set()
+        dns.shutdown()
+
+    def test_summary_shows_names(self, qtbot):
+        from benchmarks.synthetic import make_connections, synthetic_system
+        from src.core.port_scanner import PortScanner
+        from src.core.rollup import PortRollup
+        from src.ui.widgets.summary import SummaryWidget
+
+        scanner = PortScanner()
+        table = make_connections(20)
+        with synthetic_system(table):
+            scanner.scan()
+        stub = StubResolver({})
+        stub.names = {conn.raddr.ip: "peer.example" for conn in table if conn.raddr}
+        stub.release.set()
+        widget = SummaryWidget(PortRollup(scanner), reverse_dns=ReverseDns(resolver=stub))
+        qtbot.addWidget(widget)
+
+        hosts = widget.tables["remote_host"]
+        qtbot.waitUntil(lambda: hosts.item(0, 0).text().startswith("peer.example ("), timeout=5000)
@@ -0,0 +1,119 @@
+"""
+Unit tests for network-namespace scanning against a fake /proc tree.
+"""
+
+import os
+
+import pytest
+
+from src.core.netns import NamespaceScanner, list_namespaces, read_socket_table
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt",
+                                reason="needs POSIX symlinks")
+
+HOST_NS = 4026531840
+CONTAINER_NS = 4026532500
+CONTAINER_ID = "ab" * 32
+
+TCP_HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+# 0.0.0.0:80 LISTEN inode 1001; 172.17.0.2:80 <- 172.17.0.1:40000 ESTABLISHED inode 1002
+CONTAINER_TCP = TCP_HEADER + (
+    "   0: 00000000:0050 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001\n"
+    "   1: 020011AC:0050 010011AC:9C40 01 00000000:00000000 00:00000000 00000000     0        0 1002\n"
+)
+# [::1]:5432 LISTEN inode 1003
+CONTAINER_TCP6 = TCP_HEADER + (
+    "   0: 00000000000000000000000001000000:1538 00000000000000000000000000000000:0000 0A "
+    "00000000:00000000 00:00000000 00000000     0        0 1003\n"
+)
+
+
+def make_process(proc, pid, ns, name, sockets=(), cgroup="0::/user.slice\n", tcp=None, tcp6=None):
+    root = proc / str(pid)
+    (root / "ns").mkdir(parents=True)
+    (root / "fd").mkdir()
+    (root / "net").mkdir()
+    os.symlink(f"net:[{ns}]", root / "ns" / "net")
+    for fd, inode in enumerate(sockets, start=3):
+        os.symlink(f"socket:[{inode}]", root / "fd" / str(fd))
+    os.symlink("/dev/null", root / "fd" / "0")
+    (root / "comm").write_text(name + "\n")
+    (root / "cgroup").write_text(cgroup)
+    if tcp is not None:
+        (root / "net" / "tcp").write_text(tcp)
+    if tcp6 is not None:
+        (root / "net" / "tcp6").write_text(tcp6)
+
+
+@pytest.fixture
+def fake_proc(tmp_path):
+    proc = tmp_path / "proc"
+    proc.mkdir()
+    make_process(proc, 1, HOST_NS, "systemd", tcp=TCP_HEADER)
+    cgroup = f"0::/system.slice/docker-{CONTAINER_ID}.scope\n"
+    make_process(proc, 200, CONTAINER_NS, "nginx", sockets=(1001, 1002), cgroup=cgroup,
+                 tcp=CONTAINER_TCP, tcp6=CONTAINER_TCP6)
+    make_process(proc, 201, CONTAINER_NS, "postgres", sockets=(1003,), cgroup=cgroup,
+                 tcp=CONTAINER_TCP, tcp6=CONTAINER_TCP6)
+    os.symlink("1", proc / "self")
+    return proc
+
+
+class TestNamespaceScanner:
+    """Tests for NamespaceScanner."""
+
+    def test_list_namespaces(self, fake_proc):
+        assert list_namespaces(fake_proc) == {HOST_NS: [1], CONTAINER_NS: [200, 201]}
+
+    def test_read_socket_table(self, fake_proc):
+        rows = read_socket_table(200, fake_proc)
+
+        assert (1001, "tcp", "0.0.0.0", 80, None, None, "LISTEN") in rows
+        assert (1002, "tcp", "172.17.0.2", 80, "172.17.0.1", 40000, "ESTABLISHED") in rows
+        assert (1003, "tcp", "::1", 5432, None, None, "LISTEN") in rows
+
+    def test_scan_tags_rows(self, fake_proc):
+        """Test foreign namespaces are scanned once and rows carry namespace and container."""
+        ports = NamespaceScanner(fake_proc).scan()
+
+        assert len(ports) == 3  # Read once, not once per member process
+        by_port = {(p.local_port, p.status): p for p in ports}
+        nginx = by_port[(80, "LISTEN")]
+        assert nginx.pid == 200
+        assert nginx.process_name == "nginx"
+        assert nginx.namespace == CONTAINER_NS
+        assert nginx.container_id == CONTAINER_ID
+        assert by_port[(5432, "LISTEN")].process_name == "postgres"
+
+    def test_sockets_reread_every_scan(self, fake_proc):
+        """Test sockets opened or closed by existing members show up without a membership change."""
+        scanner = NamespaceScanner(fake_proc)
+        assert len(scanner.scan()) == 3
+
+        # nginx closes its connection and opens a listener on 8080 (inode 1004)
+        os.symlink("socket:[1004]", fake_proc / "200" / "fd" / "9")
+        (fake_proc / "200" / "net" / "tcp").write_text(TCP_HEADER + (
+            "   0: 00000000:0050 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001\n"
+            "   1: 00000000:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1004\n"
+        ))
+        by_port = {p.local_port: p for p in scanner.scan()}
+        assert sorted(by_port) == [80, 5432, 8080]
+        assert by_port[8080].pid == 200
+        assert by_port[8080].container_id == CONTAINER_ID
+
+    def test_owners_cached_until_members_change(self, fake_proc, monkeypatch):
+        import src.core.netns as netns
+
+        walks = []
+        real = netns.socket_owners
+        monkeypatch.setattr(netns, "socket_owners", lambda pids, root: walks.append(pids) or real(pids, root))
+        scanner = NamespaceScanner(fake_proc)
+        first = scanner.scan()
+        assert scanner.scan() == first
+        assert len(walks) == 1  # Same sockets, same members: no fd walk
+
+        # A new member invalidates the namespace
+        make_process(fake_proc, 202, CONTAINER_NS, "redis", tcp=TCP_HEADER, tcp6=TCP_HEADER,
+                     cgroup=f"0::/docker/{CONTAINER_ID}\n")
+        scanner.scan()
+        assert walks[-1] == [200, 201, 202]
@@ -0,0 +1,141 @@
+"""
+Unit tests for PortAllocator module.
+"""
+
+import json
+import socket
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.cli import run
+from src.core.port_allocator import PortAllocator
+
+
+def _scanner(used_ports):
+    """Mock PortScanner whose bitmap marks `used_ports` as bound."""
+    bitmap = bytearray(8192)
+    for port in used_ports:
+        bitmap[port >> 3] |= 1 << (port & 7)
+    scanner = MagicMock()
+    scanner.used_port_bitmap.return_value = bitmap
+    return scanner
+
+
+class TestPortAllocator:
+    """Tests for PortAllocator class."""
+
+    def test_allocate_scattered_skips_used(self):
+        """Test that bound ports are skipped."""
+        allocator = PortAllocator(_scanner({20001, 20003}), port_range=(20000, 20010))
+        ports = allocator.allocate(3, verify=False)
+
+        assert ports == [20000, 20002, 20004]
+
+    def test_allocate_contiguous(self):
+        """Test that contiguous allocation finds the first free run."""
+        allocator = PortAllocator(_scanner({20002, 20005}), port_range=(20000, 20010))
+        ports = allocator.allocate(3, contiguous=True, verify=False)
+
+        assert ports == [20006, 20007, 20008]
+        assert allocator.allocate(5, contiguous=True, verify=False) == []
+
+    def test_reservations_prevent_reuse(self):
+        """Test that reserved ports are not handed out twice."""
+        allocator = PortAllocator(_scanner(set()), port_range=(20000, 20003))
+        first = allocator.allocate(2, verify=False)
+        second = allocator.allocate(4, verify=False)
+
+        assert not set(first) & set(second)
+        assert len(second) == 2
+
+        allocator.release(first)
+        assert sorted(allocator.allocate(2, verify=False)) == sorted(first)
+
+    def test_reservations_expire(self):
+        """Test that reservations lapse after their TTL."""
+        allocator = PortAllocator(_scanner(set()), port_range=(20000, 20000),
+                                  reservation_ttl=0.01)
+        assert allocator.allocate(1, verify=False) == [20000]
+        time.sleep(0.02)
+
+        assert allocator.reserved() == []
+        assert allocator.allocate(1, verify=False) == [20000]
+
+    def test_concurrent_callers_get_distinct_ports(self):
+        """Test that threads allocating at once never share a port."""
+        allocator = PortAllocator(_scanner(set()), port_range=(20000, 21000))
+        results = []
+
+        def worker():
+            results.extend(allocator.allocate(10, verify=False))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 80
+        assert len(set(results)) == 80
+
+    def test_verify_skips_bound_port(self):
+        """Test that a port bound after the snapshot is not returned."""
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        port = sock.getsockname()[1]
+        try:
+            allocator = PortAllocator(_scanner(set()), port_range=(port, port + 1))
+            ports = allocator.allocate(1)
+            assert port not in ports
+        finally:
+            sock.close()
+
+    def test_reservation_file_is_shared(self, tmp_path):
+        """Test that allocators sharing a reservation file (other processes) never overlap."""
+        path = tmp_path / "reservations.json"
+        first = PortAllocator(_scanner(set()), port_range=(20000, 20009), reservation_file=path)
+        second = PortAllocator(_scanner(set()), port_range=(20000, 20009), reservation_file=path)
+
+        ports = first.allocate(4, verify=False)
+        others = second.allocate(10, verify=False)
+        assert not set(ports) & set(others)
+        assert len(others) == 6
+
+        first.release(ports[:2])
+        assert second.allocate(10, verify=False) == ports[:2]
+
+    def test_reservation_file_expiry(self, tmp_path):
+        """Test that expired or damaged shared reservations are ignored."""
+        path = tmp_path / "reservations.json"
+        path.write_text(json.dumps({"20000": time.time() - 1, "20001": time.time() + 60}))
+        allocator = PortAllocator(_scanner(set()), port_range=(20000, 20002), reservation_file=path)
+        assert allocator.allocate(3, verify=False) == [20000, 20002]
+        assert set(json.loads(path.read_text())) == {"20000", "20001", "20002"}
+
+        path.write_text("not json")
+        fresh = PortAllocator(_scanner(set()), port_range=(20000, 20002), reservation_file=path)
+        assert fresh.allocate(1, verify=False) == [20000]
+
+
+class TestAllocCommand:
+    """Tests for the `portpilot alloc` command."""
+
+    @pytest.fixture(autouse=True)
+    def reservations(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("src.cli.RESERVATIONS_PATH", tmp_path / "reservations.json")
+
+    def test_alloc_json(self, capsys):
+        """Test printing allocated ports as JSON."""
+        assert run(["alloc", "--count", "2", "--range", "40000-40100", "--json"]) == 0
+        out = capsys.readouterr().out
+
+        assert out.startswith("[")
+        assert len(json.loads(out)) == 2
+
+    def test_alloc_exhausted(self, capsys):
+        """Test exit status when the range is too small."""
+        assert run(["alloc", "--count", "5", "--range", "40000-40001", "--no-verify"]) == 1
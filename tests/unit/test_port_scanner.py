@@ -96,3 +96,139 @@ class TestPortScanner:
 
                 assert len(ports) == 1
                 assert ports[0].process_name == "Unknown"
+
+    def test_get_port_owner(self, mock_psutil_connections, mock_psutil_process):
+        """Test O(1) owner lookup from the port index."""
+        with patch('psutil.net_connections', return_value=mock_psutil_connections):
+            with patch('psutil.Process', return_value=mock_psutil_process):
+                scanner = PortScanner()
+                scanner.scan()
+
+                owner = scanner.get_port_owner(8000)
+                assert owner is not None
+                assert owner.pid == 1234
+                assert scanner.get_port_owner(9999) is None
+
+    def test_used_port_bitmap(self, mock_psutil_connections, mock_psutil_process):
+        """Test that scanned ports are set in the bitmap."""
+        with patch('psutil.net_connections', return_value=mock_psutil_connections):
+            with patch('psutil.Process', return_value=mock_psutil_process):
+                scanner = PortScanner()
+                scanner.scan()
+
+                bitmap = scanner.used_port_bitmap()
+                assert len(bitmap) == 8192
+                assert bitmap[8000 >> 3] & (1 << (8000 & 7))
+                assert not bitmap[8001 >> 3] & (1 << (8001 & 7))
+
+    def test_container_ports_not_indexed(self, mock_psutil_connections, mock_psutil_process):
+        """Test ports bound in another network namespace do not count as host ports."""
+        container = PortInfo(local_port=5432, local_address="0.0.0.0", remote_port=None,
+                             remote_address=None, pid=4321, process_name="postgres",
+                             status="LISTEN", protocol="tcp", namespace=4026532500)
+        with patch('psutil.net_connections', return_value=mock_psutil_connections):
+            with patch('psutil.Process', return_value=mock_psutil_process):
+                scanner = PortScanner()
+                scanner._namespace_scanner = MagicMock()
+                scanner._namespace_scanner.scan.return_value = [container]
+                ports = scanner.scan()
+
+                assert container in ports
+                assert scanner.find_by_port(5432) == []
+                assert scanner.get_port_owner(5432) is None
+                assert not scanner.used_port_bitmap()[5432 >> 3] & (1 << (5432 & 7))
+
+
+class TestScanProfile:
+    """Tests for profiled scans."""
+
+    def test_profile_phases(self):
+        """Test a profiled scan reports every phase and the name-cache split."""
+        from benchmarks.synthetic import make_connections, synthetic_system
+        from src.core.scan_profile import PHASES, ScanProfile
+
+        table = make_connections(300, processes=7)
+        profile = ScanProfile()
+        with synthetic_system(table):
+            ports = PortScanner().scan(profile=profile)
+
+        assert set(profile.phases) == set(PHASES) - {"inode_resolution", "namespaces", "tcp_info", "other_sockets"}
+        assert profile.rows == len(ports) == 300
+        assert profile.name_misses == len({conn.pid for conn in table})
+        assert profile.name_hits == 300 - profile.name_misses
+        assert profile.total > 0
+        assert "_phase" not in profile.to_dict()
+
+    def test_profile_scans_counts_allocations(self):
+        """Test tracemalloc sampling attributes the PortInfo objects to the scan."""
+        from benchmarks.synthetic import make_connections, synthetic_system
+        from src.core.scan_profile import format_profiles, profile_scans
+
+        with synthetic_system(make_connections(200)):
+            profiles = profile_scans(PortScanner(), repeat=3)
+
+        assert len(profiles) == 3
+        assert all(p.allocations >= 200 for p in profiles)
+        assert any("port_scanner.py" in site for site in profiles[-1].top_allocations)
+        report = format_profiles(profiles)
+        assert "name_lookup" in report
+        assert "hit rate" in report
+
+    def test_cli_profile_scan(self, capsys):
+        from src.cli import run
+
+        assert run(["profile-scan", "--repeat", "2", "--no-alloc"]) == 0
+        assert "enumeration" in capsys.readouterr().out
+
+
+class TestPortDiff:
+    """Tests for the scan diff stream."""
+
+    def test_scan_publishes_diff(self):
+        """Test subscribers see sockets that appeared and disappeared between scans."""
+        from benchmarks.synthetic import make_connections, synthetic_system
+
+        table = make_connections(50)
+        scanner = PortScanner()
+        diffs = []
+        unsubscribe = scanner.subscribe(diffs.append)
+
+        with synthetic_system(table):
+            scanner.scan()
+        with synthetic_system(table[10:] + make_connections(5, seed=1)):
+            scanner.scan()
+            scanner.scan()  # Unchanged: nothing published
+
+        assert len(diffs) == 2
+        assert len(diffs[0].added) == 50 and not diffs[0].removed
+        assert len(diffs[1].added) == 5 and len(diffs[1].removed) == 10
+        assert diffs[1].source == "scan"
+
+        unsubscribe()
+        with synthetic_system(table):
+            scanner.scan()
+        assert len(diffs) == 2
+
+    def test_apply_closed(self):
+        """Test closed sockets leave the snapshot and the port index without a rescan."""
+        from benchmarks.synthetic import make_connections, synthetic_system
+
+        table = make_connections(100)
+        scanner = PortScanner()
+        with synthetic_system(table):
+            ports = scanner.scan()
+        diffs = []
+        scanner.subscribe(diffs.append)
+
+        gone = ports[0]
+        diff = scanner.apply_closed([(gone.protocol, gone.local_address, gone.local_port,
+                                      gone.remote_address, gone.remote_port)])
+
+        assert diff.removed == [gone] and diff.source == "close_event"
+        assert diffs == [diff]
+        assert gone not in scanner.get_cached()
+        assert gone not in scanner.find_by_port(gone.local_port)
+        assert len(scanner.get_cached()) == 99
+
+        assert not scanner.apply_closed([("tcp", "10.9.9.9", 1, None, None)])
+        assert len(diffs) == 1
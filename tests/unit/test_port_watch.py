@@ -0,0 +1,100 @@
+"""
+Unit tests for PortScanner.wait_for_listen() / wait_for_free().
+"""
+
+import os
+import socket
+import threading
+import time
+
+from src.core.port_scanner import PortScanner
+
+
+def listen_later(delay, port=0):
+    """Open a TCP listener after `delay` seconds; returns (socket, ready event)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", port))
+
+    def run():
+        time.sleep(delay)
+        sock.listen(1)
+
+    threading.Thread(target=run, daemon=True).start()
+    return sock
+
+
+class TestWaitForPort:
+    def test_wait_for_listen(self):
+        sock = listen_later(0.3)
+        port = sock.getsockname()[1]
+        try:
+            result = PortScanner().wait_for_listen(port, timeout=10)
+        finally:
+            sock.close()
+
+        assert result.ready
+        assert result.pid == os.getpid()
+        assert 0.2 < result.elapsed < 10
+
+    def test_wait_for_free(self):
+        sock = listen_later(0)
+        port = sock.getsockname()[1]
+        threading.Timer(0.3, sock.close).start()
+        time.sleep(0.05)
+
+        result = PortScanner().wait_for_free(port, timeout=10)
+
+        assert result.ready
+        assert result.pid == os.getpid()  # Last owner seen
+
+    def test_timeout(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))  # Bound but never listening
+        try:
+            result = PortScanner().wait_for_listen(sock.getsockname()[1], timeout=0.3)
+        finally:
+            sock.close()
+
+        assert not result.ready
+        assert result.pid is None
+        assert result.elapsed >= 0.3
+
+    def test_waiters_share_one_watcher(self):
+        """Test concurrent waiters are served by one thread and one scan per interval."""
+        scanner = PortScanner()
+        existing = set(threading.enumerate())
+        sockets = [listen_later(0.4) for _ in range(20)]
+        results = []
+        scans = []
+        scan = scanner.scan
+        scanner.scan = lambda *a, **kw: scans.append(1) or scan(*a, **kw)
+
+        threads = [threading.Thread(target=lambda s=s: results.append(
+            scanner.wait_for_listen(s.getsockname()[1], timeout=10))) for s in sockets]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        watchers = [t for t in set(threading.enumerate()) - existing if t.name == "port-watcher"]
+        for thread in threads:
+            thread.join()
+        for sock in sockets:
+            sock.close()
+
+        assert len(watchers) == 1
+        assert len(results) == 20 and all(result.ready for result in results)
+        # One scan per 0.25 s interval, not one per waiter
+        assert len(scans) < 20
+        assert scanner._watcher.pending == 0
+
+    def test_cli_wait(self, capsys):
+        from src.cli import run
+
+        sock = listen_later(0)
+        port = sock.getsockname()[1]
+        time.sleep(0.05)
+        try:
+            assert run(["wait", str(port), "--timeout", "5"]) == 0
+        finally:
+            sock.close()
+        assert f"Port {port} is listening (PID {os.getpid()}" in capsys.readouterr().out
+        assert run(["wait", str(port), "--free", "--timeout", "5"]) == 0
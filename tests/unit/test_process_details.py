@@ -0,0 +1,171 @@
+"""
+Unit tests for batched, cached process details.
+"""
+
+import os
+import threading
+from unittest.mock import MagicMock
+
+import psutil
+
+from src.core.process_details import (
+    ProcessDetails,
+    ProcessDetailService,
+    child_counts,
+    fetch_details,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubFetch:
+    """Returns fake details; `create_times` lets a test simulate PID reuse."""
+
+    def __init__(self):
+        self.calls = []
+        self.create_times = {}
+
+    def __call__(self, pid, children=None):
+        self.calls.append(pid)
+        return ProcessDetails(pid, name=f"proc{pid}", create_time=self.create_time(pid),
+                              children=children)
+
+    def create_time(self, pid):
+        return self.create_times.get(pid, 1.0)
+
+
+def service_for(fetch, **kwargs):
+    return ProcessDetailService(fetch=fetch, count_children=dict, create_time=fetch.create_time, **kwargs)
+
+
+def collect(service):
+    """Capture on_ready batches; returns (batches, event set after each batch)."""
+    batches = []
+    ready = threading.Event()
+
+    def on_ready(results):
+        batches.append(results)
+        ready.set()
+
+    service.on_ready = on_ready
+    return batches, ready
+
+
+class TestFetchDetails:
+    def test_own_process(self):
+        details = fetch_details(os.getpid())
+
+        assert details.error is None
+        assert details.name == psutil.Process().name()
+        assert details.create_time == psutil.Process().create_time()
+        assert details.memory_rss > 0
+        assert details.open_files is not None
+
+    def test_missing_process(self):
+        details = fetch_details(2 ** 22 + 12345)
+        assert details.error == "Process not found"
+
+    def test_given_child_count(self):
+        """Test a known child count is used instead of walking the process table."""
+        assert fetch_details(os.getpid(), children=7).children == 7
+        assert child_counts().get(os.getppid(), 0) >= 1
+
+
+class TestProcessDetailService:
+    def test_batches_and_caches(self):
+        fetch = StubFetch()
+        clock = Clock()
+        service = service_for(fetch, ttl=10, clock=clock)
+        batches, ready = collect(service)
+
+        assert service.get(100) is None
+        service.request([100, 101, 100, 102])
+        assert ready.wait(5)
+
+        assert [d.pid for d in batches[0]] == [100, 101, 102]
+        assert service.get(101).name == "proc101"
+
+        ready.clear()
+        service.request([100, 101])  # Fresh: nothing to fetch
+        assert not ready.wait(0.2)
+        assert fetch.calls == [100, 101, 102]
+
+        clock.now = 11
+        assert service.get(100).name == "proc100"  # Stale results are still served
+        service.request([100])
+        assert ready.wait(5)
+        assert fetch.calls.count(100) == 2
+
+    def test_pid_reuse(self):
+        """Test a PID that now belongs to another process drops the old details."""
+        fetch = StubFetch()
+        clock = Clock()
+        service = service_for(fetch, ttl=10, clock=clock)
+        service.fetch_now(200)
+        fetch.create_times[200] = 2.0
+        clock.now = 11
+
+        details = service.fetch_now(200)
+
+        assert details.create_time == 2.0
+        assert service.get(200) is details
+        assert (200, 1.0) not in service._cache
+
+    def test_reused_pid_refetched_within_ttl(self):
+        """Test a fresh PID that now belongs to a new process is fetched again, off the caller's thread."""
+        fetch = StubFetch()
+        create_time = MagicMock(side_effect=fetch.create_time)
+        service = ProcessDetailService(ttl=10, fetch=fetch, count_children=dict,
+                                       create_time=create_time, clock=Clock())
+        batches, ready = collect(service)
+        service.fetch_now(300)
+        assert service.get(300).create_time == 1.0
+        assert not create_time.called  # get() never touches psutil
+
+        fetch.create_times[300] = 2.0
+        service.request([300])
+        assert ready.wait(5)
+        assert batches[0][0].create_time == 2.0
+        assert service.get(300).create_time == 2.0
+
+    def test_child_counts_read_once_per_batch(self):
+        fetch = StubFetch()
+        counts = MagicMock(return_value={101: 3})
+        service = ProcessDetailService(fetch=fetch, count_children=counts, create_time=fetch.create_time)
+        batches, ready = collect(service)
+
+        service.request([100, 101, 102])
+        assert ready.wait(5)
+
+        assert counts.call_count == 1
+        assert [d.children for d in batches[0]] == [0, 3, 0]
+
+    def test_dashboard_fills_visible_rows_only(self, qtbot):
+        from src.core.port_scanner import PortInfo
+        from src.ui.widgets.port_table import PortTableWidget
+
+        ports = [PortInfo(10000 + i, "127.0.0.1", None, None, 1000 + i, "proc", "LISTEN", "tcp")
+                 for i in range(500)]
+        scanner = MagicMock(tcp_info=False)
+        scanner.get_listening_ports.return_value = ports
+        fetch = StubFetch()
+        service = service_for(fetch)
+        widget = PortTableWidget(scanner, details=service)
+        qtbot.addWidget(widget)
+        widget.resize(900, 300)
+        widget.show()
+
+        columns = widget._columns
+        qtbot.waitUntil(lambda: widget.table.item(0, columns["User"]) is not None, timeout=5000)
+        assert 0 < len(fetch.calls) < 100
+        assert widget.table.item(499, columns["User"]) is None
+
+        widget.table.scrollToBottom()
+        qtbot.waitUntil(lambda: widget.table.item(499, columns["User"]) is not None, timeout=5000)
+        assert len(fetch.calls) < 200
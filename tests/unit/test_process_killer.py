@@ -64,6 +64,7 @@ class TestProcessKiller:
             assert info["pid"] == 1234
             assert info["name"] == "python.exe"
             assert info["status"] == "running"
+            assert "error" not in info
 
     def test_get_process_info_not_found(self):
         """Test getting info for non-existent process."""
@@ -0,0 +1,205 @@
+"""
+Unit tests for the /proc socket reader and the parallel inode index.
+"""
+
+import os
+import socket
+import sys
+
+import pytest
+
+from src.core.procfs import InodeIndex
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="needs POSIX symlinks")
+
+
+def add_process(proc, pid, inodes):
+    fd_dir = proc / str(pid) / "fd"
+    fd_dir.mkdir(parents=True)
+    for fd, inode in enumerate(inodes, start=3):
+        os.symlink(f"socket:[{inode}]", fd_dir / str(fd))
+    os.symlink("/dev/null", fd_dir / "0")
+
+
+def set_sockets(proc, pid, inodes):
+    """Replace a process's sockets, keeping its fd count (and so its fingerprint size)."""
+    fd_dir = proc / str(pid) / "fd"
+    for entry in fd_dir.iterdir():
+        if entry.name != "0":
+            entry.unlink()
+    for fd, inode in enumerate(inodes, start=3):
+        os.symlink(f"socket:[{inode}]", fd_dir / str(fd))
+
+
+@pytest.fixture
+def fake_proc(tmp_path):
+    proc = tmp_path / "proc"
+    for pid in range(100, 300):
+        add_process(proc, pid, [pid * 10, pid * 10 + 1])
+    return proc
+
+
+class TestInodeIndex:
+    """Tests for InodeIndex."""
+
+    def test_resolves_across_shards(self, fake_proc):
+        index = InodeIndex(fake_proc, max_workers=4, shard_size=16)
+        wanted = {pid * 10 + 1 for pid in range(100, 300)} | {0, 999999}
+
+        owners = index.resolve(wanted)
+
+        assert len(owners) == 200
+        assert owners[1501] == 150
+        assert index.walked == 200
+
+    def test_unchanged_processes_are_skipped(self, fake_proc):
+        index = InodeIndex(fake_proc, shard_size=16)
+        wanted = {1000, 2990}
+        index.resolve(wanted)
+
+        index.resolve(wanted)
+        assert index.walked == 0
+        assert index.skipped == 200
+
+        # Unknown sockets trigger a single rewalk, then are remembered as unowned
+        index.resolve(wanted | {424242})
+        assert index.walked == 200
+        index.resolve(wanted | {424242})
+        assert index.walked == 0
+
+    def test_swapped_socket_is_found(self, fake_proc):
+        """Test a process that replaced a socket without changing its fd count."""
+        index = InodeIndex(fake_proc, shard_size=16)
+        index.resolve({1000})
+
+        set_sockets(fake_proc, 100, [777, 1001])
+        owners = index.resolve({777})
+
+        assert owners == {777: 100}
+
+    def test_handed_over_socket_changes_owner(self, fake_proc):
+        """Test a socket passed to another process is not left with its old owner."""
+        index = InodeIndex(fake_proc, shard_size=16)
+        assert index.resolve({1000}) == {1000: 100}
+
+        # As on kernels before 6.2, neither fd directory's fingerprint changes
+        for pid, inodes in ((100, [555, 1001]), (101, [1000, 1011])):
+            fd_dir = fake_proc / str(pid) / "fd"
+            before = fd_dir.stat()
+            set_sockets(fake_proc, pid, inodes)
+            os.utime(fd_dir, ns=(before.st_atime_ns, before.st_mtime_ns))
+            assert index._fingerprint(pid) == index._fingerprints[pid]
+
+        assert index.resolve({1000}) == {1000: 101}
+
+    def test_unreadable_processes_are_remembered(self, fake_proc, monkeypatch):
+        """Test processes whose fds cannot be read are not walked on every resolve."""
+        import src.core.procfs as procfs
+
+        real = procfs.pid_socket_fds
+        monkeypatch.setattr(procfs, "pid_socket_fds",
+                            lambda pid, root: None if pid >= 200 else real(pid, root))
+        index = InodeIndex(fake_proc, shard_size=16)
+        index.resolve({1000, 2000})
+        assert index.walked == 200
+
+        index.resolve({1000, 2000})
+        assert index.walked == 0
+
+    def test_exited_processes_are_dropped(self, fake_proc):
+        index = InodeIndex(fake_proc, shard_size=16)
+        index.resolve({1000})
+
+        for entry in (fake_proc / "100" / "fd").iterdir():
+            entry.unlink()
+        (fake_proc / "100" / "fd").rmdir()
+        (fake_proc / "100").rmdir()
+
+        assert index.resolve({1000}) == {}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+class TestProcfsScanner:
+    """Tests for PortScanner(parallel_inodes=True) on the live system."""
+
+    def test_finds_own_listener(self):
+        from src.core.port_scanner import PortScanner
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(1)
+            port = sock.getsockname()[1]
+
+            scanner = PortScanner(parallel_inodes=True)
+            scanner.scan()
+            owner = scanner.get_port_owner(port)
+            # A second scan reuses the index
+            scanner.scan()
+
+        assert owner is not None
+        assert owner.pid == os.getpid()
+        assert owner.status == "LISTEN"
+        assert owner.protocol == "tcp"
+        assert scanner.get_port_owner(port).pid == os.getpid()
+
+
+class TestUnixSockets:
+    """Tests for /proc/net/unix parsing and Unix/raw socket scanning."""
+
+    def test_read_unix_table(self, tmp_path):
+        from src.core.procfs import read_unix_table
+
+        net = tmp_path / "self" / "net"
+        net.mkdir(parents=True)
+        (net / "unix").write_text(
+            "Num       RefCount Protocol Flags    Type St Inode Path\n"
+            "0000000000000000: 00000002 00000000 00010000 0001 01 1001 /run/docker.sock\n"
+            "0000000000000000: 00000003 00000000 00000000 0001 03 1002 /run/docker.sock\n"
+            "0000000000000000: 00000002 00000000 00000000 0002 01 1003 /dev/log\n"
+            "0000000000000000: 00000002 00000000 00010000 0005 01 1004 @abstract name\n"
+            "0000000000000000: 00000003 00000000 00000000 0001 03 1005\n"
+        )
+
+        assert read_unix_table("self", tmp_path) == [
+            (1001, "/run/docker.sock", "stream", "LISTEN"),
+            (1003, "/dev/log", "dgram", "UNCONNECTED"),
+            (1004, "@abstract name", "seqpacket", "LISTEN"),
+        ]
+        assert len(read_unix_table("self", tmp_path, servers_only=False)) == 5
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc/net/unix")
+    @pytest.mark.parametrize("parallel_inodes", [False, True])
+    def test_scan_own_unix_listener(self, tmp_path, parallel_inodes):
+        from src.core.port_scanner import PortScanner
+
+        path = str(tmp_path / "server.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        try:
+            scanner = PortScanner(unix_sockets=True, parallel_inodes=parallel_inodes)
+            ports = scanner.scan()
+        finally:
+            server.close()
+
+        mine = [entry for entry in scanner.get_unix_sockets() if entry.local_address == path]
+        assert len(mine) == 1
+        assert mine[0].pid == os.getpid() and mine[0].status == "LISTEN"
+        assert all(entry.protocol in ("tcp", "udp") for entry in ports)
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc/net/raw")
+    def test_scan_raw_socket(self):
+        from src.core.port_scanner import PortScanner
+
+        try:
+            raw = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        except PermissionError:
+            pytest.skip("raw sockets need CAP_NET_RAW")
+        try:
+            scanner = PortScanner(raw_sockets=True)
+            scanner.scan()
+        finally:
+            raw.close()
+
+        mine = [entry for entry in scanner.get_raw_sockets() if entry.pid == os.getpid()]
+        assert mine and mine[0].local_port == socket.IPPROTO_ICMP
@@ -0,0 +1,120 @@
+"""
+Unit tests for incremental connection rollups.
+"""
+
+from collections import Counter
+
+from benchmarks.synthetic import make_connections, synthetic_system
+from src.core.port_scanner import PortDiff, PortInfo, PortScanner
+from src.core.rollup import PortRollup
+
+
+def recount(ports, key):
+    return Counter(key(entry) for entry in ports if key(entry) is not None)
+
+
+class TestPortRollup:
+    def test_follows_scans(self):
+        """Test counts match a full recount after scans that add and remove sockets."""
+        scanner = PortScanner()
+        table = make_connections(400, processes=20)
+        with synthetic_system(table[:300]):
+            scanner.scan()
+        rollup = PortRollup(scanner)
+        with synthetic_system(table[100:]):
+            ports = scanner.scan()
+
+        assert rollup.total == len(ports) == 300
+        assert rollup.top("state", 10) == recount(ports, lambda e: e.status).most_common(10)
+        processes = recount(ports, lambda e: (e.pid, e.process_name))
+        assert dict(rollup.top("process", 100)) == dict(processes)
+        assert rollup.count("remote_host", None) == 0
+        top_port, count = rollup.top("local_port", 1)[0]
+        assert count == max(recount(ports, lambda e: e.local_port).values())
+        assert rollup.count("local_port", top_port) == count
+
+    def test_close_events_and_detach(self):
+        scanner = PortScanner()
+        with synthetic_system(make_connections(50)):
+            ports = scanner.scan()
+        rollup = PortRollup(scanner)
+        gone = ports[0]
+
+        scanner.apply_closed([(gone.protocol, gone.local_address, gone.local_port,
+                               gone.remote_address, gone.remote_port)])
+        assert rollup.total == 49
+
+        rollup.detach()
+        with synthetic_system([]):
+            scanner.scan()
+        assert rollup.total == 49
+
+    def test_skips_diffs_in_starting_snapshot(self):
+        """Test a diff published while attaching is not counted twice."""
+        scanner = PortScanner()
+        with synthetic_system(make_connections(40)):
+            scanner.scan()
+        published = []
+        scanner.subscribe(published.append)
+        with synthetic_system(make_connections(60)):
+            scanner.scan()
+        rollup = PortRollup(scanner)
+
+        rollup.apply(published[-1])  # Delivered late, after attach read the snapshot
+        assert rollup.total == 60
+
+    def test_out_of_order_diffs_cancel(self):
+        """Test a removal arriving before its addition leaves no trace."""
+        entry = PortInfo(8000, "127.0.0.1", None, None, 10, "web", "LISTEN", "tcp")
+        rollup = PortRollup()
+
+        rollup.apply(PortDiff(added=[], removed=[entry]))
+        assert rollup.top("local_port") == []
+        assert rollup.count("local_port", 8000) == 0
+        rollup.apply(PortDiff(added=[entry], removed=[]))
+        assert rollup.top("local_port") == []
+        assert rollup.total == 0
+
+    def test_top_after_churn(self):
+        """Test top() agrees with a full ranking after counts rise, fall and hit zero."""
+        table = [PortInfo(8000 + i, "127.0.0.1", None, None, i % 7 * i % 12, f"p{i % 7 * i % 12}",
+                          "LISTEN", "tcp") for i in range(300)]
+        rollup = PortRollup()
+        live = []
+        for start in range(0, 300, 30):
+            added = table[start:start + 30]
+            removed = live[::3]
+            rollup.apply(PortDiff(added=added, removed=removed))
+            live = [entry for entry in live if entry not in removed] + added
+
+            expected = recount(live, lambda e: (e.pid, e.process_name))
+            top = rollup.top("process", 5)
+            assert [count for _, count in top] == [count for _, count in expected.most_common(5)]
+            assert all(expected[key] == count for key, count in top)
+            assert len(rollup.top("process", 100)) == len(expected)
+
+    def test_duplicate_rows(self):
+        """Test identical rows (e.g. SO_REUSEPORT sockets) are counted one by one."""
+        table = make_connections(1)
+        scanner = PortScanner()
+        rollup = PortRollup(scanner)
+        with synthetic_system(table * 3):
+            scanner.scan()
+        assert rollup.total == 3
+        with synthetic_system(table):
+            scanner.scan()
+        assert rollup.total == 1
+        assert rollup.top("local_port") == [(table[0].laddr.port, 1)]
+
+    def test_summary_tab(self, qtbot):
+        from src.ui.widgets.summary import SummaryWidget
+
+        scanner = PortScanner()
+        with synthetic_system(make_connections(200, processes=5)):
+            scanner.scan()
+        widget = SummaryWidget(PortRollup(scanner), top=3)
+        qtbot.addWidget(widget)
+
+        assert widget.total_label.text() == "Total sockets: 200"
+        assert widget.tables["process"].rowCount() == 3
+        assert widget.tables["state"].item(0, 0).text() == "ESTABLISHED"
@@ -0,0 +1,143 @@
+"""
+Unit tests for binary port snapshots.
+"""
+
+import struct
+
+import pytest
+
+from benchmarks.synthetic import make_connections, synthetic_system
+from src.cli import run
+from src.core.port_scanner import PortInfo, PortScanner
+from src.core.snapshot import Snapshot, SnapshotError, diff_snapshots, read_snapshot, write_snapshot
+
+
+def port(local_port, status="LISTEN", pid=100, **fields):
+    return PortInfo(local_port=local_port, local_address=fields.pop("local_address", "127.0.0.1"),
+                    remote_port=None, remote_address=None, pid=pid, process_name="server",
+                    status=status, protocol="tcp", **fields)
+
+
+class TestSnapshot:
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip(self, tmp_path, compress):
+        """Test every field survives a save and load, including None values."""
+        ports = [
+            port(8000),
+            port(8000, pid=None),
+            port(5432, local_address="::1", namespace=4026532000, container_id="3f2a9c1b"),
+            PortInfo(local_port=51000, local_address="10.0.0.2", remote_port=443,
+                     remote_address="93.184.216.34", pid=7, process_name="curl ñ",
+                     status="ESTABLISHED", protocol="tcp"),
+        ]
+        path = tmp_path / "ports.snap"
+        assert write_snapshot(path, ports, compress=compress) == 4
+
+        with Snapshot(path) as snapshot:
+            assert snapshot.compressed is compress
+            loaded = list(snapshot)
+        assert sorted(loaded, key=repr) == sorted(ports, key=repr)
+
+    def test_strings_are_interned(self, tmp_path):
+        """Test repeated addresses and names are stored once."""
+        path = tmp_path / "ports.snap"
+        write_snapshot(path, [port(p) for p in range(1000, 2000)])
+        with Snapshot(path) as snapshot:
+            # 127.0.0.1, server, LISTEN, tcp
+            assert snapshot.string_count == 4
+            assert set(snapshot.column("process_name")) == {1}
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "empty.snap"
+        write_snapshot(path, [])
+        assert read_snapshot(path) == []
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.snap"
+        path.write_bytes(b"not a snapshot at all, but long enough for a header")
+        with pytest.raises(SnapshotError):
+            Snapshot(path)
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_truncated(self, tmp_path, compress):
+        path = tmp_path / "ports.snap"
+        write_snapshot(path, [port(p) for p in range(1000, 1100)], compress=compress)
+        path.write_bytes(path.read_bytes()[:-5])
+        with pytest.raises(SnapshotError):
+            Snapshot(path)
+
+    @pytest.mark.parametrize("field", [8, 12])  # Row count, string count
+    def test_counts_larger_than_body(self, tmp_path, field):
+        """Test a header claiming more rows or strings than the body holds is rejected."""
+        path = tmp_path / "ports.snap"
+        write_snapshot(path, [port(8000)])
+        data = bytearray(path.read_bytes())
+        struct.pack_into("<I", data, field, 10 ** 6)
+        path.write_bytes(bytes(data))
+        with pytest.raises(SnapshotError):
+            Snapshot(path)
+
+    def test_bad_string_index(self, tmp_path):
+        path = tmp_path / "ports.snap"
+        write_snapshot(path, [port(8000)])
+        data = bytearray(path.read_bytes())
+        # local_address column of the only row; 32-byte header, 8 bytes per earlier column
+        struct.pack_into("<I", data, 32 + 8 * 4, 99)
+        path.write_bytes(bytes(data))
+        with Snapshot(path) as snapshot, pytest.raises(SnapshotError):
+            snapshot.row(0)
+
+    def test_diff_streams_changes(self, tmp_path):
+        """Test the merge diff matches PortScanner.diff, duplicates included."""
+        table = make_connections(600, processes=30)
+        scanner = PortScanner()
+        with synthetic_system(table[:400] + table[:5]):
+            old = scanner.scan()
+        with synthetic_system(table[200:]):
+            new = scanner.scan()
+        write_snapshot(tmp_path / "a.snap", old)
+        write_snapshot(tmp_path / "b.snap", new, compress=True)
+
+        with Snapshot(tmp_path / "a.snap") as a, Snapshot(tmp_path / "b.snap") as b:
+            changes = list(diff_snapshots(a, b))
+        expected = PortScanner.diff(old, new)
+        key = PortScanner.socket_key
+        assert sorted(key(e) for sign, e in changes if sign == "+") == sorted(map(key, expected.added))
+        assert sorted(key(e) for sign, e in changes if sign == "-") == sorted(map(key, expected.removed))
+
+    def test_scanner_export_import(self, tmp_path):
+        """Test a scanner can reload a saved scan and publishes the difference."""
+        table = make_connections(50)
+        scanner = PortScanner()
+        with synthetic_system(table):
+            ports = scanner.scan()
+        path = tmp_path / "scan.snap"
+        assert scanner.export_snapshot(path) == len(ports)
+
+        other = PortScanner()
+        diffs = []
+        other.subscribe(diffs.append)
+        other.import_snapshot(path)
+        assert len(other.get_cached()) == len(ports)
+        assert len(diffs[0].added) == len(ports)
+        assert other.find_by_port(ports[0].local_port)
+
+    def test_cli_diff(self, tmp_path, capsys):
+        write_snapshot(tmp_path / "a.snap", [port(8000), port(9000)])
+        write_snapshot(tmp_path / "b.snap", [port(8000), port(9001)])
+
+        assert run(["diff", str(tmp_path / "a.snap"), str(tmp_path / "a.snap")]) == 0
+        assert run(["diff", str(tmp_path / "a.snap"), str(tmp_path / "b.snap")]) == 1
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == ["- tcp 127.0.0.1:9000 LISTEN server (100)",
+                         "+ tcp 127.0.0.1:9001 LISTEN server (100)"]
+
+    def test_cli_diff_damaged(self, tmp_path, capsys):
+        """Test a damaged file is reported with exit code 2 instead of a traceback."""
+        write_snapshot(tmp_path / "a.snap", [port(8000)])
+        write_snapshot(tmp_path / "b.snap", [port(p) for p in range(1000, 1100)], compress=True)
+        damaged = tmp_path / "b.snap"
+        damaged.write_bytes(damaged.read_bytes()[:-5])
+
+        assert run(["diff", str(tmp_path / "a.snap"), str(damaged)]) == 2
+        assert "Cannot read snapshot" in capsys.readouterr().err
@@ -0,0 +1,165 @@
+"""
+Unit tests for sock_diag socket-destroy events.
+"""
+
+import socket
+import struct
+import time
+
+import pytest
+
+from src.core import sock_diag
+from src.core.port_scanner import PortScanner
+from src.core.sock_diag import SOCK_DIAG_BY_FAMILY, SocketCloseListener, parse_destroy_messages
+
+
+def destroy_message(family, src, sport, dst="", dport=0, inode=42):
+    """Build a netlink datagram carrying one inet_diag_msg."""
+    src_raw = socket.inet_pton(family, src).ljust(16, b"\0")
+    dst_raw = (socket.inet_pton(family, dst) if dst else b"").ljust(16, b"\0")
+    body = struct.pack("=BBBB", family, 7, 0, 0)
+    body += struct.pack(">HH16s16s", sport, dport, src_raw, dst_raw)
+    body += struct.pack("=L8sLLLLL", 0, b"\0" * 8, 0, 0, 0, 1000, inode)
+    assert len(body) == sock_diag.INET_DIAG_MSG_SIZE
+    return struct.pack("=LHHLL", 16 + len(body), SOCK_DIAG_BY_FAMILY, 0, 0, 0) + body
+
+
+class TestParsing:
+    def test_parse_ipv4_and_ipv6(self):
+        data = (destroy_message(socket.AF_INET, "127.0.0.1", 8000)
+                + destroy_message(socket.AF_INET6, "::1", 443, "2001:db8::5", 51000))
+
+        assert parse_destroy_messages(data, "tcp") == [
+            ("tcp", "127.0.0.1", 8000, None, None),
+            ("tcp", "::1", 443, "2001:db8::5", 51000),
+        ]
+
+    def test_ignores_other_messages(self):
+        done = struct.pack("=LHHLL", 20, sock_diag.NLMSG_DONE, 0, 0, 0) + b"\0" * 4
+        data = done + destroy_message(socket.AF_INET, "10.0.0.1", 53)
+
+        assert parse_destroy_messages(data, "udp") == [("udp", "10.0.0.1", 53, None, None)]
+        assert parse_destroy_messages(b"\0" * 8, "udp") == []
+
+
+class TestListener:
+    def test_degrades_without_permission(self, monkeypatch):
+        """Test start() reports failure instead of raising when the groups cannot be joined."""
+        def refuse(protocol):
+            raise PermissionError(1, "Operation not permitted")
+
+        monkeypatch.setattr(sock_diag, "open_destroy_socket", refuse)
+        listener = SocketCloseListener(PortScanner())
+
+        assert listener.start() is False
+        assert "not permitted" in listener.error
+        assert not listener.running
+
+    def test_live_close_event(self):
+        """Test a real listener disappears from the snapshot when it is closed."""
+        scanner = PortScanner()
+        diffs = []
+        listener = SocketCloseListener(scanner, reconcile_interval=None, on_change=diffs.append)
+        if not listener.start():
+            pytest.skip(listener.error)
+        try:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            port = server.getsockname()[1]
+            scanner.scan()
+            assert scanner.find_by_port(port)
+
+            server.close()
+            deadline = time.monotonic() + 5
+            while scanner.find_by_port(port) and time.monotonic() < deadline:
+                time.sleep(0.02)
+
+            assert not scanner.find_by_port(port)
+            assert any(diff.source == "close_event" for diff in diffs)
+        finally:
+            listener.stop()
+
+
+class TestTcpInfo:
+    def test_parse_tcp_info(self):
+        data = bytearray(232)
+        data[2] = 3  # tcpi_retransmits
+        struct.pack_into("=LL", data, 68, 1500, 250)
+        struct.pack_into("=L", data, 100, 17)
+        struct.pack_into("=QQ", data, 120, 10_000, 20_000)
+
+        stats = sock_diag.parse_tcp_info(bytes(data), recv_queue=5, send_queue=9)
+
+        assert (stats.retransmits, stats.rtt_us, stats.rtt_var_us, stats.total_retrans) == (3, 1500, 250, 17)
+        assert (stats.bytes_acked, stats.bytes_received) == (10_000, 20_000)
+        assert (stats.recv_queue, stats.send_queue) == (5, 9)
+
+    def test_parse_short_tcp_info(self):
+        """Test fields missing from an older kernel's shorter struct stay zero."""
+        data = bytearray(104)
+        struct.pack_into("=LL", data, 68, 800, 100)
+
+        stats = sock_diag.parse_tcp_info(bytes(data))
+
+        assert stats.rtt_us == 800
+        assert stats.bytes_received == 0
+
+    def test_scan_attaches_tcp_info(self):
+        """Test a live connection's queued bytes show up on its PortInfo."""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        port = server.getsockname()[1]
+        client = socket.create_connection(("127.0.0.1", port))
+        accepted, _ = server.accept()
+        try:
+            client.sendall(b"x" * 4000)  # Never read: stays in the receive queue
+            time.sleep(0.05)
+            scanner = PortScanner(tcp_info=True)
+            scanner.scan()
+            if not scanner.tcp_info:
+                pytest.skip("sock_diag is unavailable")
+
+            rows = {entry.remote_port: entry for entry in scanner.find_by_port(port)}
+            receiver = rows[client.getsockname()[1]]
+            assert receiver.tcp is not None
+            assert receiver.tcp.recv_queue == 4000
+            assert receiver.tcp.bytes_received == 4000
+        finally:
+            for sock in (accepted, client, server):
+                sock.close()
+
+    def test_dashboard_sorted_by_retrans_keeps_rows_together(self, qtbot):
+        """Test refilling a table sorted by a tcp_info column leaves each value on its own row."""
+        from unittest.mock import MagicMock
+
+        from PyQt6.QtCore import Qt
+
+        from src.core.port_scanner import PortInfo, TcpStats
+        from src.ui.widgets.port_table import PortTableWidget
+
+        listeners = {}
+        connections = {}
+        for i, retrans in enumerate((5, 1, 9, 3, 7)):
+            port = 9000 + i
+            listeners[port] = PortInfo(port, "127.0.0.1", None, None, 100 + i, "srv", "LISTEN", "tcp")
+            connections[port] = [listeners[port],
+                                 PortInfo(port, "127.0.0.1", 50000 + i, "127.0.0.1", 100 + i, "srv",
+                                          "ESTABLISHED", "tcp", tcp=TcpStats(total_retrans=retrans))]
+        scanner = MagicMock(tcp_info=True)
+        scanner.get_listening_ports.return_value = list(listeners.values())
+        scanner.find_by_port.side_effect = lambda port: connections[port]
+        widget = PortTableWidget(scanner)
+        qtbot.addWidget(widget)
+        columns = widget._columns
+        widget.table.sortItems(columns["Retrans"], Qt.SortOrder.DescendingOrder)
+
+        widget._populate_table()
+
+        table = widget.table
+        rows = [(int(table.item(row, columns["Local Port"]).text()),
+                 table.item(row, columns["Retrans"]).data(Qt.ItemDataRole.DisplayRole))
+                for row in range(table.rowCount())]
+        assert rows == [(9002, 9), (9004, 7), (9000, 5), (9003, 3), (9001, 1)]
+        assert table.isSortingEnabled()
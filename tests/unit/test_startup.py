@@ -0,0 +1,105 @@
+"""
+Unit tests for background startup tasks and the startup timeline.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.startup import StartupTasks, StartupTimeline
+from src.utils.updater import Updater
+
+
+@pytest.fixture
+def release_stub():
+    """Local HTTP server standing in for the GitHub releases API."""
+    state = {"delay": 0.0, "tag": "v99.0.0"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            time.sleep(state["delay"])
+            body = json.dumps({"tag_name": state["tag"], "assets": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/releases/latest"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+class TestStartupTimeline:
+    """Tests for StartupTimeline."""
+
+    def test_marks_are_ordered(self):
+        """Test that marks record increasing offsets."""
+        timeline = StartupTimeline()
+        first = timeline.mark("a")
+        second = timeline.mark("b")
+
+        assert 0 <= first <= second
+        assert timeline.get("b") == second
+        assert timeline.get("missing") is None
+        assert "a" in timeline.format().splitlines()[0]
+
+
+class TestStartupTasks:
+    """Tests for StartupTasks."""
+
+    def test_update_check_does_not_block(self, release_stub):
+        """Test that the tray can be shown while a slow update check is pending."""
+        release_stub["delay"] = 0.5
+        updater = Updater(api_url=release_stub["url"], timeout=5)
+        results = {}
+        reported = threading.Event()
+
+        def on_done(name, result, error):
+            results[name] = result
+            reported.set()
+
+        tasks = StartupTasks()
+        tasks.submit("update check", updater.check_for_updates, on_done=on_done)
+        tasks.submit("scan", time.sleep, 0.05)
+        tasks.timeline.mark("tray shown")
+        tasks.wait(timeout=5)
+        tasks.shutdown()
+        assert reported.wait(timeout=5)
+
+        timeline = tasks.timeline
+        assert timeline.get("tray shown") < timeline.get("update check done")
+        # Both tasks were running at the same time
+        assert timeline.get("scan started") < timeline.get("update check done")
+        assert results["update check"][0] is True
+        assert updater.latest_version == "99.0.0"
+
+    def test_errors_are_reported(self):
+        """Test that a failing task reports its exception."""
+        errors = []
+        reported = threading.Event()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        def on_done(name, result, error):
+            errors.append(error)
+            reported.set()
+
+        tasks = StartupTasks()
+        tasks.submit("broken", fail, on_done=on_done)
+        tasks.wait(timeout=5)
+        assert reported.wait(timeout=5)
+
+        assert isinstance(errors[0], RuntimeError)
+        assert tasks.timeline.get("broken done") is not None
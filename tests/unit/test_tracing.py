@@ -0,0 +1,127 @@
+"""
+Unit tests for span tracing and the dashboard performance HUD.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.tracing import Tracer
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.enable()
+    return tracer
+
+
+class TestTracer:
+    """Tests for Tracer."""
+
+    def test_disabled_records_nothing(self):
+        tracer = Tracer()
+
+        @tracer.traced()
+        def work():
+            return 1
+
+        with tracer.span("block"):
+            assert work() == 1
+        assert len(tracer.spans) == 0
+
+    def test_toggle_at_runtime(self):
+        tracer = Tracer()
+        work = tracer.traced("work")(lambda: None)
+
+        work()
+        tracer.enable()
+        work()
+        tracer.disable()
+        work()
+
+        assert [span.name for span in tracer.spans] == ["work"]
+
+    def test_breakdown(self, tracer):
+        """Test child spans are totalled under the most recent root."""
+        child = tracer.traced("child")(lambda: time.sleep(0.001))
+        with tracer.span("root"):
+            child()
+            child()
+            with tracer.span("other"):
+                pass
+        child()  # Outside the root
+
+        breakdown = tracer.breakdown("root")
+
+        assert [name for name, _, _ in breakdown] == ["child", "other"]
+        assert breakdown[0][2] == 2
+        assert breakdown[0][1] <= tracer.last("root").duration
+
+    def test_queries_while_other_threads_record(self, tracer):
+        """Test last() and breakdown() tolerate spans appended concurrently."""
+        with tracer.span("root"):
+            pass
+        stop = threading.Event()
+
+        def record():
+            while not stop.is_set():
+                with tracer.span("worker"):
+                    pass
+
+        thread = threading.Thread(target=record)
+        thread.start()
+        try:
+            for _ in range(200):
+                tracer.breakdown("root")
+                tracer.last("root")
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_chrome_trace_export(self, tracer, tmp_path):
+        with tracer.span("scan"):
+            pass
+        path = tmp_path / "trace.json"
+
+        assert tracer.export_chrome_trace(path) == 1
+        event = json.loads(path.read_text())["traceEvents"][0]
+        assert event["name"] == "scan"
+        assert event["ph"] == "X"
+        assert {"ts", "dur", "pid", "tid"} <= event.keys()
+
+
+class TestDashboardHud:
+    """Tests for the status bar HUD."""
+
+    def test_hud_shows_refresh_breakdown(self, qtbot):
+        from src.core.tracing import TRACER
+        from src.ui.dashboard import Dashboard
+
+        scanner = MagicMock()
+        scanner.scan.return_value = []
+        scanner.get_cached.return_value = []
+        scanner.get_snapshot.return_value = (0, [])
+        scanner.get_listening_ports.return_value = []
+        manager = MagicMock()
+        manager.get_all_tunnels.return_value = []
+        dashboard = Dashboard(scanner, manager)
+        qtbot.addWidget(dashboard)
+        dashboard.refresh_timer.stop()
+
+        try:
+            dashboard.hud_action.setChecked(True)
+            assert TRACER.enabled
+            dashboard._refresh_all()
+            text = dashboard.hud_label.text()
+        finally:
+            dashboard.hud_action.setChecked(False)
+            TRACER.clear()
+
+        assert text.startswith("refresh ")
+        assert "populate_table" in text
+        assert "TunnelListWidget" not in text
+        assert not TRACER.enabled
@@ -0,0 +1,186 @@
+"""
+Unit tests for tunnel bulk import/export.
+"""
+
+import io
+import json
+from unittest.mock import patch
+
+from src.core.tunnel_io import iter_json, iter_ssh_config, validate_entry, write_entries
+from src.core.tunnel_manager import TunnelConfig, TunnelManager
+
+SSH_CONFIG = """
+Host *
+    ServerAliveInterval 30
+
+Host db-prod db
+    HostName 10.0.0.5
+    User deploy
+    IdentityFile ~/.ssh/prod
+    LocalForward 15432 localhost:5432
+    LocalForward 127.0.0.1:16379 127.0.0.1:6379
+
+Host web
+    LocalForward 18080 internal.example.com:80
+"""
+
+
+class TestParsers:
+    """Tests for the streaming parsers."""
+
+    def test_iter_json_list_small_chunks(self):
+        """Test that a list is parsed element by element across chunk boundaries."""
+        data = [{"name": f"t{i}", "nested": {"a": [1, 2, "}"]}} for i in range(20)]
+        entries = list(iter_json(io.StringIO(json.dumps(data)), chunk_size=7))
+
+        assert [raw for _, raw in entries] == data
+        assert entries[0][0] == "entry 1"
+
+    def test_iter_json_mapping(self):
+        """Test the tunnels.json {name: config} layout."""
+        text = json.dumps({"a": {"local_port": 1}, "b": {"local_port": 2}}, indent=2)
+        entries = list(iter_json(io.StringIO(text), chunk_size=5))
+
+        assert [raw["name"] for _, raw in entries] == ["a", "b"]
+
+    def test_iter_ssh_config(self):
+        """Test LocalForward extraction from Host blocks."""
+        entries = [raw for _, raw in iter_ssh_config(io.StringIO(SSH_CONFIG))]
+
+        assert len(entries) == 3
+        assert entries[0]["name"] == "db-prod-15432"
+        assert entries[0]["remote_user"] == "deploy"
+        assert entries[0]["remote_host"] == "db-prod"
+        assert entries[0]["ssh_key"] == "~/.ssh/prod"
+        assert entries[1]["local_port"] == "16379"
+        assert "_error" in entries[2]
+
+    def test_iter_ssh_config_equals_syntax(self):
+        """Test that keyword=value works and later "=" stay in the value."""
+        text = (
+            "Host=db\n"
+            "    User = deploy\n"
+            "    IdentityFile=~/.ssh/key=prod\n"
+            "    # PortPilot tunnel: primary db\n"
+            "    LocalForward=15432 localhost:5432\n"
+            "    LocalForward 15433 localhost:5433\n"
+        )
+        entries = [raw for _, raw in iter_ssh_config(io.StringIO(text))]
+
+        assert entries[0]["remote_host"] == "db"
+        assert entries[0]["remote_user"] == "deploy"
+        assert entries[0]["ssh_key"] == "~/.ssh/key=prod"
+        assert entries[0]["local_port"] == "15432"
+        assert entries[0]["name"] == "primary db"
+        assert entries[1]["name"] == "db-15433"  # The comment names only the next forward
+
+    def test_write_ssh_config_groups_hosts(self):
+        """Test one Host block per host and account, with an alias for a second account."""
+        tunnels = [
+            TunnelConfig(name="pg", remote_user="deploy", remote_host="db", local_port=15432, remote_port=5432),
+            TunnelConfig(name="redis", remote_user="deploy", remote_host="db", local_port=16379, remote_port=6379),
+            TunnelConfig(name="admin", remote_user="root", remote_host="db", local_port=15433, remote_port=5432),
+        ]
+        out = io.StringIO()
+
+        assert write_entries(out, tunnels, "ssh_config") == 3
+        text = out.getvalue()
+        assert text.count("Host db\n") == 1
+        assert "Host db-root\n    HostName db\n    User root\n" in text
+
+        entries = [raw for _, raw in iter_ssh_config(io.StringIO(text))]
+        assert [(raw["name"], raw["remote_user"]) for raw in entries] == [
+            ("pg", "deploy"), ("redis", "deploy"), ("admin", "root"),
+        ]
+
+    def test_validate_entry(self):
+        """Test coercion and error reporting."""
+        config, errors = validate_entry("line 2", {
+            "name": "a", "remote_user": "u", "remote_host": "h",
+            "local_port": "8080", "remote_port": "80", "enabled": "true"
+        })
+        assert errors == []
+        assert config.local_port == 8080
+        assert config.enabled is True
+
+        config, errors = validate_entry("line 3", {
+            "name": "b", "remote_user": "u", "remote_host": "h",
+            "local_port": "abc", "remote_port": 70000
+        })
+        assert config is None
+        assert len(errors) == 2
+        assert all(e.startswith("line 3:") for e in errors)
+
+
+class TestBulkImport:
+    """Tests for TunnelManager.import_tunnels()/export_tunnels()."""
+
+    def test_import_is_all_or_nothing(self, temp_config_dir, sample_tunnel_config):
+        """Test that one bad entry rejects the whole import."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+        source = temp_config_dir / "import.csv"
+        source.write_text(
+            "name,remote_user,remote_host,local_port,remote_port\n"
+            "new,u,h,9000,80\n"
+            "test-tunnel,u,h,9001,80\n"
+            "bad,u,h,0,80\n"
+        )
+
+        result = manager.import_tunnels(source)
+
+        assert not result.ok
+        assert result.imported == 0
+        assert len(result.errors) == 2
+        assert "line 3" in result.errors[0]
+        assert "line 4" in result.errors[1]
+        assert "new" not in manager.tunnels
+
+    def test_import_replace(self, temp_config_dir, sample_tunnel_config):
+        """Test overwriting existing tunnels."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+        source = temp_config_dir / "import.json"
+        source.write_text(json.dumps([{
+            "name": "test-tunnel", "remote_user": "u", "remote_host": "h",
+            "local_port": 9000, "remote_port": 80
+        }]))
+
+        result = manager.import_tunnels(source, replace=True)
+
+        assert result.ok
+        assert manager.tunnels["test-tunnel"].local_port == 9000
+
+    def test_round_trip(self, temp_config_dir, sample_tunnel_config):
+        """Test that every export format imports back unchanged."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+
+        for fmt, name in (("json", "out.json"), ("csv", "out.csv"), ("ssh_config", "config")):
+            path = temp_config_dir / name
+            assert manager.export_tunnels(path, fmt) == 1
+
+            other = TunnelManager(temp_config_dir / f"{fmt}.json")
+            result = other.import_tunnels(path, fmt)
+            assert result.ok, result.errors
+            imported = other.get_all_tunnels()[0]
+            assert imported.name == sample_tunnel_config.name
+            assert imported.local_port == sample_tunnel_config.local_port
+            assert imported.remote_port == sample_tunnel_config.remote_port
+
+    def test_import_10k_writes_once(self, temp_config_dir):
+        """Test that a large import is saved in one write (its speed is benchmarked)."""
+        source = temp_config_dir / "big.json"
+        source.write_text(json.dumps([
+            {"name": f"t{i}", "remote_user": "u", "remote_host": f"h{i}",
+             "local_port": 10000 + i, "remote_port": 80}
+            for i in range(10000)
+        ]))
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+
+        with patch.object(manager, "_save_config", wraps=manager._save_config) as save:
+            result = manager.import_tunnels(source)
+
+        assert result.imported == 10000
+        save.assert_called_once()
+        assert len(TunnelManager(temp_config_dir / "tunnels.json").tunnels) == 10000
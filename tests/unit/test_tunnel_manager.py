@@ -2,8 +2,11 @@
 Unit tests for TunnelManager module.
 """
 
+import subprocess
+import time
 from unittest.mock import MagicMock, patch
 
+from src.core.port_scanner import PortInfo
 from src.core.tunnel_manager import TunnelConfig, TunnelManager, TunnelStatus
 
 
@@ -137,3 +140,192 @@ class TestTunnelManager:
         assert "-L" in cmd
         assert "8080:localhost:80" in cmd
         assert "testuser@example.com" in cmd
+
+    def test_stop_all_keeps_enabled(self, temp_config_dir, sample_tunnel_config):
+        """Test that stop_all() keeps tunnels enabled for the next launch."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value = MagicMock()
+            manager.start_tunnel("test-tunnel")
+            manager.stop_all()
+
+        reloaded = TunnelManager(temp_config_dir / "tunnels.json")
+        assert reloaded.tunnels["test-tunnel"].enabled is True
+
+
+class TestTunnelRestore:
+    """Tests for restoring enabled tunnels on startup."""
+
+    def _manager(self, temp_config_dir, count):
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        for i in range(count):
+            manager.add_tunnel(TunnelConfig(
+                name=f"t{i}", remote_user="user", remote_host="host",
+                local_port=9000 + i, remote_port=80, enabled=True
+            ))
+        manager.add_tunnel(TunnelConfig(
+            name="disabled", remote_user="user", remote_host="host",
+            local_port=9999, remote_port=80
+        ))
+        return manager
+
+    def test_restore_enabled(self, temp_config_dir):
+        """Test that only enabled tunnels are started and reported."""
+        manager = self._manager(temp_config_dir, 3)
+        reported = []
+
+        with patch('subprocess.Popen') as mock_popen:
+            process = MagicMock()
+            process.wait.side_effect = subprocess.TimeoutExpired("ssh", 0.01)
+            mock_popen.return_value = process
+            results = manager.restore_enabled(
+                on_result=lambda name, status: reported.append((name, status)), grace=0.01
+            )
+
+        assert set(results) == {"t0", "t1", "t2"}
+        assert all(status == TunnelStatus.RUNNING for status in results.values())
+        assert sorted(name for name, _ in reported) == ["t0", "t1", "t2"]
+        assert mock_popen.call_count == 3
+
+    def test_restore_reports_early_exit(self, temp_config_dir):
+        """Test that an ssh process exiting during the grace period is an error."""
+        manager = self._manager(temp_config_dir, 1)
+
+        with patch('subprocess.Popen') as mock_popen:
+            process = MagicMock()
+            process.wait.return_value = 255
+            process.poll.return_value = 255
+            mock_popen.return_value = process
+            results = manager.restore_enabled(grace=0.01)
+
+        assert results == {"t0": TunnelStatus.ERROR}
+
+    def test_restore_same_port_once(self, temp_config_dir):
+        """Test that two tunnels on one port restored in parallel do not both start."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        for name in ("a", "b"):
+            manager.add_tunnel(TunnelConfig(
+                name=name, remote_user="user", remote_host="host",
+                local_port=9000, remote_port=80, enabled=True
+            ))
+
+        def slow_popen(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock(**{"poll.return_value": None,
+                                "wait.side_effect": subprocess.TimeoutExpired("ssh", 0.01)})
+
+        with patch('subprocess.Popen', side_effect=slow_popen) as mock_popen:
+            results = manager.restore_enabled(grace=0.01)
+
+        assert sorted(results.values(), key=lambda s: s.value) == [TunnelStatus.ERROR, TunnelStatus.RUNNING]
+        assert mock_popen.call_count == 1
+
+    def test_restore_nothing_enabled(self, temp_config_dir):
+        """Test restoring with no enabled tunnels."""
+        manager = self._manager(temp_config_dir, 0)
+
+        with patch('subprocess.Popen') as mock_popen:
+            assert manager.restore_enabled() == {}
+            mock_popen.assert_not_called()
+
+
+class TestPortConflicts:
+    """Tests for local port pre-flight checks and allocation."""
+
+    def _scanner(self, owners):
+        scanner = MagicMock()
+        scanner.get_port_owner.side_effect = owners.get
+        scanner.find_by_port.side_effect = lambda port: [owners[port]] if port in owners else []
+        bitmap = bytearray(8192)
+        for port in owners:
+            bitmap[port >> 3] |= 1 << (port & 7)
+        scanner.used_port_bitmap.return_value = bitmap
+        return scanner
+
+    def test_start_reports_conflict(self, temp_config_dir, sample_tunnel_config):
+        """Test that ssh is not launched when the local port is taken."""
+        owner = PortInfo(8080, "127.0.0.1", None, None, 555, "nginx", "LISTEN", "tcp")
+        manager = TunnelManager(temp_config_dir / "tunnels.json",
+                                port_scanner=self._scanner({8080: owner}))
+        manager.add_tunnel(sample_tunnel_config)
+
+        with patch('subprocess.Popen') as mock_popen:
+            status = manager.start_tunnel("test-tunnel")
+
+        assert status == TunnelStatus.ERROR
+        mock_popen.assert_not_called()
+        assert "nginx (PID: 555)" in manager.get_last_error("test-tunnel")
+
+    def test_only_tcp_listeners_conflict(self, temp_config_dir, sample_tunnel_config):
+        """Test that UDP sockets and outgoing connections on the port are not conflicts."""
+        scanner = MagicMock()
+        scanner.find_by_port.return_value = [
+            PortInfo(8080, "0.0.0.0", None, None, 555, "dnsmasq", "NONE", "udp"),
+            PortInfo(8080, "10.0.0.2", 443, "10.0.0.9", 556, "curl", "ESTABLISHED", "tcp"),
+        ]
+        manager = TunnelManager(temp_config_dir / "tunnels.json", port_scanner=scanner)
+        manager.add_tunnel(sample_tunnel_config)
+
+        assert manager.check_port_conflict(8080, "test-tunnel") is None
+        scanner.scan.assert_not_called()
+
+    def test_own_process_is_not_a_conflict(self, temp_config_dir, sample_tunnel_config):
+        """Test that the tunnel's own ssh listener does not block it."""
+        scanner = MagicMock()
+        scanner.find_by_port.return_value = []
+        manager = TunnelManager(temp_config_dir / "tunnels.json", port_scanner=scanner)
+        manager.add_tunnel(sample_tunnel_config)
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value = MagicMock(pid=4321, **{"poll.return_value": None})
+            manager.start_tunnel("test-tunnel")
+        scanner.find_by_port.return_value = [
+            PortInfo(8080, "127.0.0.1", None, None, 4321, "ssh", "LISTEN", "tcp"),
+        ]
+
+        assert manager.check_port_conflict(8080, "test-tunnel") is None
+        assert "test-tunnel" in manager.check_port_conflict(8080, "other")
+
+    def test_start_auto_port(self, temp_config_dir, sample_tunnel_config):
+        """Test that auto_port moves the tunnel to a free port."""
+        owner = PortInfo(8080, "127.0.0.1", None, None, 555, "nginx", "LISTEN", "tcp")
+        taken = PortInfo(20000, "127.0.0.1", None, None, 556, "redis", "LISTEN", "tcp")
+        manager = TunnelManager(temp_config_dir / "tunnels.json",
+                                port_scanner=self._scanner({8080: owner, 20000: taken}))
+        manager.add_tunnel(sample_tunnel_config)
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value = MagicMock()
+            status = manager.start_tunnel("test-tunnel", auto_port=True)
+
+        assert status == TunnelStatus.RUNNING
+        assert manager.tunnels["test-tunnel"].local_port == 20001
+
+    def test_conflict_with_running_tunnel(self, temp_config_dir, sample_tunnel_config):
+        """Test that two tunnels cannot share a local port."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+        manager.add_tunnel(TunnelConfig(
+            name="other", remote_user="user", remote_host="host",
+            local_port=8080, remote_port=80
+        ))
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value = MagicMock(**{"poll.return_value": None})
+            assert manager.start_tunnel("test-tunnel") == TunnelStatus.RUNNING
+            assert manager.start_tunnel("other") == TunnelStatus.ERROR
+
+        assert "test-tunnel" in manager.get_last_error("other")
+
+    def test_allocate_ports(self, temp_config_dir, sample_tunnel_config):
+        """Test bulk allocation skips used and configured ports."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json",
+                                port_scanner=self._scanner({20001: object()}),
+                                port_range=(20000, 20010))
+        sample_tunnel_config.local_port = 20002
+        manager.add_tunnel(sample_tunnel_config)
+
+        assert manager.allocate_ports(3) == [20000, 20003, 20004]
+        # The first three are still reserved
+        assert len(manager.allocate_ports(100)) == 6
@@ -0,0 +1,179 @@
+"""
+Unit tests for TunnelMetrics module.
+"""
+
+import socket
+import threading
+from unittest.mock import MagicMock, patch
+
+from src.core.tunnel_manager import TunnelManager
+from src.core.tunnel_metrics import (
+    TunnelMetrics,
+    TunnelMetricsCollector,
+    TunnelSample,
+    sparkline,
+)
+
+
+def _sample(ts: float, bytes_in: int, bytes_out: int) -> TunnelSample:
+    return TunnelSample(timestamp=ts, bytes_in=bytes_in, bytes_out=bytes_out,
+                        connections=0, probe_rtt=None)
+
+
+class TestTunnelMetrics:
+    """Tests for TunnelMetrics rolling window."""
+
+    def test_window_is_bounded(self):
+        """Test that old samples are evicted once the window is full."""
+        metrics = TunnelMetrics(window=3)
+        for i in range(10):
+            metrics.record(_sample(float(i), i, i))
+
+        assert len(metrics.samples) == 3
+        assert metrics.latest().timestamp == 9.0
+
+    def test_throughput(self):
+        """Test bytes/s computation between samples."""
+        metrics = TunnelMetrics()
+        metrics.record(_sample(0.0, 0, 0))
+        metrics.record(_sample(2.0, 100, 100))
+
+        assert metrics.throughput() == [100.0]
+        assert metrics.to_dict()["throughput"] == 100.0
+
+    def test_sparkline(self):
+        """Test sparkline rendering."""
+        assert sparkline([]) == ""
+        assert sparkline([0, 0]) == "▁▁"
+        line = sparkline([0, 50, 100])
+        assert line[0] == "▁"
+        assert line[-1] == "█"
+
+
+class TestTunnelMetricsCollector:
+    """Tests for TunnelMetricsCollector."""
+
+    def test_collect_counts_connections(self):
+        """Test that established connections are counted per local port."""
+        conn = MagicMock(status='ESTABLISHED', laddr=MagicMock(port=8080))
+        other = MagicMock(status='LISTEN', laddr=MagicMock(port=8080))
+        io = MagicMock(read_chars=10, write_chars=20)
+
+        with patch('psutil.net_connections', return_value=[conn, other]) as mock_conns:
+            with patch('psutil.Process') as mock_process:
+                mock_process.return_value.io_counters.return_value = io
+                collector = TunnelMetricsCollector()
+                samples = collector.collect({"a": (8080, 1), "b": (9090, 2)}, probe=False)
+
+        mock_conns.assert_called_once()
+        assert samples["a"].connections == 1
+        assert samples["b"].connections == 0
+        assert samples["a"].bytes_in == 10
+        assert samples["a"].bytes_out == 20
+
+    def test_probe_connections_not_counted(self):
+        """Test the server side of the collector's own probe is not counted as a client."""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        port = server.getsockname()[1]
+        try:
+            collector = TunnelMetricsCollector()
+            with patch('psutil.net_connections', return_value=[]), patch('psutil.Process'):
+                collector.collect({"a": (port, 1)})
+            source = next(iter(collector._probe_sources))
+            probe = MagicMock(status='ESTABLISHED', laddr=MagicMock(port=port),
+                              raddr=MagicMock(ip=source[0], port=source[1]))
+            client = MagicMock(status='ESTABLISHED', laddr=MagicMock(port=port),
+                               raddr=MagicMock(ip="127.0.0.1", port=1))
+
+            with patch('psutil.net_connections', return_value=[probe, client]):
+                assert collector._count_connections({port}) == {port: 1}
+        finally:
+            server.close()
+
+    def test_probes_run_concurrently(self):
+        """Test each port is probed once, off the calling thread."""
+        probed = []
+
+        def probe(port):
+            probed.append((port, threading.current_thread().name))
+            return 0.001
+
+        with patch('psutil.net_connections', return_value=[]), patch('psutil.Process'):
+            collector = TunnelMetricsCollector()
+            with patch.object(collector, '_probe', side_effect=probe):
+                samples = collector.collect({"a": (8080, 1), "b": (8080, 2), "c": (9090, 3)})
+
+        assert sorted(port for port, _ in probed) == [8080, 9090]
+        assert all(name.startswith("tunnel-probe") for _, name in probed)
+        assert samples["b"].probe_rtt == 0.001
+
+    def test_probe(self):
+        """Test probing a listening local port."""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        port = server.getsockname()[1]
+        try:
+            collector = TunnelMetricsCollector()
+            assert collector._probe(port) is not None
+        finally:
+            server.close()
+
+
+class TestTunnelManagerMetrics:
+    """Tests for metrics exposed through TunnelManager."""
+
+    def test_collect_metrics(self, temp_config_dir, sample_tunnel_config):
+        """Test that running tunnels get samples and a connect latency."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        manager.add_tunnel(sample_tunnel_config)
+
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value = MagicMock(pid=4321, **{"poll.return_value": None})
+            manager.start_tunnel("test-tunnel")
+
+        sample = TunnelSample(timestamp=1e9, bytes_in=1, bytes_out=2,
+                              connections=3, probe_rtt=0.001)
+        with patch.object(manager._metrics_collector, 'collect',
+                          return_value={"test-tunnel": sample}) as mock_collect:
+            manager.collect_metrics()
+
+        mock_collect.assert_called_once_with({"test-tunnel": (8080, 4321)}, probe=True)
+        metrics = manager.get_metrics("test-tunnel")
+        assert metrics.latest() is sample
+        assert metrics.connect_latency is not None
+
+    def test_background_collection(self, temp_config_dir):
+        """Test start_metrics() samples on its own thread until stopped."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        called = threading.Event()
+        with patch.object(manager, 'collect_metrics', side_effect=lambda probe: called.set()):
+            manager.start_metrics(interval=0.01)
+            assert called.wait(5)
+            manager.stop_metrics()
+        assert manager._metrics_thread is None
+
+    def test_probing_is_opt_in_and_rate_limited(self, temp_config_dir):
+        """Test background passes only probe when enabled, and at most once per probe_interval."""
+        for probe_interval, expected in ((0, [False, False, False]), (3600, [True, False, False])):
+            manager = TunnelManager(temp_config_dir / "tunnels.json")
+            probes = []
+            done = threading.Event()
+
+            def collect(probe, probes=probes, done=done):
+                probes.append(probe)
+                if len(probes) == 3:
+                    done.set()
+
+            with patch.object(manager, 'collect_metrics', side_effect=collect):
+                manager.start_metrics(interval=0.01, probe_interval=probe_interval)
+                assert done.wait(5)
+                manager.stop_metrics()
+            assert probes[:3] == expected
+
+    def test_get_metrics_unknown(self, temp_config_dir):
+        """Test that tunnels without samples have no metrics."""
+        manager = TunnelManager(temp_config_dir / "tunnels.json")
+        assert manager.get_metrics("missing") is None
@@ -0,0 +1,91 @@
+"""
+Unit tests for the icon and stylesheet caches.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+
+@pytest.fixture
+def qapp():
+    """Create QApplication for testing."""
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    yield app
+
+
+class TestIconCache:
+    """Tests for the process-wide icon cache."""
+
+    def test_icons_are_shared(self, qapp):
+        """Test that the same (name, color) returns the cached icon."""
+        from src.ui import icons
+        icons.clear_cache()
+
+        first = icons.icon('fa5s.trash-alt', color='white')
+        second = icons.icon('fa5s.trash-alt', color='white')
+        other = icons.icon('fa5s.trash-alt', color='red')
+
+        assert first is second
+        assert other is not first
+        stats = icons.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_pixmaps_keyed_by_size(self, qapp):
+        """Test that pixmaps are cached per size."""
+        from src.ui import icons
+        icons.clear_cache()
+
+        small = icons.pixmap('fa5s.plug', size=16)
+        assert icons.pixmap('fa5s.plug', size=16) is small
+        assert icons.pixmap('fa5s.plug', size=32).width() == 32
+
+    def test_large_refresh_builds_one_icon(self, qapp):
+        """Test that populating many rows renders the Kill icon once."""
+        from src.core.port_scanner import PortInfo
+        from src.ui import icons
+        from src.ui.widgets.port_table import PortTableWidget
+
+        ports = [PortInfo(10000 + i, "127.0.0.1", None, None, i, "proc", "LISTEN", "tcp")
+                 for i in range(500)]
+        scanner = MagicMock()
+        scanner.get_listening_ports.return_value = ports
+        icons.clear_cache()
+
+        table = PortTableWidget(scanner)
+        table.refresh()
+
+        stats = icons.cache_stats()
+        # Refresh button + Kill icon, however many rows there are
+        assert stats["misses"] == 2
+        assert stats["hits"] >= 2 * len(ports) - 1
+
+
+class TestStylesheetCache:
+    """Tests for the shared stylesheet."""
+
+    def test_stylesheet_read_once(self, qapp, monkeypatch):
+        """Test that the QSS file is read once and applied application-wide."""
+        from src.ui import theme
+        monkeypatch.setattr(theme, "_stylesheets", {})
+        reads = []
+        original = theme.Path.read_text
+
+        def counting_read(path, *args, **kwargs):
+            reads.append(path)
+            return original(path, *args, **kwargs)
+
+        monkeypatch.setattr(theme.Path, "read_text", counting_read)
+
+        theme.apply_theme(qapp)
+        theme.apply_theme(qapp)
+
+        assert len(reads) == 1
+        assert "killButton" in qapp.styleSheet()
+        qapp.setStyleSheet("")
@@ -0,0 +1,304 @@
+"""
+Unit tests for streamed, resumable and verified update downloads.
+"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.http_cache import HttpCache
+from src.utils.updater import ChecksumMismatchError, IncompleteDownloadError, Updater
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB, several chunks
+PAYLOAD_SIZE = len(PAYLOAD)
+
+
+@pytest.fixture
+def download_stub():
+    """Local HTTP server serving an installer with Range support and a checksum file."""
+    state = {"payload": PAYLOAD, "digest": hashlib.sha256(PAYLOAD).hexdigest(),
+             "ranges": [], "honour_range": True, "sums": None, "etag": '"build-1"', "short": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            if self.path.endswith("SHA256SUMS"):
+                body = state["sums"] or f"{'0' * 64}  other.dmg\n{state['digest']}  PortPilot.AppImage\n"
+                body = body.encode()
+                self._send(200, body)
+                return
+
+            payload = state["payload"]
+            requested = self.headers.get("Range")
+            state["ranges"].append(requested)
+            if requested and self.headers.get("If-Range") not in (None, state["etag"]):
+                requested = None  # The part is of another build: send the whole file
+            if requested and state["honour_range"]:
+                start = int(requested.split("=")[1].rstrip("-"))
+                if start >= len(payload):
+                    self._send(416, b"")
+                    return
+                self._send(206, payload[start:],
+                           {"Content-Range": f"bytes {start}-{len(payload) - 1}/{len(payload)}"})
+            else:
+                self._send(200, payload)
+
+        def _send(self, code, body, headers=None):
+            self.send_response(code)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("ETag", state["etag"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) - state["short"]])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["base"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def release_api():
+    """Local releases API stub that honours If-None-Match."""
+    state = {"etag": '"v1"', "tag": "v99.0.0", "requests": [], "cache_control": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            state["requests"].append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps({"tag_name": state["tag"], "assets": []}).encode()
+            self.send_response(200)
+            self.send_header("ETag", state["etag"])
+            if state["cache_control"]:
+                self.send_header("Cache-Control", state["cache_control"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/releases/latest"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def updater(download_stub, tmp_path):
+    updater = Updater()
+    updater.download_url = f"{download_stub['base']}/download/PortPilot.AppImage"
+    updater.checksum_url = f"{download_stub['base']}/download/SHA256SUMS"
+    updater.download_dir = tmp_path
+    return updater
+
+
+def write_part(updater, data, validator='"build-1"', total=PAYLOAD_SIZE):
+    """Leave a partial download as an interrupted run would."""
+    part = updater._part_path("PortPilot.AppImage")
+    part.write_bytes(data)
+    part.with_name(part.name + ".json").write_text(json.dumps({"validator": validator, "total": total}))
+    return part
+
+
+class TestDownload:
+    """Tests for Updater.download()."""
+
+    def test_full_download_reports_progress(self, updater, tmp_path):
+        """Test a fresh download is streamed, verified and renamed into place."""
+        progress = []
+
+        path = updater.download(lambda done, total: progress.append((done, total)))
+
+        assert path == tmp_path / "PortPilot.AppImage"
+        assert path.read_bytes() == PAYLOAD
+        assert list(tmp_path.iterdir()) == [path]
+        assert progress[0] == (0, len(PAYLOAD))
+        assert progress[-1] == (len(PAYLOAD), len(PAYLOAD))
+        assert len(progress) > 2
+
+    def test_resumes_partial_download(self, updater, download_stub, tmp_path):
+        """Test an interrupted download continues with a Range request."""
+        write_part(updater, PAYLOAD[:100000])
+        progress = []
+
+        path = updater.download(lambda done, total: progress.append(done))
+
+        assert download_stub["ranges"] == ["bytes=100000-"]
+        assert progress[0] == 100000
+        assert path.read_bytes() == PAYLOAD
+
+    def test_restarts_when_range_ignored(self, updater, download_stub, tmp_path):
+        """Test a server answering 200 to a Range request restarts the file."""
+        download_stub["honour_range"] = False
+        write_part(updater, b"stale")
+
+        assert updater.download().read_bytes() == PAYLOAD
+
+    def test_complete_partial_file(self, updater, tmp_path):
+        """Test a fully downloaded .part file is verified without refetching."""
+        write_part(updater, PAYLOAD)
+
+        assert updater.download().read_bytes() == PAYLOAD
+
+    def test_part_of_another_build_is_replaced(self, updater, download_stub):
+        """Test If-Range keeps a part left by an older build from being extended, even unverified."""
+        updater.checksum_url = None
+        write_part(updater, b"old build " * 1000, validator='"build-0"')
+
+        assert updater.download().read_bytes() == PAYLOAD
+        assert download_stub["ranges"] == ["bytes=10000-"]
+
+    def test_oversized_part_is_not_taken_as_complete(self, updater, download_stub):
+        """Test a 416 for a part of the wrong size restarts the download."""
+        updater.checksum_url = None
+        write_part(updater, PAYLOAD + b"junk", total=None)
+
+        assert updater.download().read_bytes() == PAYLOAD
+        assert download_stub["ranges"] == [f"bytes={len(PAYLOAD) + 4}-", None]
+
+    def test_part_without_validator_is_not_resumed(self, updater, download_stub, tmp_path):
+        """Test parts are keyed by URL and only resumed when their build is known."""
+        (tmp_path / "PortPilot.AppImage.part").write_bytes(b"stale")
+        updater._part_path("PortPilot.AppImage").write_bytes(b"stale")
+
+        assert updater.download().read_bytes() == PAYLOAD
+        assert download_stub["ranges"] == [None]
+
+    def test_short_response_is_rejected(self, updater, download_stub, tmp_path):
+        """Test a download that ends early is kept for resuming, not installed."""
+        updater.checksum_url = None
+        download_stub["short"] = 1000
+
+        with pytest.raises(IncompleteDownloadError):
+            updater.download()
+        assert not (tmp_path / "PortPilot.AppImage").exists()
+        assert updater._part_path("PortPilot.AppImage").stat().st_size == len(PAYLOAD) - 1000
+
+        download_stub["short"] = 0
+        assert updater.download().read_bytes() == PAYLOAD
+        assert download_stub["ranges"][-1] == f"bytes={len(PAYLOAD) - 1000}-"
+
+    def test_checksum_mismatch(self, updater, download_stub, tmp_path):
+        """Test a corrupted download is rejected and discarded."""
+        download_stub["payload"] = PAYLOAD[:-1] + b"x"
+
+        with pytest.raises(ChecksumMismatchError):
+            updater.download()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bare_digest(self, updater, download_stub):
+        """Test a checksum file holding only a digest applies to the download."""
+        download_stub["sums"] = f"{download_stub['digest']}\n"
+
+        assert updater.download().read_bytes() == PAYLOAD
+
+    @pytest.mark.parametrize("sums", [
+        f"{hashlib.sha256(PAYLOAD).hexdigest()}  other.dmg\n",  # Only another file's digest
+        "no digests here\n",
+    ])
+    def test_unlisted_download_is_rejected(self, updater, download_stub, tmp_path, sums):
+        """Test a download the checksum asset does not cover is never installed unverified."""
+        download_stub["sums"] = sums
+
+        with pytest.raises(ChecksumMismatchError):
+            updater.download()
+        assert not (tmp_path / "PortPilot.AppImage").exists()
+
+    def test_download_in_background(self, updater, download_stub):
+        """Test download_and_install reports its outcome from a worker thread."""
+        download_stub["payload"] = b"corrupt"
+        results = []
+        threads = []
+
+        thread = updater.download_in_background(
+            on_done=lambda ok, msg: (results.append((ok, msg)),
+                                     threads.append(threading.current_thread()))
+        )
+        thread.join(timeout=5)
+
+        assert results[0][0] is False
+        assert "verification" in results[0][1]
+        assert threads[0] is not threading.main_thread()
+
+
+class TestChecksumAsset:
+    """Tests for locating the checksum asset."""
+
+    def test_find_checksum_url(self):
+        updater = Updater()
+        updater.download_url = "https://example.com/PortPilot.exe"
+        assets = [
+            {"name": "checksums.txt", "browser_download_url": "https://example.com/checksums.txt"},
+            {"name": "PortPilot.exe.sha256", "browser_download_url": "https://example.com/exe.sha256"},
+        ]
+
+        assert updater._find_checksum_url(assets) == "https://example.com/exe.sha256"
+        assert updater._find_checksum_url(assets[:1]) == "https://example.com/checksums.txt"
+        assert updater._find_checksum_url([]) is None
+
+
+class TestReleaseCache:
+    """Tests for conditional-request caching of the release check."""
+
+    def test_revalidates_with_etag(self, release_api, tmp_path):
+        """Test a stale entry costs one 304 and keeps the cached release."""
+        cache_path = tmp_path / "http_cache.json"
+
+        first = Updater(api_url=release_api["url"], cache=HttpCache(cache_path))
+        assert first.check_for_updates()[0] is True
+
+        # A new instance reads the persisted entry, as on the next launch
+        second = Updater(api_url=release_api["url"], cache=HttpCache(cache_path))
+        assert second.check_for_updates()[0] is True
+        assert second.latest_version == "99.0.0"
+        assert release_api["requests"] == [None, '"v1"']
+
+    def test_changed_release_is_refetched(self, release_api, tmp_path):
+        """Test a new ETag replaces the cached body."""
+        cache = HttpCache(tmp_path / "http_cache.json")
+        Updater(api_url=release_api["url"], cache=cache).check_for_updates()
+        release_api.update(etag='"v2"', tag="v100.0.0")
+
+        updater = Updater(api_url=release_api["url"], cache=cache)
+        updater.check_for_updates()
+
+        assert updater.latest_version == "100.0.0"
+
+    def test_fresh_entry_skips_network(self, release_api, tmp_path):
+        """Test checks inside the max-age window make no request."""
+        cache_path = tmp_path / "http_cache.json"
+        Updater(api_url=release_api["url"], cache=HttpCache(cache_path, max_age=3600)).check_for_updates()
+
+        cache = HttpCache(cache_path, max_age=3600)
+        updater = Updater(api_url=release_api["url"], cache=cache)
+        for _ in range(100):
+            assert updater.check_for_updates()[0] is True
+
+        assert len(release_api["requests"]) == 1
+
+    def test_server_max_age(self, release_api, tmp_path):
+        """Test the server's Cache-Control max-age is honoured."""
+        release_api["cache_control"] = "public, max-age=60"
+        cache = HttpCache(tmp_path / "http_cache.json")
+        updater = Updater(api_url=release_api["url"], cache=cache)
+
+        updater.check_for_updates()
+        updater.check_for_updates()
+
+        assert len(release_api["requests"]) == 1